@@ -5,3 +5,9 @@ register(
      entry_point="clash_royale.envs:ClashRoyaleEnv",
      max_episode_steps=14400,
 )
+
+register(
+     id="clash-royale-vector",
+     vector_entry_point="clash_royale.envs:ClashRoyaleVectorEnv",
+     max_episode_steps=14400,
+)
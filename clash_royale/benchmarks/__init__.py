@@ -0,0 +1,12 @@
+"""
+This submodule contains benchmarks for the game engine.
+
+Each benchmark can be ran as a module, for example:
+
+    python -m clash_royale.benchmarks.spatial
+
+The suite module measures overall throughput, and compares runs against a baseline:
+
+    python -m clash_royale.benchmarks.suite run --output baseline.json
+    python -m clash_royale.benchmarks.suite compare baseline.json current.json
+"""
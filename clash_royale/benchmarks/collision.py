@@ -0,0 +1,187 @@
+"""
+Benchmark for collision resolution
+
+We deploy swarms of units on top of each other (as playing many swarm cards at once would),
+and time a collision pass that finds overlapping pairs with the uniform grid
+against a pass that checks every pair of units.
+We also report how much the units still overlap after stepping the arena,
+to show that crowds spread out over a few frames.
+"""
+
+from __future__ import annotations
+
+import argparse
+import functools
+import random
+import timeit
+from typing import List, Tuple
+
+import numpy as np
+import numpy.typing as npt
+
+from clash_royale.envs.game_engine.arena import Arena
+from clash_royale.envs.game_engine.catalog import card_id, get_catalog
+from clash_royale.envs.game_engine.logic.collision import collide_all, layers, overlapping_pairs, \
+    solid_mask
+
+# Swarm cards units are drawn from:
+SWARMS: List[str] = ['skeletons', 'goblins', 'archers']
+
+
+def pairwise_overlaps(x: npt.NDArray[np.float64],
+                      y: npt.NDArray[np.float64],
+                      radius: npt.NDArray[np.float64],
+                      layer: npt.NDArray[np.int64]) -> Tuple[npt.NDArray[np.int64],
+                                                             npt.NDArray[np.int64]]:
+    """
+    Finds every pair of overlapping units by checking every pair of units.
+
+    This is the same search as overlapping_pairs(), without the grid.
+    """
+
+    dx = x[:, None] - x[None, :]
+    dy = y[:, None] - y[None, :]
+    reach = radius[:, None] + radius[None, :]
+
+    overlap = (dx * dx + dy * dy < reach * reach) & (layer[:, None] == layer[None, :])
+
+    return np.nonzero(np.triu(overlap, k=1))
+
+
+def make_arena(units: int, swarms: int=4, seed: int=0) -> Arena:
+    """
+    Creates an arena with the given number of units,
+    deployed in a few tight swarms on each side.
+    """
+
+    rng = random.Random(seed)
+    catalog = get_catalog()
+    arena = Arena(width=18, height=32)
+    arena.reset()
+
+    centers = [(rng.uniform(3, 15), rng.uniform(3, 12)) for _ in range(swarms)]
+    spawned = []
+    remaining = units
+
+    while remaining > 0:
+
+        type_id = card_id(rng.choice(SWARMS))
+        team = len(spawned) % 2
+        x, y = rng.choice(centers)
+
+        y = y if team == 0 else arena.height - y
+
+        spawned += arena.spawn(type_id, x + rng.uniform(-0.5, 0.5), y, team)
+        remaining -= int(catalog[type_id]['count'])
+
+    arena.start_many(spawned)
+
+    return arena
+
+
+def overlap_depth(arena: Arena) -> float:
+    """
+    Determines the total depth of every overlap between units that collide.
+    """
+
+    store = arena.store
+    solid = solid_mask(store.column('state'), store.column('troop_size'), store.column('speed'))
+
+    x = store.column('x')[solid]
+    y = store.column('y')[solid]
+    radius = store.column('troop_size')[solid] / 2
+
+    layer = layers(store.column('team')[solid], store.column('flying')[solid])
+    i, j = overlapping_pairs(x, y, radius, layer)
+
+    return float(np.sum(radius[i] + radius[j] - np.hypot(x[i] - x[j], y[i] - y[j])))
+
+
+def time_searches(arena: Arena, number: int, repeat: int) -> Tuple[float, float]:
+    """
+    Times finding the overlapping units of an arena by checking every pair, and with the grid.
+
+    :return: Seconds per search of pairwise_overlaps() and overlapping_pairs()
+    """
+
+    store = arena.store
+    solid = solid_mask(store.column('state'), store.column('troop_size'), store.column('speed'))
+
+    args = (store.column('x')[solid].copy(),
+            store.column('y')[solid].copy(),
+            store.column('troop_size')[solid] / 2,
+            layers(store.column('team')[solid], store.column('flying')[solid]))
+
+    pairwise_time = min(timeit.repeat(functools.partial(pairwise_overlaps, *args),
+                                      number=number, repeat=repeat)) / number
+    grid_time = min(timeit.repeat(functools.partial(overlapping_pairs, *args),
+                                  number=number, repeat=repeat)) / number
+
+    return pairwise_time, grid_time
+
+
+def run(counts: List[int],
+        repeat: int=5,
+        frames: int=30) -> List[Tuple[int, float, float, float, float, float]]:
+    """
+    Times collision passes for each unit count.
+
+    :return: Tuples of (units, pairwise seconds, grid seconds, collide_all() seconds,
+        overlap before, overlap after) for each count,
+        where overlaps are measured before and after stepping the arena for 'frames' frames
+    """
+
+    results = []
+
+    for count in counts:
+
+        arena = make_arena(count)
+        pairwise_time, grid_time = time_searches(arena, max(1, 2000 // max(count, 1)), repeat)
+
+        # Time the full collision pass, restoring the swarm so every pass has work to do:
+
+        restore = functools.partial(arena.restore, arena.snapshot())
+
+        pass_time = float('inf')
+
+        for _ in range(repeat):
+            restore()
+            start = timeit.default_timer()
+            collide_all(arena)
+            pass_time = min(pass_time, timeit.default_timer() - start)
+
+        restore()
+        before = overlap_depth(arena)
+
+        for _ in range(frames):
+            arena.step()
+
+        results.append((count, pairwise_time, grid_time, pass_time, before, overlap_depth(arena)))
+
+    return results
+
+
+def main() -> None:
+    """
+    Runs the benchmark and prints a table.
+    """
+
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--counts', type=int, nargs='+', default=[25, 50, 100, 150, 200, 400])
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--frames', type=int, default=30)
+    args = parser.parse_args()
+
+    print(f"{'units':>6} {'pairwise (ms)':>14} {'grid (ms)':>10} {'speedup':>8} "
+          f"{'pass (ms)':>10} {'overlap':>8} {'after':>8}")
+
+    results = run(args.counts, args.repeat, args.frames)
+
+    for count, pairwise_time, grid_time, pass_time, before, after in results:
+        print(f"{count:>6} {pairwise_time * 1e3:>14.3f} {grid_time * 1e3:>10.3f} "
+              f"{pairwise_time / grid_time:>7.2f}x {pass_time * 1e3:>10.3f} "
+              f"{before:>8.1f} {after:>8.1f}")
+
+
+if __name__ == '__main__':
+    main()
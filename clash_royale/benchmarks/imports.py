@@ -0,0 +1,85 @@
+"""
+Benchmark for import time
+
+Every rollout worker imports the package before it can simulate anything,
+so import time directly adds to worker startup latency.
+We time each target in a fresh interpreter (so nothing is cached between runs),
+and report which heavy optional modules ended up being imported.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+from typing import Dict, List, Tuple
+
+# Statements to time, keyed by a short description:
+TARGETS: Dict[str, str] = {
+    'package': "import clash_royale",
+    'engine': "import clash_royale.envs.game_engine.game_engine",
+    'env (features)': "import gymnasium, clash_royale; "
+                      "gymnasium.make('clash-royale', observation_mode='features').reset()",
+    'env (rgb)': "import gymnasium, clash_royale; "
+                 "gymnasium.make('clash-royale').reset()",
+}
+
+# Optional modules that should only be imported when needed:
+WATCHED: List[str] = ['pygame',
+                      'clash_royale.envs.clash_royale_vector_env',
+                      'clash_royale.envs.game_engine.render.base']
+
+# Code ran in the fresh interpreter, reports the elapsed time and watched modules:
+PROBE = """
+import sys, time, json
+start = time.perf_counter()
+{statement}
+elapsed = time.perf_counter() - start
+print(json.dumps([elapsed, [name for name in {watched!r} if name in sys.modules]]))
+"""
+
+
+def time_import(statement: str, repeat: int=5) -> Tuple[List[float], List[str]]:
+    """
+    Times a statement in fresh interpreters.
+
+    :return: Seconds taken by each run, and the watched modules that were imported
+    """
+
+    times = []
+    loaded: List[str] = []
+
+    for _ in range(repeat):
+
+        output = subprocess.run([sys.executable, '-c', PROBE.format(statement=statement, watched=WATCHED)],
+                                check=True, capture_output=True, text=True).stdout
+
+        elapsed, loaded = json.loads(output.strip().splitlines()[-1])
+        times.append(elapsed)
+
+    return times, loaded
+
+
+def main() -> None:
+    """
+    Runs the benchmark and prints a table of import times.
+    """
+
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'target':>16} {'median (ms)':>12} {'min (ms)':>10}  loaded")
+
+    for name, statement in TARGETS.items():
+
+        times, loaded = time_import(statement, repeat=args.repeat)
+
+        print(f"{name:>16} {statistics.median(times) * 1e3:>12.1f} {min(times) * 1e3:>10.1f}  "
+              f"{', '.join(loaded) or '-'}")
+
+
+if __name__ == '__main__':
+    main()
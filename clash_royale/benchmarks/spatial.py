@@ -0,0 +1,144 @@
+"""
+Benchmark for spatial target acquisition
+
+We compare a full targeting sweep (every entity searches for a target)
+using the spatial index of the arena against a linear scan over all entities.
+The crossover point is the smallest entity count where the index is faster.
+"""
+
+from __future__ import annotations
+
+import argparse
+import functools
+import random
+import timeit
+from typing import List, Tuple
+
+from clash_royale.envs.game_engine.arena import Arena
+from clash_royale.envs.game_engine.entities.entity import Entity
+from clash_royale.envs.game_engine.entities.logic_entity import LogicEntity
+from clash_royale.envs.game_engine.logic.target import RadiusTarget
+from clash_royale.envs.game_engine.struct import Stats
+
+
+def linear_target(entity: LogicEntity) -> Entity | None:
+    """
+    Finds the closest enemy by scanning every entity in the arena.
+
+    This is the search RadiusTarget preformed before the spatial index.
+    """
+
+    best: Entity | None = None
+    best_distance = float('inf')
+    sight = entity.stats.sight_range
+
+    for ent in entity.arena.entities:
+
+        if ent.team == entity.team or not ent.running:
+            continue
+
+        dist = entity.target.entity_distance(ent)
+
+        if dist <= sight and dist < best_distance:
+            best = ent
+            best_distance = dist
+
+    return best
+
+
+def linear_sweep(entities: List[LogicEntity]) -> None:
+    """
+    Finds a target for every entity with a linear scan, see linear_target().
+    """
+
+    for ent in entities:
+        linear_target(ent)
+
+
+def grid_sweep(entities: List[LogicEntity]) -> None:
+    """
+    Finds a target for every entity with the spatial index of the arena.
+    """
+
+    for ent in entities:
+        ent.target.target()
+
+
+def make_arena(count: int, seed: int=0, sight_range: float=5.5) -> Arena:
+    """
+    Creates an arena with randomly placed entities, split between teams.
+    """
+
+    rng = random.Random(seed)
+    arena = Arena(width=18, height=32)
+
+    for index in range(count):
+        ent = LogicEntity(target=RadiusTarget())
+        ent.x = rng.uniform(0, arena.width)
+        ent.y = rng.uniform(0, arena.height)
+        ent.team = index % 2
+        ent.stats = Stats(name='bench', sight_range=sight_range, health=100)
+        arena.load_entity(ent)
+
+    arena.start()
+
+    return arena
+
+
+def run(counts: List[int], repeat: int=5) -> List[Tuple[int, float, float]]:
+    """
+    Times a targeting sweep for each entity count.
+
+    :return: Tuples of (count, linear seconds, grid seconds) per sweep
+    """
+
+    results = []
+
+    for count in counts:
+
+        arena = make_arena(count)
+        linear = functools.partial(linear_sweep, arena.entities)
+        grid = functools.partial(grid_sweep, arena.entities)
+
+        number = max(1, 2000 // max(count, 1))
+        linear_time = min(timeit.repeat(linear, number=number, repeat=repeat)) / number
+        grid_time = min(timeit.repeat(grid, number=number, repeat=repeat)) / number
+
+        results.append((count, linear_time, grid_time))
+
+    return results
+
+
+def main() -> None:
+    """
+    Runs the benchmark and prints a table with the crossover point.
+    """
+
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--counts', type=int, nargs='+',
+                        default=[2, 4, 8, 16, 32, 64, 128, 256])
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    results = run(args.counts, repeat=args.repeat)
+
+    print(f"{'entities':>8} {'linear (ms)':>12} {'grid (ms)':>12} {'speedup':>8}")
+
+    crossover = None
+
+    for count, linear_time, grid_time in results:
+
+        print(f"{count:>8} {linear_time * 1e3:>12.3f} {grid_time * 1e3:>12.3f} "
+              f"{linear_time / grid_time:>7.2f}x")
+
+        if crossover is None and grid_time < linear_time:
+            crossover = count
+
+    if crossover is None:
+        print("Spatial index was not faster for any tested entity count")
+    else:
+        print(f"Crossover: spatial index is faster from {crossover} entities")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,535 @@
+"""
+Throughput benchmark suite
+
+We measure how fast the hot paths of the engine and environment run,
+across scenarios from an empty board to a crowded one:
+
+    single  - GameEngine step(), legal_actions(), make_image(), make_features(),
+              spatial queries, collision passes, and full ClashRoyaleEnv episodes
+    vector  - ClashRoyaleVectorEnv steps across worker processes
+    batched - BatchedGameEngine step() and legal_actions()
+
+Every result is a rate (frames, calls or steps per second, higher is better),
+and results are written as JSON so runs can be compared:
+
+    python -m clash_royale.benchmarks.suite run --output baseline.json
+    python -m clash_royale.benchmarks.suite run --output current.json
+    python -m clash_royale.benchmarks.suite compare baseline.json current.json
+
+The compare command exits with a non-zero status
+if any benchmark is slower than the baseline by more than the threshold.
+"""
+
+from __future__ import annotations
+
+import argparse
+import dataclasses
+import datetime
+import functools
+import json
+import platform
+import random
+import sys
+import time
+from typing import Any, Callable, Dict, List, Tuple
+
+import numpy as np
+
+from clash_royale.envs.game_engine.catalog import CARD_IDS, get_catalog
+from clash_royale.envs.game_engine.batched import BatchedGameEngine
+from clash_royale.envs.game_engine.game_engine import GameEngine
+from clash_royale.envs.game_engine.logic.collision import collide_all
+
+VERSION: int = 1
+
+MODES: Tuple[str, ...] = ('single', 'vector', 'batched')
+
+# Number of units placed on the board for each scenario:
+UNITS: List[int] = [0, 10, 50, 100, 200]
+
+# Troops units are drawn from, and the deck every benchmark plays with:
+TROOPS: List[str] = ['knight', 'archers', 'giant', 'musketeer',
+                     'mini_pekka', 'valkyrie', 'hog_rider', 'bomber']
+
+
+@dataclasses.dataclass(slots=True)
+class Result:
+    """
+    Result - Measured rate of a single benchmark
+    """
+
+    mode: str  # One of MODES
+    benchmark: str
+    units: int | None  # Units in the scenario, None if the benchmark plays out a game
+    rate: float  # Work done per second
+    unit: str  # What the work is, such as 'frames/s'
+
+    @property
+    def key(self) -> str:
+        """
+        Name that identifies this benchmark across runs.
+        """
+
+        if self.units is None:
+            return f'{self.mode}/{self.benchmark}'
+
+        return f'{self.mode}/{self.benchmark}/{self.units}'
+
+
+def measure(func: Callable[[], Any],
+            setup: Callable[[], Any] | None=None,
+            number: int=10,
+            repeat: int=5,
+            work: int=1) -> float:
+    """
+    Measures how fast a function runs.
+
+    The function is called 'number' times in a row, 'repeat' times over,
+    and the fastest repeat is used.
+    'setup' is called before each repeat, and is not timed,
+    which allows a scenario to be restored between repeats.
+
+    :param func: Function to time
+    :type func: Callable[[], Any]
+    :param setup: Function called before each repeat, defaults to None
+    :type setup: Callable[[], Any] | None
+    :param number: Calls per repeat, defaults to 10
+    :type number: int
+    :param repeat: Number of repeats, defaults to 5
+    :type repeat: int
+    :param work: Amount of work done by each call, defaults to 1
+    :type work: int
+    :return: Work done per second
+    :rtype: float
+    """
+
+    best = float('inf')
+
+    for _ in range(repeat):
+
+        if setup is not None:
+            setup()
+
+        start = time.perf_counter()
+
+        for _ in range(number):
+            func()
+
+        best = min(best, time.perf_counter() - start)
+
+    return work * number / best
+
+
+def _placements(units: int, width: int, height: int, seed: int) -> List[Tuple[int, float, float, int]]:
+    """
+    Picks the units of a scenario.
+
+    Units alternate between teams, and are placed on the half of their team,
+    so they advance towards each other and fight.
+    Units of multi-unit cards are counted individually.
+
+    :return: List of (type ID, x, y, team) for each card to spawn
+    """
+
+    rng = random.Random(seed)
+    catalog = get_catalog()
+    placements = []
+    remaining = units
+
+    while remaining > 0:
+
+        type_id = CARD_IDS[rng.choice(TROOPS)]
+
+        if catalog[type_id]['count'] > remaining:
+            type_id = CARD_IDS['knight']
+
+        team = len(placements) % 2
+        x = rng.uniform(1, width - 1)
+        y = rng.uniform(1, height / 2 - 1)
+
+        placements.append((type_id, x, y if team == 0 else height - y, team))
+        remaining -= int(catalog[type_id]['count'])
+
+    return placements
+
+
+def make_engine(units: int, seed: int=0) -> GameEngine:
+    """
+    Creates an engine with the given number of running units on the board.
+    """
+
+    engine = GameEngine(TROOPS, TROOPS)
+    engine.reset(seed=seed)
+
+    for type_id, x, y, team in _placements(units, engine.width, engine.height, seed):
+        for unit in engine.arena.spawn(type_id, x, y, team):
+            engine.arena.start_entity(unit)
+
+    return engine
+
+
+def make_batched(units: int, num_games: int, seed: int=0) -> BatchedGameEngine:
+    """
+    Creates a batched engine with the same scenario in every game.
+    """
+
+    batched = BatchedGameEngine(num_games, TROOPS, TROOPS, seed=seed,
+                                capacity=max(64, units + 16))
+    catalog = batched.catalog
+
+    for type_id, x, y, team in _placements(units, batched.width, batched.height, seed):
+
+        count = int(catalog[type_id]['count'])
+
+        for game in range(num_games):
+            for index in range(count):
+                batched.spawn(game, x + 0.5 * index, y, team, catalog[type_id], type_id)
+
+    return batched
+
+
+def _fresh_legal_actions(engine: GameEngine) -> None:
+    """
+    Computes the legal actions of player 0, ignoring any cached mask.
+    """
+
+    engine.legal_keys = [None, None]
+    engine.legal_actions(0)
+
+
+def _query_points(engine: GameEngine, points: List[List[float]]) -> None:
+    """
+    Runs a radius query around each point.
+    """
+
+    for x, y in points:
+        engine.arena.query_radius(x, y, 5.5)
+
+
+def bench_single(units: List[int], repeat: int=5) -> List[Result]:
+    """
+    Benchmarks a single GameEngine on each scenario.
+    """
+
+    results = []
+
+    for count in units:
+
+        engine = make_engine(count)
+        restore = functools.partial(engine.restore, engine.snapshot())
+
+        rng = np.random.default_rng(count)
+        points = rng.uniform((0, 0), (engine.width, engine.height), size=(100, 2)).tolist()
+
+        results += [
+            Result('single', 'step', count,
+                   measure(engine.step, restore, number=30, repeat=repeat), 'frames/s'),
+            Result('single', 'legal_actions', count,
+                   measure(functools.partial(_fresh_legal_actions, engine),
+                           number=100, repeat=repeat),
+                   'calls/s'),
+            Result('single', 'make_image', count,
+                   measure(functools.partial(engine.make_image, 0), number=30, repeat=repeat),
+                   'frames/s'),
+            Result('single', 'make_features', count,
+                   measure(functools.partial(engine.make_features, 0), number=30, repeat=repeat),
+                   'frames/s'),
+            Result('single', 'query_radius', count,
+                   measure(functools.partial(_query_points, engine, points),
+                           number=5, repeat=repeat, work=len(points)),
+                   'queries/s'),
+            Result('single', 'collide', count,
+                   measure(functools.partial(collide_all, engine.arena), restore,
+                           number=30, repeat=repeat),
+                   'calls/s'),
+        ]
+
+    return results
+
+
+def _random_action(mask: np.ndarray, rng: np.random.Generator, rate: float=0.05) -> int:
+    """
+    Picks a random legal action some of the time,
+    otherwise an illegal action, which the environment treats as taking no action.
+    """
+
+    legal = np.flatnonzero(mask)
+
+    if len(legal) and rng.random() < rate:
+        return int(rng.choice(legal))
+
+    illegal = np.flatnonzero(~mask)
+
+    return int(illegal[0]) if len(illegal) else 0
+
+
+def bench_env(observation_mode: str, episodes: int=1, max_steps: int | None=None) -> Result:
+    """
+    Plays out full ClashRoyaleEnv episodes with a random policy.
+
+    :param observation_mode: Observation mode of the environment
+    :type observation_mode: str
+    :param episodes: Number of episodes to play, defaults to 1
+    :type episodes: int
+    :param max_steps: Stop each episode after this many steps, defaults to None (play it out)
+    :type max_steps: int | None
+    :return: Environment steps per second
+    :rtype: Result
+    """
+
+    # Import here, as gymnasium environments are not needed otherwise:
+    from clash_royale.envs.clash_royale_env import ClashRoyaleEnv  # pylint: disable=import-outside-toplevel
+
+    env = ClashRoyaleEnv(observation_mode=observation_mode)
+    rng = np.random.default_rng(0)
+    steps = 0
+
+    start = time.perf_counter()
+
+    for episode in range(episodes):
+
+        _, info = env.reset(seed=episode)
+        done = False
+
+        while not done and (max_steps is None or steps < (episode + 1) * max_steps):
+            _, _, terminated, truncated, info = env.step(_random_action(info['action_mask'], rng))
+            done = terminated or truncated
+            steps += 1
+
+    elapsed = time.perf_counter() - start
+    env.close()
+
+    return Result('single', f'env_{observation_mode}', None, steps / elapsed, 'steps/s')
+
+
+def bench_vector(num_envs: int=8, num_workers: int=2, steps: int=300) -> Result:
+    """
+    Steps a ClashRoyaleVectorEnv with a random policy.
+
+    :return: Environment steps per second, summed over all environments
+    :rtype: Result
+    """
+
+    # Import here, as worker processes are only needed by this benchmark:
+    from clash_royale.envs.clash_royale_vector_env import ClashRoyaleVectorEnv  # pylint: disable=import-outside-toplevel
+
+    envs = ClashRoyaleVectorEnv(num_envs, num_workers=num_workers, observation_mode='features')
+    rng = np.random.default_rng(0)
+
+    _, info = envs.reset(seed=0)
+
+    start = time.perf_counter()
+
+    for _ in range(steps):
+        actions = np.array([_random_action(mask, rng) for mask in info['action_mask']])
+        _, _, _, _, info = envs.step(actions)
+
+    elapsed = time.perf_counter() - start
+    envs.close()
+
+    return Result('vector', f'env_features_x{num_envs}', None, num_envs * steps / elapsed, 'steps/s')
+
+
+def _restore_batched(batched: BatchedGameEngine,
+                     frame: np.ndarray,
+                     columns: Dict[str, np.ndarray]) -> None:
+    """
+    Restores the frame counters and columns of a batched engine from copies.
+    """
+
+    batched.frame[:] = frame
+
+    for name, col in columns.items():
+        batched.columns[name][:] = col
+
+
+def bench_batched(units: List[int], num_games: int=64, repeat: int=5) -> List[Result]:
+    """
+    Benchmarks a BatchedGameEngine on each scenario.
+
+    Rates count the frames of every game, so they are comparable to single mode.
+    """
+
+    results = []
+
+    for count in units:
+
+        batched = make_batched(count, num_games)
+        restore = functools.partial(_restore_batched, batched, batched.frame.copy(),
+                                    {name: col.copy() for name, col in batched.columns.items()})
+
+        results += [
+            Result('batched', f'step_x{num_games}', count,
+                   measure(batched.step, restore, number=30, repeat=repeat, work=num_games),
+                   'frames/s'),
+            Result('batched', f'legal_actions_x{num_games}', count,
+                   measure(functools.partial(batched.legal_actions, 0),
+                           number=30, repeat=repeat, work=num_games),
+                   'calls/s'),
+        ]
+
+    return results
+
+
+def run(modes: List[str],
+        units: List[int],
+        repeat: int=5,
+        episodes: int=1,
+        max_steps: int | None=None) -> Dict[str, Any]:
+    """
+    Runs the benchmarks of the given modes.
+
+    :return: Report that can be written as JSON, see compare()
+    :rtype: Dict[str, Any]
+    """
+
+    results: List[Result] = []
+
+    if 'single' in modes:
+        results += bench_single(units, repeat=repeat)
+        results += [bench_env(mode, episodes=episodes, max_steps=max_steps) for mode in ('features', 'rgb')]
+
+    if 'vector' in modes:
+        results.append(bench_vector())
+
+    if 'batched' in modes:
+        results += bench_batched(units, repeat=repeat)
+
+    return {
+        'version': VERSION,
+        'meta': {
+            'date': datetime.datetime.now(datetime.timezone.utc).isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'platform': platform.platform(),
+            'processor': platform.processor(),
+        },
+        'results': [dict(dataclasses.asdict(result), key=result.key) for result in results],
+    }
+
+
+def compare(baseline: Dict[str, Any],
+            current: Dict[str, Any],
+            threshold: float=0.1) -> List[Tuple[str, float | None, float | None, str]]:
+    """
+    Compares two reports created by run().
+
+    A benchmark has regressed if its rate dropped by more than 'threshold' (a fraction),
+    and improved if its rate rose by more than 'threshold'.
+
+    :param baseline: Report to compare against
+    :type baseline: Dict[str, Any]
+    :param current: Report to compare
+    :type current: Dict[str, Any]
+    :param threshold: Relative change that is considered significant, defaults to 0.1
+    :type threshold: float
+    :return: (key, baseline rate, current rate, status) for every benchmark in either report
+    :rtype: List[Tuple[str, float | None, float | None, str]]
+    """
+
+    old = {result['key']: result['rate'] for result in baseline['results']}
+    new = {result['key']: result['rate'] for result in current['results']}
+
+    rows = []
+
+    for key in list(old) + [key for key in new if key not in old]:
+
+        before = old.get(key)
+        after = new.get(key)
+
+        if before is None:
+            status = 'new'
+        elif after is None:
+            status = 'missing'
+        elif after < before * (1 - threshold):
+            status = 'regressed'
+        elif after > before * (1 + threshold):
+            status = 'improved'
+        else:
+            status = 'ok'
+
+        rows.append((key, before, after, status))
+
+    return rows
+
+
+def _load(path: str) -> Dict[str, Any]:
+
+    with open(path, encoding='utf-8') as file:
+        report = json.load(file)
+
+    if report.get('version') != VERSION:
+        raise ValueError(f"{path} is not a version {VERSION} benchmark report!")
+
+    return report
+
+
+def main(argv: List[str] | None=None) -> int:
+    """
+    Runs or compares benchmarks, see the module docstring.
+
+    :return: Exit status, 1 if a comparison found a regression
+    :rtype: int
+    """
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    run_parser = commands.add_parser('run', help="Run benchmarks and write a report")
+    run_parser.add_argument('--output', '-o', default=None, help="JSON file to write, defaults to stdout")
+    run_parser.add_argument('--modes', nargs='+', choices=MODES, default=list(MODES))
+    run_parser.add_argument('--units', type=int, nargs='+', default=UNITS)
+    run_parser.add_argument('--repeat', type=int, default=5)
+    run_parser.add_argument('--episodes', type=int, default=1)
+    run_parser.add_argument('--max-steps', type=int, default=None,
+                            help="Cut environment episodes short after this many steps")
+
+    compare_parser = commands.add_parser('compare', help="Compare a report against a baseline")
+    compare_parser.add_argument('baseline')
+    compare_parser.add_argument('current')
+    compare_parser.add_argument('--threshold', type=float, default=0.1,
+                                help="Relative slowdown that counts as a regression")
+
+    args = parser.parse_args(argv)
+
+    if args.command == 'run':
+
+        report = run(args.modes, args.units, repeat=args.repeat,
+                     episodes=args.episodes, max_steps=args.max_steps)
+
+        for result in report['results']:
+            print(f"{result['key']:>36} {result['rate']:>14.1f} {result['unit']}", file=sys.stderr)
+
+        text = json.dumps(report, indent=2)
+
+        if args.output is None:
+            print(text)
+        else:
+            with open(args.output, 'w', encoding='utf-8') as file:
+                file.write(text)
+
+        return 0
+
+    rows = compare(_load(args.baseline), _load(args.current), threshold=args.threshold)
+
+    print(f"{'benchmark':>36} {'baseline':>14} {'current':>14} {'change':>8}  status")
+
+    for key, before, after, status in rows:
+
+        change = f'{after / before - 1:+.1%}' if before and after else '-'
+        before_text = '-' if before is None else f'{before:.1f}'
+        after_text = '-' if after is None else f'{after:.1f}'
+
+        print(f"{key:>36} {before_text:>14} {after_text:>14} {change:>8}  {status}")
+
+    regressed = [row for row in rows if row[3] == 'regressed']
+
+    if regressed:
+        print(f"{len(regressed)} benchmark(s) regressed by more than {args.threshold:.0%}")
+        return 1
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,304 @@
+"""
+On-disk trajectory datasets
+
+This file contains components for writing rollouts to disk as they are generated,
+and reading them back for offline training.
+
+A dataset is a directory with the following layout:
+
+    meta.json             - Version, chunk size, number of rows, and the shape and dtype of each field
+    episodes.bin          - int64 (start, length, flags) for each finished episode
+    <field>.<chunk>.npy   - Rows [chunk * chunk_size, (chunk + 1) * chunk_size) of a field
+
+Each row is one transition: the observation an action was taken from,
+the action, the legal action mask, and the resulting reward and episode flags.
+Dictionary observations get one field per key, named 'obs.<key>'.
+
+Fields are split into fixed size chunks that are memory-mapped,
+so neither the writer nor the reader ever holds more than it touches in memory.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+from typing import Any, Dict, List, Tuple
+
+import numpy as np
+import numpy.typing as npt
+
+VERSION: int = 1
+
+# Flags of each episode in the index:
+TERMINATED: int = 1
+TRUNCATED: int = 2
+
+
+def _chunk_path(root: str, name: str, chunk: int) -> str:
+    return os.path.join(root, f'{name}.{chunk:05d}.npy')
+
+
+def _flatten(obs: npt.NDArray | Dict[str, npt.NDArray]) -> Dict[str, npt.NDArray]:
+    """
+    Splits an observation into its fields.
+    """
+
+    if isinstance(obs, dict):
+        return {f'obs.{key}': np.asarray(value) for key, value in obs.items()}
+
+    return {'obs': np.asarray(obs)}
+
+
+class TrajectoryWriter:
+    """
+    TrajectoryWriter - Streams transitions into a dataset
+
+    Fields are determined from the first transition that is added.
+    Episodes end when a transition is terminated or truncated,
+    or when the episode reaches 'max_episode_steps' transitions,
+    in which case the last transition is marked as truncated.
+    An episode that is still running when the writer is closed is not indexed.
+
+    Writers should be closed (or used as a context manager),
+    otherwise rows written since the last flush may not be recorded in meta.json.
+    """
+
+    def __init__(self, root: str, chunk_size: int=4096, max_episode_steps: int | None=14400) -> None:
+
+        self.root: str = root  # Directory of the dataset
+        self.chunk_size: int = chunk_size  # Rows per chunk file
+        self.max_episode_steps: int | None = max_episode_steps
+
+        self.size: int = 0  # Number of rows written
+        self.episode_start: int = 0  # Row the current episode started on
+
+        self.fields: Dict[str, Tuple[Tuple[int, ...], np.dtype]] = {}
+        self.chunks: Dict[str, np.memmap] = {}  # Chunk currently being written, per field
+
+        os.makedirs(root, exist_ok=True)
+
+        self.index = open(os.path.join(root, 'episodes.bin'), 'wb')
+
+    def __enter__(self) -> TrajectoryWriter:
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+    def add(self,
+            obs: npt.NDArray | Dict[str, npt.NDArray],
+            action: int,
+            action_mask: npt.NDArray[np.bool_],
+            reward: float,
+            terminated: bool,
+            truncated: bool) -> None:
+        """
+        Appends a transition.
+
+        :param obs: Observation the action was taken from
+        :type obs: npt.NDArray | Dict[str, npt.NDArray]
+        :param action: Action taken
+        :type action: int
+        :param action_mask: Legal actions for the observation
+        :type action_mask: npt.NDArray[np.bool_]
+        :param reward: Reward for the action
+        :type reward: float
+        :param terminated: Whether the episode terminated after the action
+        :type terminated: bool
+        :param truncated: Whether the episode was truncated after the action
+        :type truncated: bool
+        """
+
+        if self.max_episode_steps is not None and \
+                self.size + 1 - self.episode_start >= self.max_episode_steps:
+            truncated = True
+
+        row = {
+            **_flatten(obs),
+            'action': np.int64(action),
+            'action_mask': np.asarray(action_mask, dtype=bool),
+            'reward': np.float32(reward),
+            'terminated': np.bool_(terminated),
+            'truncated': np.bool_(truncated),
+        }
+
+        if not self.fields:
+            self.fields = {name: (value.shape, value.dtype) for name, value in row.items()}
+            self._write_meta()
+
+        # Open the next chunk if needed:
+
+        offset = self.size % self.chunk_size
+
+        if offset == 0:
+            self._open_chunk(self.size // self.chunk_size)
+
+        for name, value in row.items():
+            self.chunks[name][offset] = value
+
+        self.size += 1
+
+        if terminated or truncated:
+            flags = TERMINATED * bool(terminated) | TRUNCATED * bool(truncated)
+            self.index.write(np.array([self.episode_start, self.size - self.episode_start, flags],
+                                      dtype=np.int64).tobytes())
+            self.episode_start = self.size
+
+    def _open_chunk(self, chunk: int) -> None:
+        """
+        Flushes the current chunks, and creates the files for the next chunk.
+        """
+
+        self.flush()
+
+        self.chunks = {
+            name: np.lib.format.open_memmap(_chunk_path(self.root, name, chunk), mode='w+',
+                                            dtype=dtype, shape=(self.chunk_size, *shape))
+            for name, (shape, dtype) in self.fields.items()
+        }
+
+    def _write_meta(self) -> None:
+        meta = {
+            'version': VERSION,
+            'chunk_size': self.chunk_size,
+            'size': self.size,
+            'max_episode_steps': self.max_episode_steps,
+            'fields': {name: {'shape': list(shape), 'dtype': dtype.str}
+                       for name, (shape, dtype) in self.fields.items()},
+        }
+
+        with open(os.path.join(self.root, 'meta.json'), 'w', encoding='utf-8') as file:
+            json.dump(meta, file, indent=2)
+
+    def flush(self) -> None:
+        """
+        Writes all rows added so far to disk.
+        """
+
+        for chunk in self.chunks.values():
+            chunk.flush()
+
+        self.index.flush()
+
+        if self.fields:
+            self._write_meta()
+
+    def close(self) -> None:
+        """
+        Flushes and closes the dataset.
+        """
+
+        if self.index.closed:
+            return
+
+        self.flush()
+        self.chunks = {}
+        self.index.close()
+
+
+class TrajectoryDataset:
+    """
+    TrajectoryDataset - Reads a dataset created by TrajectoryWriter
+
+    Chunk files are opened as memory maps,
+    so only the rows that are actually read are loaded from disk.
+    Slices that fall within a single chunk are returned as views of the memory map,
+    anything else is gathered into a new array.
+    """
+
+    def __init__(self, root: str) -> None:
+
+        self.root: str = root
+
+        with open(os.path.join(root, 'meta.json'), encoding='utf-8') as file:
+            meta = json.load(file)
+
+        if meta['version'] != VERSION:
+            raise ValueError(f"Unsupported dataset version: {meta['version']}")
+
+        self.chunk_size: int = meta['chunk_size']
+        self.size: int = meta['size']
+        self.fields: List[str] = list(meta['fields'])
+
+        num_chunks = -(-self.size // self.chunk_size)
+
+        self.chunks: Dict[str, List[np.memmap]] = {
+            name: [np.load(_chunk_path(root, name, chunk), mmap_mode='r') for chunk in range(num_chunks)]
+            for name in self.fields
+        }
+
+        # (start, length, flags) of each finished episode:
+
+        self.episodes: npt.NDArray[np.int64] = np.fromfile(
+            os.path.join(root, 'episodes.bin'), dtype=np.int64).reshape(-1, 3)
+
+    def __len__(self) -> int:
+        return self.size
+
+    def get(self, start: int, stop: int) -> Dict[str, npt.NDArray]:
+        """
+        Reads rows [start, stop) of every field.
+
+        :return: Mapping of field name to rows
+        :rtype: Dict[str, npt.NDArray]
+        """
+
+        first, offset = divmod(start, self.chunk_size)
+
+        if stop - first * self.chunk_size <= self.chunk_size:
+            return {name: chunks[first][offset:offset + stop - start]
+                    for name, chunks in self.chunks.items()}
+
+        return self.gather(np.arange(start, stop))
+
+    def gather(self, rows: npt.NDArray[np.int64]) -> Dict[str, npt.NDArray]:
+        """
+        Reads arbitrary rows of every field.
+
+        :param rows: Rows to read
+        :type rows: npt.NDArray[np.int64]
+        :return: Mapping of field name to rows, in the order requested
+        :rtype: Dict[str, npt.NDArray]
+        """
+
+        rows = np.asarray(rows, dtype=np.int64)
+        chunk, offset = np.divmod(rows, self.chunk_size)
+
+        out: Dict[str, Any] = {}
+
+        for name, chunks in self.chunks.items():
+
+            buffer = np.empty((len(rows), *chunks[0].shape[1:]), dtype=chunks[0].dtype)
+
+            for index in np.unique(chunk).tolist():
+                mask = chunk == index
+                buffer[mask] = chunks[index][offset[mask]]
+
+            out[name] = buffer
+
+        return out
+
+    def episode(self, index: int) -> Dict[str, npt.NDArray]:
+        """
+        Reads every row of a finished episode.
+        """
+
+        start, length, _ = self.episodes[index].tolist()
+
+        return self.get(start, start + length)
+
+    def sample(self, batch_size: int, rng: np.random.Generator | None=None) -> Dict[str, npt.NDArray]:
+        """
+        Reads a random minibatch of rows.
+
+        :param batch_size: Number of rows to sample
+        :type batch_size: int
+        :param rng: Random generator to use, defaults to None (a new unseeded generator)
+        :type rng: np.random.Generator | None
+        :return: Mapping of field name to rows
+        :rtype: Dict[str, npt.NDArray]
+        """
+
+        rng = rng or np.random.default_rng()
+
+        return self.gather(np.sort(rng.integers(0, self.size, size=batch_size)))
@@ -1 +1,34 @@
-from clash_royale.envs.clash_royale_env import ClashRoyaleEnv
\ No newline at end of file
+"""
+This submodule contains the Clash Royale environments.
+
+Environments are imported when they are first accessed,
+so importing this package (which gymnasium does to find the entry points)
+only loads the environment that is actually requested.
+"""
+
+from __future__ import annotations
+
+import importlib
+from typing import TYPE_CHECKING, Any, Dict
+
+if TYPE_CHECKING:
+    from clash_royale.envs.clash_royale_env import ClashRoyaleEnv
+    from clash_royale.envs.clash_royale_vector_env import ClashRoyaleVectorEnv
+
+__all__ = ['ClashRoyaleEnv', 'ClashRoyaleVectorEnv']
+
+# Module each environment is defined in:
+_MODULES: Dict[str, str] = {
+    'ClashRoyaleEnv': 'clash_royale.envs.clash_royale_env',
+    'ClashRoyaleVectorEnv': 'clash_royale.envs.clash_royale_vector_env',
+}
+
+
+def __getattr__(name: str) -> Any:
+    if name in _MODULES:
+        return getattr(importlib.import_module(_MODULES[name]), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted(list(globals()) + __all__)
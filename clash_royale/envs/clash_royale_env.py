@@ -1,27 +1,68 @@
 from __future__ import annotations
-from typing import Tuple
+from typing import Dict, List, Tuple
 
 import numpy as np
-import pygame
+import numpy.typing as npt
 
 import gymnasium as gym
 from gymnasium import spaces
 
 from clash_royale.envs.game_engine.game_engine import GameEngine
+from clash_royale.envs.game_engine.card import Card
+from clash_royale.envs.game_engine.catalog import CARDS
+from clash_royale.envs.game_engine.features import PLANES
+
+# Deck used when none is provided, as card names from the catalog:
+DEFAULT_DECK: List[str] = ['knight', 'archers', 'giant', 'musketeer',
+                           'mini_pekka', 'valkyrie', 'skeletons', 'goblins']
 
-class ClashRoyaleEnv(gym.Env):
-    metadata = {"render_modes": ["human", "rgb_array"], "render_fps": 16}
 
-    def __init__(self, render_mode: str | None=None, width: int=18, height: int=32):
+class ClashRoyaleEnv(gym.Env):
+    metadata = {"render_modes": ["human", "rgb_array"], "render_fps": 16,
+                "observation_modes": ["rgb", "features"]}
+
+    def __init__(self,
+                 render_mode: str | None=None,
+                 width: int=18,
+                 height: int=32,
+                 deck1: List[str | int | Card] | None=None,
+                 deck2: List[str | int | Card] | None=None,
+                 observation_mode: str="rgb",
+                 renderer: str="numpy"):
         self.width: int = width  # The size of the square grid
         self.height: int = height
-        resolution: Tuple[int, int] = (128, 128)
-
-        self.observation_space = spaces.Dict(
-        )
-
-        self.action_space = spaces.Discrete(1)
-
+        self.resolution: Tuple[int, int] = (128, 128)
+
+        assert observation_mode in self.metadata["observation_modes"]
+        self.observation_mode: str = observation_mode
+
+        if observation_mode == "rgb":
+            self.observation_space = spaces.Box(
+                low=0, high=255, shape=(*self.resolution, 3), dtype=np.uint8
+            )
+        else:
+            self.observation_space = spaces.Dict({
+                "planes": spaces.Box(low=0, high=np.inf, shape=(len(PLANES), height, width),
+                                     dtype=np.float32),
+                "elixir": spaces.Box(low=0, high=10, shape=(1,), dtype=np.float32),
+                "hand": spaces.Box(low=0, high=len(CARDS) - 1, shape=(4,), dtype=np.int64),
+                "hand_elixir": spaces.Box(low=0, high=10, shape=(4,), dtype=np.int64),
+                "next": spaces.Box(low=0, high=len(CARDS) - 1, shape=(1,), dtype=np.int64),
+            })
+
+        # Actions are flattened (y, x, card index) triples, see legal_actions():
+        self.action_space = spaces.Discrete(height * width * 4)
+
+        if deck1 is None:
+            deck1 = DEFAULT_DECK
+        if deck2 is None:
+            deck2 = DEFAULT_DECK
+
+        self.engine: GameEngine = GameEngine(list(deck1), list(deck2),
+                                             width=width, height=height,
+                                             resolution=self.resolution,
+                                             fps=self.metadata["render_fps"],
+                                             renderer=renderer)
 
         assert render_mode is None or render_mode in self.metadata["render_modes"]
         self.render_mode = render_mode
@@ -34,25 +75,85 @@ class ClashRoyaleEnv(gym.Env):
         first time.
         """
         self.window = None
-        self.clock = None 
+        self.clock = None
 
-    def _get_obs(self):
-        pass
+    def _get_obs(self) -> npt.NDArray[np.uint8] | Dict[str, npt.NDArray]:
+        if self.observation_mode == "features":
+            return self.engine.make_features(0)
+        return self.engine.make_image(0)
 
-    def _get_info(self):
-        pass
+    def _get_info(self) -> dict:
+        # The engine updates its mask in place, so hand out a copy:
+        return {"action_mask": self.engine.legal_actions_flat(0).copy()}
+
+    def _decode_action(self, action: int) -> Tuple[int, int, int]:
+        """
+        Converts a flat action into an (x, y, card index) action.
+        """
+
+        tile, card_index = divmod(int(action), 4)
+        y, x = divmod(tile, self.width)
+
+        return x, y, card_index
 
     def reset(self, seed=None, options=None):
-        pass
+        super().reset(seed=seed)
+
+        # Derive the game seed from our generator, so seeding the env seeds the game:
+
+        self.engine.reset(seed=int(self.np_random.integers(1 << 63)))
+
+        if self.render_mode == "human":
+            self._render_frame()
+
+        return self._get_obs(), self._get_info()
 
     def step(self, action):
-        pass
+
+        # Illegal actions are treated as taking no action:
+
+        if self.engine.legal_actions_flat(0)[action]:
+            self.engine.apply(0, self._decode_action(action))
+
+        self.engine.step()
+
+        terminated = self.engine.is_terminal()
+        reward = 0
+
+        if terminated:
+            reward = {1: 1, 0: -1}.get(self.engine.terminal_value(), 0)
+
+        if self.render_mode == "human":
+            self._render_frame()
+
+        return self._get_obs(), reward, terminated, False, self._get_info()
 
     def render(self):
-        pass
+        if self.render_mode == "rgb_array":
+            return self.engine.make_image(0)
 
     def _render_frame(self):
-        pass
+        # pygame is only needed to display frames, so only import it here:
+        import pygame  # pylint: disable=import-outside-toplevel
+
+        if self.window is None:
+            pygame.init()
+            pygame.display.init()
+            self.window = pygame.display.set_mode(self.resolution)
+        if self.clock is None:
+            self.clock = pygame.time.Clock()
+
+        surface = pygame.surfarray.make_surface(self.engine.make_image(0))
+        self.window.blit(surface, (0, 0))
+        pygame.event.pump()
+        pygame.display.update()
+
+        self.clock.tick(self.metadata["render_fps"])
 
     def close(self):
-        pass
+        if self.window is not None:
+            import pygame  # pylint: disable=import-outside-toplevel
+
+            pygame.display.quit()
+            pygame.quit()
+            self.window = None
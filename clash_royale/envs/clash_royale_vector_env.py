@@ -0,0 +1,282 @@
+"""
+Vectorized Clash Royale environment
+
+This file contains a vector environment that shards ClashRoyaleEnv instances
+across worker processes.
+Instead of sending observations back through pipes,
+workers write observations, rewards, episode flags and action masks
+straight into shared memory buffers,
+and pipes are only used to send small commands.
+"""
+
+from __future__ import annotations
+
+import multiprocessing as mp
+from multiprocessing.connection import Connection
+from typing import Any, Dict, List, Tuple
+
+import numpy as np
+import numpy.typing as npt
+
+from gymnasium import spaces
+from gymnasium.vector import AutoresetMode, VectorEnv
+from gymnasium.vector.utils import batch_space
+
+from clash_royale.envs.clash_royale_env import ClashRoyaleEnv
+
+
+def _buffer_specs(num_envs: int, env: ClashRoyaleEnv) -> Dict[str, Tuple[Tuple[int, ...], np.dtype]]:
+    """
+    Determines the shape and type of each shared buffer.
+
+    Dictionary observations get one buffer per key, named 'obs/<key>'.
+    """
+
+    space = env.observation_space
+
+    if isinstance(space, spaces.Dict):
+        obs = {f'obs/{key}': ((num_envs, *sub.shape), np.dtype(sub.dtype))
+               for key, sub in space.spaces.items()}
+    else:
+        obs = {'obs': ((num_envs, *space.shape), np.dtype(space.dtype))}
+
+    return {
+        **obs,
+        'actions': ((num_envs,), np.dtype(np.int64)),
+        'rewards': ((num_envs,), np.dtype(np.float64)),
+        'terminations': ((num_envs,), np.dtype(bool)),
+        'truncations': ((num_envs,), np.dtype(bool)),
+        'action_mask': ((num_envs, env.action_space.n), np.dtype(bool)),
+    }
+
+
+def _as_arrays(raw: Dict[str, Any],
+               specs: Dict[str, Tuple[Tuple[int, ...], np.dtype]]) -> Dict[str, npt.NDArray]:
+    """
+    Creates NumPy views over raw shared buffers.
+    """
+
+    return {name: np.frombuffer(raw[name], dtype=dtype).reshape(shape)
+            for name, (shape, dtype) in specs.items()}
+
+
+def _worker(pipe: Connection,
+            parent_pipe: Connection,
+            raw: Dict[str, Any],
+            specs: Dict[str, Tuple[Tuple[int, ...], np.dtype]],
+            start: int,
+            stop: int,
+            env_kwargs: Dict[str, Any],
+            max_episode_steps: int | None) -> None:
+    """
+    Runs the environments in [start, stop), writing results into the shared buffers.
+
+    We autoreset environments on the step after their episode ends,
+    the same as gymnasium's next-step autoreset mode.
+    """
+
+    parent_pipe.close()
+
+    envs = [ClashRoyaleEnv(**env_kwargs) for _ in range(start, stop)]
+    buffers = _as_arrays(raw, specs)
+
+    steps = np.zeros(stop - start, dtype=np.int64)
+    needs_reset = np.zeros(stop - start, dtype=bool)
+
+    def write(index: int, obs, reward, terminated, truncated, info) -> None:
+        slot = start + index
+        if isinstance(obs, dict):
+            for key, value in obs.items():
+                buffers[f'obs/{key}'][slot] = value
+        else:
+            buffers['obs'][slot] = obs
+        buffers['rewards'][slot] = reward
+        buffers['terminations'][slot] = terminated
+        buffers['truncations'][slot] = truncated
+        buffers['action_mask'][slot] = info['action_mask']
+
+    try:
+        while True:
+
+            command, data = pipe.recv()
+
+            if command == 'reset':
+
+                seeds, options = data
+
+                for index, env in enumerate(envs):
+                    obs, info = env.reset(seed=seeds[start + index], options=options)
+                    write(index, obs, 0, False, False, info)
+
+                steps[:] = 0
+                needs_reset[:] = False
+
+            elif command == 'step':
+
+                for index, env in enumerate(envs):
+
+                    if needs_reset[index]:
+                        obs, info = env.reset()
+                        write(index, obs, 0, False, False, info)
+                        steps[index] = 0
+                        needs_reset[index] = False
+                        continue
+
+                    obs, reward, terminated, truncated, info = env.step(
+                        buffers['actions'][start + index])
+
+                    steps[index] += 1
+
+                    if max_episode_steps is not None and steps[index] >= max_episode_steps:
+                        truncated = True
+
+                    write(index, obs, reward, terminated, truncated, info)
+                    needs_reset[index] = terminated or truncated
+
+            elif command == 'close':
+                pipe.send((True, None))
+                break
+
+            else:
+                raise RuntimeError(f"Unknown command: {command}")
+
+            pipe.send((True, None))
+
+    except Exception as e:  # pylint: disable=broad-exception-caught
+        pipe.send((False, repr(e)))
+
+    finally:
+        for env in envs:
+            env.close()
+        pipe.close()
+
+
+class ClashRoyaleVectorEnv(VectorEnv):
+    """
+    ClashRoyaleVectorEnv - Many ClashRoyaleEnv instances across worker processes
+
+    The 'num_envs' environments are split into contiguous shards,
+    one per worker process.
+    Actions, observations, rewards, episode flags and action masks
+    are all exchanged through shared memory,
+    so the only thing sent through pipes is the command to preform.
+
+    Action masks are returned in the info dictionary under 'action_mask'.
+    Episodes are truncated after 'max_episode_steps' steps,
+    and environments are reset on the step after their episode ends.
+    """
+
+    metadata = {"autoreset_mode": AutoresetMode.NEXT_STEP, "render_modes": []}
+
+    def __init__(self,
+                 num_envs: int,
+                 num_workers: int | None=None,
+                 max_episode_steps: int | None=14400,
+                 context: str | None=None,
+                 copy: bool=True,
+                 **env_kwargs) -> None:
+
+        self.num_envs: int = num_envs
+        self.copy: bool = copy  # Return copies of the shared buffers
+
+        num_workers = min(num_envs, num_workers or mp.cpu_count())
+
+        # Create a local environment to determine the spaces:
+
+        dummy = ClashRoyaleEnv(**env_kwargs)
+
+        self.single_observation_space = dummy.observation_space
+        self.single_action_space = dummy.action_space
+        self.observation_space = batch_space(self.single_observation_space, num_envs)
+        self.action_space = batch_space(self.single_action_space, num_envs)
+
+        specs = _buffer_specs(num_envs, dummy)
+        dummy.close()
+
+        # Allocate shared buffers:
+
+        ctx = mp.get_context(context)
+
+        raw = {name: ctx.RawArray('b', int(np.prod(shape)) * dtype.itemsize)
+               for name, (shape, dtype) in specs.items()}
+
+        self._buffers: Dict[str, npt.NDArray] = _as_arrays(raw, specs)
+
+        # Start the workers, each with a contiguous shard:
+
+        bounds = np.linspace(0, num_envs, num_workers + 1).astype(int)
+
+        self._pipes: List[Connection] = []
+        self._processes: List[mp.process.BaseProcess] = []
+
+        for start, stop in zip(bounds[:-1], bounds[1:]):
+
+            parent, child = ctx.Pipe()
+
+            process = ctx.Process(target=_worker,
+                                  args=(child, parent, raw, specs, int(start), int(stop),
+                                        env_kwargs, max_episode_steps),
+                                  daemon=True)
+            process.start()
+            child.close()
+
+            self._pipes.append(parent)
+            self._processes.append(process)
+
+    def _call(self, command: str, data: Any=None) -> None:
+        """
+        Sends a command to every worker, and waits for them to finish.
+        """
+
+        for pipe in self._pipes:
+            pipe.send((command, data))
+
+        errors = [message for success, message in (pipe.recv() for pipe in self._pipes)
+                  if not success]
+
+        if errors:
+            raise RuntimeError(f"Worker failed: {errors[0]}")
+
+    def _output(self, name: str) -> npt.NDArray:
+        return self._buffers[name].copy() if self.copy else self._buffers[name]
+
+    def _observations(self) -> npt.NDArray | Dict[str, npt.NDArray]:
+        if isinstance(self.single_observation_space, spaces.Dict):
+            return {key: self._output(f'obs/{key}')
+                    for key in self.single_observation_space.spaces}
+        return self._output('obs')
+
+    def reset(self, *, seed: int | List[int | None] | None=None, options: dict | None=None):
+        super().reset(seed=seed, options=options)
+
+        if seed is None or isinstance(seed, int):
+            seeds = [None if seed is None else seed + i for i in range(self.num_envs)]
+        else:
+            seeds = list(seed)
+
+        self._call('reset', (seeds, options))
+
+        return self._observations(), {'action_mask': self._output('action_mask')}
+
+    def step(self, actions):
+        self._buffers['actions'][:] = actions
+
+        self._call('step')
+
+        return (self._observations(),
+                self._output('rewards'),
+                self._output('terminations'),
+                self._output('truncations'),
+                {'action_mask': self._output('action_mask')})
+
+    def close_extras(self, **kwargs) -> None:
+        for pipe in self._pipes:
+            try:
+                pipe.send(('close', None))
+                pipe.recv()
+            except (BrokenPipeError, EOFError):
+                pass
+            pipe.close()
+
+        for process in self._processes:
+            process.join()
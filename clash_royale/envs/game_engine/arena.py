@@ -6,17 +6,31 @@ The components defined here are probably what end users want to utilize,
 as they will greatly simplify the simulation procedure.
 """
 
-from typing import TYPE_CHECKING, List
+from __future__ import annotations
+
+import math
+import time
+from typing import TYPE_CHECKING, Any, List, Tuple
 
 import numpy as np
 import numpy.typing as npt
 
 from clash_royale.envs.game_engine.entities.entity import Entity, EntityCollection
+from clash_royale.envs.game_engine.entities.tower import Tower, tower_layout
+from clash_royale.envs.game_engine.entities.troop import Troop
 from clash_royale.envs.game_engine.card import Card
+from clash_royale.envs.game_engine.catalog import get_catalog
+from clash_royale.envs.game_engine.spatial import SpatialGrid
+from clash_royale.envs.game_engine.pathing import BridgeFields, bridge_fields, flow_field, tower_goals
+from clash_royale.envs.game_engine.logic.target import target_all
+from clash_royale.envs.game_engine.logic.movement import move_all
+from clash_royale.envs.game_engine.logic.attack import attack_all
+from clash_royale.envs.game_engine.logic.collision import collide, collide_all, layers
 
 if TYPE_CHECKING:
     # Only import for typechecking to prevent circular dependency
     from clash_royale.envs.game_engine.game_engine import GameEngine
+    from clash_royale.envs.game_engine.profiling import Profiler
 
 class Arena(EntityCollection):
     """
@@ -31,34 +45,693 @@ class Arena(EntityCollection):
     Methods for adding and removing entities are also available.
 
     TODO: Need to figure out frame independent timekeeping  
+
+    By default, entity data is kept in an array-backed EntityStore,
+    so per-frame passes can operate on whole columns at once.
+
+    We also maintain a spatial index of all loaded entities,
+    which should be used for any position based lookups via query_radius().
+    Nothing in a step reads the index when entities are kept in a store,
+    so it is only brought up to date when it is queried.
+
+    By default, spawned units are pooled, see EntityCollection.acquire().
+
+    Units path around the river using flow fields (see pathing).
+    Fields for crossing the bridges are shared by every arena of the same size,
+    and the lanes leading each team to the enemy towers
+    are only rebuilt when a tower falls, see lane_fields().
     """
 
-    def __init__(self, width: int =8, height: int=18) -> None:
+    def __init__(self,
+                 width: int =8,
+                 height: int=18,
+                 use_store: bool=True,
+                 fps: int=30,
+                 use_pool: bool=True) -> None:
 
-        super().__init__()
+        super().__init__(use_store=use_store, use_pool=use_pool)
 
         self.width: int = width  # Width of arena
         self.height: int = height  # Height of arena
+        self.fps: int = fps  # Frame rate of the simulation
+
+        self.catalog: npt.NDArray[np.void] = get_catalog(fps)  # Entity stats at our frame rate
 
         self.engine: GameEngine  # Game engine that is managing this arena
+        self.frame: int = 0  # Number of frames simulated
+        self.towers: List[Tower] = []  # Towers placed at the start of the game
+
+        self.grid: SpatialGrid = SpatialGrid(width=width, height=height)  # Spatial index
+        self.grid_dirty: bool = False  # True if entities may have moved since the index was updated
+
+        # Next change in the arena, determined by the last step, see next_event_frame():
+
+        self.next_change: int | None = None  # Frame of the next change, None if nothing will change
+        self.settled_running: int = -1  # Running entities after the last step, -1 if outdated
+        self.profiler: Profiler | None = None  # Profiler of the simulation, if any
+
+        # Flow fields for pathing:
+
+        self.bridges: BridgeFields = bridge_fields(width, height)
+        self.lanes: npt.NDArray[np.float64] | None = None  # Lane of each team, None if outdated
+
+        # Tiles each player can place cards on, see set_placement_mask():
+
+        self.placement_masks: npt.NDArray[np.bool_] = np.ones((2, height, width), dtype=bool)
+        self.placement_version: int = 0  # Incremented whenever placement territory changes
 
     def reset(self) -> None:
-        pass
+        """
+        Resets the arena to the start of a game.
+
+        We unload all entities, and start a fresh set of towers.
+        """
+
+        self.frame = 0
+        self.lanes = None
+
+        self.unload_many(self.entities)
+
+        self.towers = [Tower(*tower, fps=self.fps) for tower in tower_layout(self.width, self.height)]
+
+        self.load_many(self.towers, self.catalog[[tower.type_id for tower in self.towers]])
+
+        self.start()
+
+    def snapshot(self) -> Tuple[Any, ...]:
+        """
+        Captures the state of the arena.
+
+        Entity data is captured by copying the columns of the store,
+        so the arena must keep its entities in an EntityStore.
+
+        :return: Snapshot that can be passed to restore()
+        :rtype: Tuple[Any, ...]
+        """
+
+        if self.store is None:
+            raise ValueError("Arena snapshots require an EntityStore!")
+
+        return (self.frame,
+                list(self.entities),
+                list(self.towers),
+                self.store.snapshot(),
+                self.placement_masks.copy(),
+                self.num_loaded,
+                self.max_loaded)
+
+    def restore(self, snapshot: Tuple[Any, ...]) -> None:
+        """
+        Restores the state of the arena from a snapshot.
+
+        The spatial index is rebuilt from the restored positions when it is next queried,
+        and the placement version is advanced,
+        so any cached placement data is recomputed.
+        Lanes are rebuilt as well, as the standing towers may differ.
+
+        Pooled entities that are not in the snapshot go back to their pool,
+        and entities in the snapshot are taken out of it.
+
+        :param snapshot: Snapshot created by snapshot()
+        :type snapshot: Tuple[Any, ...]
+        """
+
+        frame, entities, towers, store, masks, num_loaded, max_loaded = snapshot
+
+        # Pooled entities that only exist after the snapshot can be recycled:
+
+        kept = set(entities)
+        dropped = [ent for ent in self.entities if ent.pooled and ent not in kept]
+
+        self.frame = frame
+        self.entities = list(entities)
+        self.towers = list(towers)
+        self.num_loaded = num_loaded
+        self.max_loaded = max_loaded
+
+        self.store.restore(store)
+        self._reindex()
+
+        if self.pools is not None:
+
+            for ent in dropped:
+                self.release(ent)
+
+            self.reclaim(self.entities)
+
+        for ent in self.entities:
+            ent.collection = self
+
+        self.grid.clear()
+        self.grid_dirty = True
+
+        self.placement_masks[:] = masks
+        self.placement_version += 1
+
+        self.lanes = None
+        self.settled_running = -1
+
+    def step(self, frames: int=1) -> int | None:
+        """
+        Steps the simulation through a number of frames.
+
+        Entities target and attack once, at the start of the step,
+        and then move for all of the frames at once,
+        so stepping many frames is only the same as stepping frame by frame
+        up to the next change in the arena.
+        We determine the next change from the work done during the step,
+        see next_event_frame().
+
+        :param frames: Number of frames to step
+        :type frames: int
+        :return: Frame of the next change, None if nothing will change
+        :rtype: int | None
+        """
+
+        prof = self.profiler
+
+        if prof is not None:
+            self._profile_counts(prof)
+            prof.begin()
+
+        # Determine targets for all entities:
+
+        self._target()
+
+        if prof is not None:
+            prof.lap('arena.target')
+
+        # Preform all attacks:
+
+        self._attack()
+
+        if prof is not None:
+            prof.lap('arena.attack')
+
+        # Move all entities:
+
+        changed = self._move(frames)
+
+        if prof is not None:
+            prof.lap('arena.move')
+
+        # Remove any entities that died this frame:
+
+        changed = self._resolve_deaths() or changed
+
+        if prof is not None:
+            prof.lap('arena.deaths')
+
+        # Push apart any entities that overlap:
+
+        changed = self._collide() or changed
+
+        if prof is not None:
+            prof.lap('arena.collide')
+
+        # Entities have moved, the spatial index is updated when it is next queried:
+
+        self.grid_dirty = True
+
+        self.frame += frames
+
+        # If nothing moved or died, the targets of this step are still valid,
+        # and the next step targets the same entities, so nothing changes until the next attack:
+
+        if changed or self.store is None:
+            self.next_change = self.frame + 1
+            self.settled_running = -1
+        else:
+            ready = self._next_attack()
+            self.next_change = None if ready is None else max(ready, self.frame + 1)
+            self.settled_running = self._running_count()
+
+        return self.next_change
+
+    def _profile_counts(self, prof: Profiler) -> None:
+        """
+        Records the number of entities simulated this step,
+        and the number of times each logic component will run.
+
+        When entities are kept in a store, each component runs as one pass over all entities,
+        so we count the entities each pass handles.
+        """
+
+        prof.observe('entities', len(self.entities))
+
+        if self.store is not None:
+            running = int(np.count_nonzero(self.store.column('state') == Entity.STARTED))
+
+            prof.observe('running', running)
+
+            for name in ('calls.target', 'calls.attack', 'calls.movement'):
+                prof.count(name, running)
+
+            return
+
+        running = [ent for ent in self.entities if ent.running]
+
+        prof.observe('running', len(running))
+
+        for ent in running:
+            for name, component in (('calls.target', getattr(ent, 'target', None)),
+                                    ('calls.attack', getattr(ent, 'attack', None)),
+                                    ('calls.movement', getattr(ent, 'movement', None))):
+                if component is not None:
+                    prof.count(name)
+
+    def lane_fields(self) -> npt.NDArray[np.float64]:
+        """
+        Gets the lane each team follows when they have nothing to target.
+
+        Lanes lead to the closest standing enemy tower, walking around the river.
+        They are rebuilt only after a tower falls,
+        and fields are cached for each set of standing towers (see flow_field()),
+        so rebuilding after a restore() is cheap.
+
+        :return: Unit vectors (dx, dy) with shape (2, height, width, 2), indexed by team
+        :rtype: npt.NDArray[np.float64]
+        """
+
+        if self.lanes is None:
+
+            self.lanes = np.stack([
+                flow_field(self.width, self.height,
+                           tower_goals([(tower.x, tower.y) for tower in self.towers
+                                        if tower.team != team and tower.running],
+                                       self.width, self.height))
+                for team in (0, 1)])
+
+        return self.lanes
+
+    def next_event_frame(self) -> int | None:
+        """
+        Determines the next frame where the entities change on their own.
+
+        While any entity is moving, every frame changes the arena,
+        which includes units without a target walking down their lane,
+        and units being pushed apart by collisions.
+        Otherwise, the arena only changes when an attack is ready,
+        so stepping up to that frame is the same as stepping frame by frame.
+        If nothing can move or attack, nothing will change until a card is played.
+
+        This is determined by the last step (see step()), so it costs next to nothing.
+        If entities were loaded, unloaded or started since then,
+        or we don't have a store to cheaply tell what entities did,
+        then we assume the arena changes every frame.
+
+        :return: Frame of the next change, None if nothing will change
+        :rtype: int | None
+        """
+
+        if not self.entities:
+            return None
+
+        if self.settled_running < 0 or self.settled_running != self._running_count():
+            return self.frame + 1
+
+        return self.next_change
+
+    def _running_count(self) -> int:
+        """
+        Counts the running entities, which only changes when entities start, stop or unload.
+        """
+
+        return int(np.count_nonzero(self.store.column('state') == Entity.STARTED))
+
+    def _next_attack(self) -> int | None:
+        """
+        Determines the frame the next attack is ready, using the targets of the last step.
+
+        Targets must still be valid, meaning nothing moved or died since they were determined.
+
+        :return: Frame of the next attack, None if nothing is attacking
+        :rtype: int | None
+        """
+
+        if self.store is None:
+            return None
+
+        store = self.store
+        x = store.column('x')
+        y = store.column('y')
+        target = store.column('target')
 
-    def step(self, frames: int=1) -> None:
-        pass
+        # Determine which entities are in range of their target:
+
+        attacking = (target >= 0) & (store.column('state') == Entity.STARTED) & \
+            (store.column('damage') > 0)
+
+        if not attacking.any():
+            return None
+
+        index = target[attacking]
+        dx = x[index] - x[attacking]
+        dy = y[index] - y[attacking]
+        attack_range = store.column('attack_range')[attacking]
+        in_range = dx * dx + dy * dy <= attack_range * attack_range
+
+        if not in_range.any():
+            return None
+
+        ready = store.column('last_attack')[attacking] + store.column('attack_delay')[attacking]
+
+        # An attack may kill a target, so targets may change the frame after:
+
+        return int(ready[in_range].min())
+
+    def _target(self) -> None:
+        """
+        Preforms the targeting pass for all running entities.
+
+        If we have a store, then all targets are found at once,
+        otherwise each entity asks its own target component.
+        """
+
+        if self.store is not None:
+            target_all(self)
+            return
+
+        for ent in self.entities:
+
+            target = getattr(ent, 'target', None)
+
+            if ent.running and target is not None:
+                ent.target_entity = target.target()
+
+    def _attack(self) -> None:
+        """
+        Preforms the attack pass for all running entities.
+
+        If we have a store, then all damage is accumulated and applied at once,
+        otherwise each entity asks its own attack component.
+        """
+
+        if self.store is not None:
+            attack_all(self)
+            return
+
+        for ent in self.entities:
+
+            attack = getattr(ent, 'attack', None)
+
+            if ent.running and attack is not None:
+                attack.attack(self.frame)
+
+    def _resolve_deaths(self) -> bool:
+        """
+        Unloads all running entities that have no health left.
+
+        Every death of the frame is handled in one pass.
+
+        :return: True if any entity died, False if not
+        :rtype: bool
+        """
+
+        if self.store is not None:
+            dead = (self.store.column('health') <= 0) & \
+                   (self.store.column('state') == Entity.STARTED)
+
+            if not dead.any():
+                return False
+
+            self.unload_where(dead)
+
+            return True
+
+        return bool(self.unload_many([ent for ent in self.entities
+                                      if ent.running and ent.stats.health <= 0]))
+
+    def _move(self, frames: int=1) -> bool:
+        """
+        Preforms the movement pass for all running entities.
+
+        If we have a store, then all entities are moved at once,
+        otherwise each entity asks its own movement component.
+
+        :param frames: Number of frames to move for
+        :type frames: int
+        :return: True if any entity may have moved, False if not
+        :rtype: bool
+        """
+
+        if self.store is not None:
+            return move_all(self, frames)
+
+        for ent in self.entities:
+
+            movement = getattr(ent, 'movement', None)
+
+            if ent.running and movement is not None:
+                movement.move(frames)
+
+        return True
+
+    def _collide(self) -> bool:
+        """
+        Resolves collisions between all solid entities, see collision.
+
+        If we have a store, then the columns are worked on directly,
+        otherwise positions are gathered from each entity and written back.
+
+        :return: True if any entity may have been pushed, False if not
+        :rtype: bool
+        """
+
+        if self.store is not None:
+            return collide_all(self)
+
+        solid = [ent for ent in self.entities
+                 if ent.running and ent.stats.troop_size > 0 and ent.stats.speed > 0]
+
+        if len(solid) < 2:
+            return False
+
+        flying = np.array([ent.stats.flying for ent in solid], dtype=bool)
+
+        x, y = collide(self.width, self.height,
+                       np.array([ent.x for ent in solid], dtype=np.float64),
+                       np.array([ent.y for ent in solid], dtype=np.float64),
+                       np.array([ent.stats.troop_size for ent in solid], dtype=np.float64),
+                       layers(np.array([ent.team for ent in solid]), flying), flying)
+
+        for ent, new_x, new_y in zip(solid, x.tolist(), y.tolist()):
+            ent.x = new_x
+            ent.y = new_y
+
+        return True
+
+    def query_radius(self, x: float, y: float, r: float, team: int | None=None) -> List[Entity]:
+        """
+        Finds all entities within a radius of a point.
+
+        This uses the spatial index, which is updated first if entities have moved,
+        so entities moved outside of step() should be updated via update_position().
+
+        :param x: X position of the point
+        :type x: float
+        :param y: Y position of the point
+        :type y: float
+        :param r: Radius to search
+        :type r: float
+        :param team: Only return entities on this team, defaults to None (any team)
+        :type team: int | None
+        :return: Entities within the radius
+        :rtype: List[Entity]
+        """
+
+        if self.grid_dirty:
+            self._update_grid()
+
+        return self.grid.query_radius(x, y, r, team=team)
+
+    def _update_grid(self) -> None:
+        """
+        Reinserts any entities that have moved since the spatial index was last updated.
+        """
+
+        prof = self.profiler
+        start = time.perf_counter() if prof is not None else 0.0
+
+        for ent in self.entities:
+            self.grid.update(ent)
+
+        self.grid_dirty = False
+
+        if prof is not None:
+            prof.since('arena.grid', start)
+
+    def update_position(self, entity: Entity) -> None:
+        """
+        Updates the spatial index after an entity has moved.
+
+        :param entity: Entity that moved
+        :type entity: Entity
+        """
+
+        self.grid.update(entity)
 
     def get_entities(self) -> List[Entity]:
         return []
 
-    def play_card(self, x: int, y: int, card: Card) -> None:
-        pass
+    def play_card(self, x: int, y: int, card: Card, team: int) -> List[Entity]:
+        """
+        Places a card on a tile, see spawn().
+
+        :param x: X position of the tile
+        :type x: int
+        :param y: Y position of the tile
+        :type y: int
+        :param card: Card to place
+        :type card: Card
+        :param team: Team placing the card
+        :type team: int
+        :return: Entities that were spawned
+        :rtype: List[Entity]
+        """
+
+        return self.spawn(card.id, x + 0.5, y + 0.5, team)
+
+    def spawn(self, type_id: int, x: float, y: float, team: int) -> List[Entity]:
+        """
+        Spawns the units of a catalog entry around a point.
+
+        Stats of each unit are copied straight from the catalog row.
+        Units are loaded but not started,
+        the caller should start them once they have finished deploying
+        (see the 'deploy_time' of the entry).
+
+        :param type_id: Catalog ID of the entry
+        :type type_id: int
+        :param x: X position to spawn around
+        :type x: float
+        :param y: Y position to spawn around
+        :type y: float
+        :param team: Team of the units
+        :type team: int
+        :return: Units that were spawned
+        :rtype: List[Entity]
+        """
+
+        record = self.catalog[type_id]
+        count = int(record['count'])
+
+        # Spread groups of units evenly around the point:
+
+        radius = 0.5 if count > 1 else 0
+        units = []
+
+        for index in range(count):
+
+            angle = 2 * math.pi * index / count
+            units.append(self.acquire(Troop, type_id,
+                                      x + radius * math.cos(angle), y + radius * math.sin(angle), team))
+
+        return self.load_many(units, record)
+
+    def get_placement_mask(self, player_id: int=0) -> npt.NDArray[bool]:
+        """
+        Returns the tiles a player can place cards on.
+
+        The returned array is shared, and must not be modified!
+        Use set_placement_mask() to change placement territory.
+
+        :param player_id: Player to get the mask for
+        :type player_id: int
+        :return: Mask with shape (height, width)
+        :rtype: npt.NDArray[bool]
+        """
 
-    def get_placement_mask(self) -> npt.NDArray[bool]:
-        return np.ones(shape=(32, 18), dtype=bool)
+        return self.placement_masks[player_id]
+
+    def set_placement_mask(self, player_id: int, mask: npt.NDArray[bool]) -> None:
+        """
+        Changes the tiles a player can place cards on.
+
+        Components that cache anything derived from placement territory
+        should compare 'placement_version' to know when to recompute.
+
+        :param player_id: Player to set the mask for
+        :type player_id: int
+        :param mask: Mask with shape (height, width)
+        :type mask: npt.NDArray[bool]
+        """
+
+        if not np.array_equal(self.placement_masks[player_id], mask):
+            self.placement_masks[player_id] = mask
+            self.placement_version += 1
 
     def tower_count(self, player_id: int) -> int:
-        return 0
+        """
+        Determines the number of towers a player has left.
+        """
+
+        return sum(1 for tower in self.towers if tower.running and tower.team == player_id)
 
     def lowest_tower_health(self, player_id: int) -> int:
-        return 0
+        """
+        Determines the health of the weakest remaining tower of a player.
+
+        If the player has no towers left, then 0 is returned.
+        """
+
+        return min((int(tower.stats.health) for tower in self.towers
+                    if tower.running and tower.team == player_id), default=0)
+
+    def _load_entity(self, entity: Entity, record: np.void | None=None) -> None:
+        """
+        Adds the entity to our collection and spatial index.
+
+        :param entity: entity to add
+        :type entity: Entity
+        :param record: Catalog row to take stats from, defaults to None
+        :type record: np.void | None
+        """
+
+        super()._load_entity(entity, record)
+        self.grid.insert(entity)
+        self.settled_running = -1
+
+    def _load_many(self,
+                   entities: List[Entity],
+                   records: np.void | npt.NDArray[np.void] | None=None) -> None:
+        """
+        Adds many entities to our collection and spatial index.
+        """
+
+        super()._load_many(entities, records)
+
+        for entity in entities:
+            self.grid.insert(entity)
+
+        self.settled_running = -1
+
+    def _unload_entity(self, entity: Entity) -> None:
+        """
+        Removes the entity from our collection and spatial index.
+
+        :param entity: The entity in question to remove
+        :type entity: Entity
+        """
+
+        super()._unload_entity(entity)
+        self.grid.remove(entity)
+        self.settled_running = -1
+
+        if isinstance(entity, Tower):
+            self.lanes = None
+
+    def _unload_many(self, entities: List[Entity]) -> None:
+        """
+        Removes many entities from our collection and spatial index.
+        """
+
+        super()._unload_many(entities)
+        self.settled_running = -1
+
+        for entity in entities:
+
+            self.grid.remove(entity)
+
+            if isinstance(entity, Tower):
+                self.lanes = None
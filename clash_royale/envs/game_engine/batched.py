@@ -0,0 +1,626 @@
+"""
+Batched simulation of many games
+
+This file contains a component that simulates many independent games at once,
+keeping the state of every game in arrays with a leading batch dimension,
+so the cost of a step is paid once per batch instead of once per game.
+"""
+
+from __future__ import annotations
+
+import math
+from typing import Dict, List, Tuple
+
+import numpy as np
+import numpy.typing as npt
+
+from clash_royale.envs.game_engine.struct import Scheduler, DefaultScheduler, Stats
+from clash_royale.envs.game_engine.player import Player
+from clash_royale.envs.game_engine.card import Card, make_deck
+from clash_royale.envs.game_engine.catalog import get_catalog
+from clash_royale.envs.game_engine.entities.entity import Entity
+from clash_royale.envs.game_engine.entities.store import NEVER, STAT_FIELDS, EntityStore
+from clash_royale.envs.game_engine.entities.tower import TOWER_STATS, tower_layout
+from clash_royale.envs.game_engine.logic.target import nearest_enemy
+from clash_royale.envs.game_engine.logic.attack import attack_damage
+from clash_royale.envs.game_engine.logic.movement import advance
+from clash_royale.envs.game_engine.logic.collision import collide, layers, solid_mask
+from clash_royale.envs.game_engine.pathing import BridgeFields, bridge_fields, flow_field, \
+    tile_of, tower_goals
+
+
+class BatchedGameEngine:
+    """
+    BatchedGameEngine - Simulates many games at once
+
+    This component mirrors GameEngine,
+    but simulates 'num_games' independent games in lockstep.
+    Instead of keeping a Python object per game,
+    the state of every game is kept in arrays with a leading batch dimension:
+
+    - Schedulers - 'frame' with shape (N,)
+    - Players - 'elixir' with shape (N, 2), and the card cycle of each player
+    - Arenas - One (N, capacity) array per EntityStore column
+
+    All methods work on the whole batch at once,
+    so the cost of a step is paid once instead of once per game.
+    Games can be reset individually, so they do not need to be at the same frame.
+
+    Cards are referred to by their index in the deck of their player.
+    Each player keeps a hand of 4 cards, and a ring of the remaining 4 cards,
+    where the card at 'cycle_head' is the next card.
+    Playing a card swaps it with the next card and advances the ring,
+    which is the same cycle the Player component preforms.
+    """
+
+    def __init__(self,
+                 num_games: int,
+                 deck1: List[str | int | Card],
+                 deck2: List[str | int | Card],
+                 width: int=18,
+                 height: int=32,
+                 resolution: Tuple[int, int]=(128, 128),
+                 fps: int=30,
+                 capacity: int=64,
+                 seed: int | None=None
+                 ) -> None:
+
+        self.num_games: int = num_games  # Number of games simulated
+        self.width: int = width  # Width of arena
+        self.height: int = height  # Height of arena
+        self.resolution: Tuple[int, int] = resolution
+        self.fps: int = fps
+        self.capacity: int = capacity  # Number of entity rows per game
+
+        self.rng: np.random.Generator = np.random.default_rng(seed)
+
+        # Rules are shared between all games, and evaluated on arrays of frames:
+
+        self.game_scheduler: DefaultScheduler = DefaultScheduler(Scheduler(fps), fps)
+
+        # Catalog ID and elixir cost of each card in the deck of each player:
+
+        decks = [make_deck(deck1), make_deck(deck2)]
+
+        self.catalog: npt.NDArray[np.void] = get_catalog(fps)
+        self.card_ids: npt.NDArray[np.int64] = np.array(
+            [[card.id for card in deck] for deck in decks], dtype=np.int64)
+        self.card_cost: npt.NDArray[np.float64] = np.array(
+            [[card.elixir_cost for card in deck] for deck in decks], dtype=np.float64)
+
+        # Scheduler and player state:
+
+        self.frame: npt.NDArray[np.int64] = np.zeros(num_games, dtype=np.int64)
+        self.elixir: npt.NDArray[np.float64] = np.zeros((num_games, 2), dtype=np.float64)
+        self.hand: npt.NDArray[np.int64] = np.zeros((num_games, 2, 4), dtype=np.int64)
+        self.cycle: npt.NDArray[np.int64] = np.zeros((num_games, 2, 4), dtype=np.int64)
+        self.cycle_head: npt.NDArray[np.int64] = np.zeros((num_games, 2), dtype=np.int64)
+
+        # Placement territory and legal action buffers:
+
+        self.placement_masks: npt.NDArray[np.bool_] = np.ones((num_games, 2, height, width),
+                                                             dtype=bool)
+        self.legal_masks: npt.NDArray[np.bool_] = np.zeros((2, num_games, height, width, 4),
+                                                          dtype=bool)
+
+        # Arena state, one row per entity:
+
+        self.columns: Dict[str, npt.NDArray] = {
+            name: np.zeros((num_games, capacity), dtype=dtype)
+            for name, dtype in EntityStore.COLUMNS.items()
+        }
+
+        # Frame each deploying (loaded) entity starts on:
+
+        self.deploy_frame: npt.NDArray[np.int64] = np.zeros((num_games, capacity), dtype=np.int64)
+
+        # Flow fields for pathing, same as Arena:
+
+        self.bridges: BridgeFields = bridge_fields(width, height)
+
+        count = len(tower_layout(width, height))
+
+        # Lanes of each set of standing towers, and the sets with lanes built:
+
+        self.lanes: npt.NDArray[np.float64] = np.zeros((1 << count, 2, height, width, 2))
+        self.lanes_built: npt.NDArray[np.bool_] = np.zeros(1 << count, dtype=bool)
+
+        self.reset()
+
+    @property
+    def active(self) -> npt.NDArray[np.bool_]:
+        """
+        Mask of entities that are running in each game.
+
+        :return: Mask with shape (N, capacity)
+        :rtype: npt.NDArray[np.bool_]
+        """
+
+        return self.columns['state'] == Entity.STARTED
+
+    def reset(self, games: npt.ArrayLike | None=None) -> None:
+        """
+        Resets the given games to their starting state.
+
+        :param games: Indices or mask of games to reset, defaults to None (all games)
+        :type games: npt.ArrayLike | None
+        """
+
+        index = np.arange(self.num_games) if games is None else np.asarray(games)
+
+        if index.dtype == bool:
+            index = np.flatnonzero(index)
+
+        count = len(index)
+
+        self.frame[index] = 0
+        self.elixir[index] = 5
+
+        # Shuffle the decks of each player:
+
+        order = np.argsort(self.rng.random((count, 2, 8)), axis=-1)
+        self.hand[index] = order[..., :4]
+        self.cycle[index] = order[..., 4:]
+        self.cycle_head[index] = 0
+
+        # Clear the arenas:
+
+        for col in self.columns.values():
+            col[index] = 0
+
+        self.columns['state'][index] = Entity.UNLOADED
+        self.columns['target'][index] = -1
+        self.columns['last_attack'][index] = NEVER
+
+        # Place the towers in the first rows, same as Arena.reset():
+
+        for row, (type_id, x, y, team) in enumerate(tower_layout(self.width, self.height)):
+
+            self.columns['x'][index, row] = x
+            self.columns['y'][index, row] = y
+            self.columns['team'][index, row] = team
+            self.columns['type_id'][index, row] = type_id
+            self.columns['state'][index, row] = Entity.STARTED
+
+            for name in STAT_FIELDS:
+                self.columns[name][index, row] = self.catalog[type_id][name]
+
+    def lane_fields(self) -> Tuple[npt.NDArray[np.float64], npt.NDArray[np.int64]]:
+        """
+        Gets the lane each team follows in every game, see Arena.lane_fields().
+
+        Towers are kept in the first rows of each game (see reset()),
+        so each set of standing towers is given a bit mask,
+        and games with the same towers standing share the same lanes.
+        Lanes are only built the first time a set of standing towers is seen.
+
+        :return: Lanes of every set of standing towers, with shape (sets, 2, height, width, 2),
+            and the set each game uses, with shape (N,)
+        :rtype: Tuple[npt.NDArray[np.float64], npt.NDArray[np.int64]]
+        """
+
+        layout = tower_layout(self.width, self.height)
+        count = len(layout)
+        cols = self.columns
+
+        standing = (cols['state'][:, :count] == Entity.STARTED) & \
+                   (cols['type_id'][:, :count] == [type_id for type_id, _, _, _ in layout])
+
+        sets = standing.astype(np.int64) @ (1 << np.arange(count))
+
+        for bits in np.unique(sets[~self.lanes_built[sets]]).tolist():
+
+            for team in (0, 1):
+                self.lanes[bits, team] = flow_field(
+                    self.width, self.height,
+                    tower_goals([(x, y) for index, (_, x, y, owner) in enumerate(layout)
+                                 if bits >> index & 1 and owner != team],
+                                self.width, self.height))
+
+            self.lanes_built[bits] = True
+
+        return self.lanes, sets
+
+    def spawn(self,
+              game: int,
+              x: float,
+              y: float,
+              team: int,
+              stats: Stats | np.void,
+              type_id: int=0,
+              deploy_frame: int | None=None) -> int:
+        """
+        Adds an entity to a game.
+
+        The entity is placed in the first free row of the game,
+        and the arenas are grown if no rows are free.
+        Stats can be given as either Stats, or a catalog row to copy.
+        If a deploy frame is given, the entity is loaded,
+        and only starts once its game reaches that frame.
+
+        :param game: Index of the game
+        :type game: int
+        :param x: X position of the entity
+        :type x: float
+        :param y: Y position of the entity
+        :type y: float
+        :param team: Team of the entity
+        :type team: int
+        :param stats: Stats of the entity, or its catalog row
+        :type stats: Stats | np.void
+        :param type_id: Type of the entity, defaults to 0
+        :type type_id: int
+        :param deploy_frame: Frame the entity starts on, defaults to None (start now)
+        :type deploy_frame: int | None
+        :return: Row of the entity
+        :rtype: int
+        """
+
+        state = self.columns['state'][game]
+        free = np.flatnonzero((state != Entity.STARTED) & (state != Entity.LOADED))
+
+        if len(free) == 0:
+            self._grow()
+            state = self.columns['state'][game]
+            free = np.flatnonzero((state != Entity.STARTED) & (state != Entity.LOADED))
+
+        row = int(free[0])
+        cols = self.columns
+
+        cols['x'][game, row] = x
+        cols['y'][game, row] = y
+        cols['team'][game, row] = team
+        cols['type_id'][game, row] = type_id
+        cols['state'][game, row] = Entity.STARTED if deploy_frame is None else Entity.LOADED
+        cols['target'][game, row] = -1
+        cols['last_attack'][game, row] = NEVER
+        self.deploy_frame[game, row] = 0 if deploy_frame is None else deploy_frame
+
+        if isinstance(stats, np.void):
+            for name in STAT_FIELDS:
+                cols[name][game, row] = stats[name]
+        else:
+            for name in STAT_FIELDS:
+                cols[name][game, row] = getattr(stats, name)
+
+        return row
+
+    def apply(self, player_id: int, actions: npt.ArrayLike) -> None:
+        """
+        Applies an action to every game.
+
+        Actions have the shape (N, 3), one (x, y, card index) action per game.
+        A negative card index means no action is taken in that game.
+        We check for validity of the actions via asserts.
+
+        :param player_id: Player taking the actions
+        :type player_id: int
+        :param actions: Action for each game
+        :type actions: npt.ArrayLike
+        """
+
+        actions = np.asarray(actions, dtype=np.int64)
+        games = np.flatnonzero(actions[:, 2] >= 0)
+
+        if len(games) == 0:
+            return
+
+        x, y, card_index = actions[games].T
+
+        assert np.all((x >= 0) & (x < self.width))
+        assert np.all((y >= 0) & (y < self.height))
+        assert np.all(card_index < 4)
+
+        cards = self.hand[games, player_id, card_index]
+        cost = self.card_cost[player_id, cards]
+        assert np.all(cost <= self.elixir[games, player_id])
+
+        self.play_card(games, x, y, player_id, cards)
+
+        # Swap the played card with the next card, and advance the cycle:
+
+        head = self.cycle_head[games, player_id]
+        self.hand[games, player_id, card_index] = self.cycle[games, player_id, head]
+        self.cycle[games, player_id, head] = cards
+        self.cycle_head[games, player_id] = (head + 1) % 4
+
+        self.elixir[games, player_id] -= cost
+
+    def play_card(self,
+                  games: npt.NDArray[np.int64],
+                  x: npt.NDArray[np.int64],
+                  y: npt.NDArray[np.int64],
+                  player_id: int,
+                  cards: npt.NDArray[np.int64]) -> None:
+        """
+        Places cards into the arenas of the given games.
+
+        This mirrors Arena.play_card(),
+        units are spawned around the center of the tile,
+        and start once the card has finished deploying.
+
+        :param games: Indices of the games
+        :type games: npt.NDArray[np.int64]
+        :param x: X position of the tile in each game
+        :type x: npt.NDArray[np.int64]
+        :param y: Y position of the tile in each game
+        :type y: npt.NDArray[np.int64]
+        :param player_id: Player placing the cards
+        :type player_id: int
+        :param cards: Index of the card in the deck of the player, in each game
+        :type cards: npt.NDArray[np.int64]
+        """
+
+        rows = zip(games.tolist(), x.tolist(), y.tolist(), cards.tolist())
+
+        for game, tile_x, tile_y, card in rows:
+
+            type_id = int(self.card_ids[player_id, card])
+            record = self.catalog[type_id]
+            count = int(record['count'])
+            radius = 0.5 if count > 1 else 0
+            deploy_frame = int(self.frame[game] + record['deploy_time'])
+
+            for index in range(count):
+                angle = 2 * math.pi * index / count
+                self.spawn(game,
+                           tile_x + 0.5 + radius * math.cos(angle),
+                           tile_y + 0.5 + radius * math.sin(angle),
+                           player_id, record, type_id, deploy_frame)
+
+    def step(self, frames: int=1) -> None:
+        """
+        Steps every game through a number of frames,
+        applying simulations and updating required components.
+
+        Stepping many frames at once gives the same result as stepping one by one,
+        same as GameEngine.step().
+        Entities only target, attack and deploy at the start of each part of the step,
+        so after a frame where nothing moved or died,
+        we step straight up to the next attack or deploy in any game (see _next_split()),
+        and otherwise one frame at a time.
+
+        :param frames: Number of frames to step
+        :type frames: int
+        """
+
+        remaining = frames
+        part = 1
+
+        while remaining > 0:
+
+            part = min(part, remaining)
+            changed = self._advance(part)
+            remaining -= part
+
+            part = 1 if changed else self._next_split(remaining)
+
+    def _next_split(self, limit: int) -> int:
+        """
+        Determines how many frames every game can be stepped at once, see step().
+
+        Nothing may have moved or died in the last part,
+        so the targets of the last part are still valid.
+
+        :param limit: Most frames to step
+        :type limit: int
+        :return: Frames until the next attack or deploy in any game, at least 1
+        :rtype: int
+        """
+
+        cols = self.columns
+        frame = self.frame[:, None]
+        target = cols['target']
+
+        # Entities start deploying on their deploy frame:
+
+        waits = [(self.deploy_frame - frame)[cols['state'] == Entity.LOADED]]
+
+        # Attackers in range of their target attack once they are ready:
+
+        attacking = self.active & (target >= 0) & (cols['damage'] > 0)
+
+        if attacking.any():
+
+            index = np.where(attacking, target, 0)
+            dx = np.take_along_axis(cols['x'], index, axis=-1) - cols['x']
+            dy = np.take_along_axis(cols['y'], index, axis=-1) - cols['y']
+            attacking &= dx * dx + dy * dy <= cols['attack_range'] * cols['attack_range']
+
+            waits.append((cols['last_attack'] + cols['attack_delay'] - frame)[attacking])
+
+        waits = np.concatenate(waits)
+
+        if waits.size == 0:
+            return max(limit, 1)
+
+        return max(min(int(waits.min()), limit), 1)
+
+    def _advance(self, frames: int) -> bool:
+        """
+        Steps every game through a number of frames, targeting and attacking once,
+        see step().
+
+        :param frames: Number of frames to step, at most up to the next attack or deploy
+        :type frames: int
+        :return: True if anything deployed, moved or died in any game, False if not
+        :rtype: bool
+        """
+
+        # update elixir first, same as GameEngine:
+
+        gained = self.game_scheduler.elixir_gained_at(self.frame, frames)
+        np.minimum(self.elixir + gained[:, None], Player.MAX_ELIXIR, out=self.elixir)
+
+        # Start any entities that have finished deploying:
+
+        cols = self.columns
+        deployed = (cols['state'] == Entity.LOADED) & (self.deploy_frame <= self.frame[:, None])
+        cols['state'][deployed] = Entity.STARTED
+        changed = bool(deployed.any())
+
+        # Simulate the arenas, same passes as Arena.step():
+
+        active = self.active
+
+        target = nearest_enemy(cols['x'], cols['y'], cols['team'], cols['sight_range'], active)
+        cols['target'][:] = target
+
+        cols['health'] -= attack_damage(cols['x'], cols['y'], target,
+                                        cols['attack_range'], cols['attack_delay'],
+                                        cols['damage'], cols['last_attack'],
+                                        active, self.frame[:, None])
+
+        has_target = target >= 0
+        index = np.where(has_target, target, 0)
+        x = cols['x']
+        y = cols['y']
+        target_x = np.take_along_axis(x, index, axis=-1)
+        target_y = np.take_along_axis(y, index, axis=-1)
+
+        # Determine which entities follow a flow field, same as move_all():
+
+        lanes, lane_index = self.lane_fields()
+        col, row = tile_of(self.width, self.height, x, y)
+
+        direction, follow = self.bridges.steer(lanes[lane_index[:, None], cols['team'], row, col],
+                                               x, y, target_x, target_y,
+                                               has_target, cols['attack_range'])
+        follow &= active & (cols['speed'] > 0)
+
+        moved = advance(x, y, target_x, target_y, cols['speed'], cols['attack_range'],
+                        has_target & active & ~follow, frames)
+
+        travel = np.where(follow, cols['speed'] * frames, 0)
+
+        x += direction[..., 0] * travel
+        y += direction[..., 1] * travel
+
+        changed = changed or bool(moved.any() or follow.any())
+
+        # Remove any entities that died:
+
+        dead = active & (cols['health'] <= 0)
+        cols['state'][dead] = Entity.UNLOADED
+
+        changed = changed or bool(dead.any())
+
+        # Push apart overlapping units, each game is a separate group so games never collide:
+
+        solid = solid_mask(cols['state'], cols['troop_size'], cols['speed'])
+
+        if np.count_nonzero(solid) > 1:
+
+            game = np.broadcast_to(np.arange(self.num_games)[:, None], solid.shape)[solid]
+            flying = cols['flying'][solid]
+
+            old_x = x[solid]
+            old_y = y[solid]
+
+            new_x, new_y = collide(self.width, self.height, old_x, old_y,
+                                   cols['troop_size'][solid],
+                                   layers(cols['team'][solid], flying, game), flying)
+
+            x[solid] = new_x
+            y[solid] = new_y
+
+            changed = changed or not (np.array_equal(new_x, old_x) and
+                                      np.array_equal(new_y, old_y))
+
+        self.frame += frames
+
+        return changed
+
+    def legal_actions(self, player_id: int) -> npt.NDArray[np.bool_]:
+        """
+        Returns the legal actions of a player in every game.
+
+        The mask is written into a persistent buffer,
+        which will be updated in place by later calls.
+
+        :return: Legal action mask with shape (N, height, width, 4)
+        :rtype: npt.NDArray[np.bool_]
+        """
+
+        cost = self.card_cost[player_id, self.hand[:, player_id]]
+        affordable = cost <= self.elixir[:, player_id, None]
+
+        np.logical_and(self.placement_masks[:, player_id, :, :, None],
+                       affordable[:, None, None, :],
+                       out=self.legal_masks[player_id])
+
+        return self.legal_masks[player_id]
+
+    def _towers(self, player_id: int) -> npt.NDArray[np.bool_]:
+        """
+        Mask of the running towers of a player in every game.
+        """
+
+        tower = np.isin(self.columns['type_id'], list(TOWER_STATS))
+
+        return tower & self.active & (self.columns['team'] == player_id)
+
+    def tower_count(self, player_id: int) -> npt.NDArray[np.int64]:
+        """
+        Determines the number of towers of a player in every game.
+
+        This mirrors Arena.tower_count().
+        """
+
+        return self._towers(player_id).sum(axis=-1)
+
+    def lowest_tower_health(self, player_id: int) -> npt.NDArray[np.int64]:
+        """
+        Determines the lowest tower health of a player in every game.
+
+        This mirrors Arena.lowest_tower_health().
+        """
+
+        towers = self._towers(player_id)
+        health = np.where(towers, self.columns['health'], np.iinfo(np.int64).max).min(axis=-1)
+
+        return np.where(towers.any(axis=-1), health, 0)
+
+    def is_terminal(self) -> npt.NDArray[np.bool_]:
+        """
+        Determines which games have ended.
+        """
+
+        towers_differ = self.tower_count(0) != self.tower_count(1)
+
+        return self.game_scheduler.is_game_over_at(self.frame) | \
+            (self.game_scheduler.is_overtime_at(self.frame) & towers_differ)
+
+    def terminal_value(self) -> npt.NDArray[np.int64]:
+        """
+        Returns side won in every game, otherwise -1.
+        """
+
+        player1_val = self.tower_count(0)
+        player2_val = self.tower_count(1)
+
+        tied = player1_val == player2_val
+        player1_val = np.where(tied, self.lowest_tower_health(0), player1_val)
+        player2_val = np.where(tied, self.lowest_tower_health(1), player2_val)
+
+        return np.select([player1_val > player2_val, player2_val > player1_val], [1, 0], -1)
+
+    def _grow(self) -> None:
+        """
+        Doubles the number of entity rows in every game.
+        """
+
+        for name, col in self.columns.items():
+            new = np.zeros((self.num_games, self.capacity * 2), dtype=col.dtype)
+            new[:, :self.capacity] = col
+            self.columns[name] = new
+
+        deploy_frame = np.zeros((self.num_games, self.capacity * 2), dtype=np.int64)
+        deploy_frame[:, :self.capacity] = self.deploy_frame
+        self.deploy_frame = deploy_frame
+
+        self.columns['state'][:, self.capacity:] = Entity.UNLOADED
+        self.columns['target'][:, self.capacity:] = -1
+        self.columns['last_attack'][:, self.capacity:] = NEVER
+
+        self.capacity *= 2
@@ -1,11 +1,35 @@
+from __future__ import annotations
+
+from typing import Iterable, List
+
+from clash_royale.envs.game_engine.catalog import card_id, get_catalog
+
+
 class Card():
     '''
-    pseudo Card class.
+    Card class.
 
-    This class is created for Player class to refer to statistics of cards.
+    Cards refer to an entry of the card catalog by its integer ID,
+    and keep the statistics Player needs to refer to.
+    Cards can be created from either the name or the ID of the entry.
     '''
 
-    def __init__(self, elixir: int, elixir_cost: int) -> None:
-        self.elixir: int = elixir
-        self.elixir_cost: int = elixir_cost
-        pass
+    def __init__(self, card: str | int) -> None:
+        self.id: int = card_id(card) if isinstance(card, str) else int(card)
+
+        row = get_catalog()[self.id]
+
+        self.name: str = str(row['name'])
+        self.elixir: int = int(row['elixir'])
+        self.elixir_cost: int = self.elixir
+
+    def __repr__(self) -> str:
+        return f"Card({self.name!r})"
+
+
+def make_deck(cards: Iterable[str | int | Card]) -> List[Card]:
+    """
+    Creates a deck from card names, IDs, or existing cards.
+    """
+
+    return [card if isinstance(card, Card) else Card(card) for card in cards]
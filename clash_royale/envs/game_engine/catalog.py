@@ -0,0 +1,120 @@
+"""
+Card catalog
+
+This file contains the catalog of every card and tower in the game.
+Each entry is given a stable integer ID (its position in CARDS),
+which is used as the type ID of the entities it spawns,
+and by decks, hands and observations to refer to cards.
+
+The catalog is kept as a structured NumPy table,
+with one column per numeric stat (named the same as the EntityStore columns),
+so spawning an entity is a copy of a single row.
+"""
+
+from __future__ import annotations
+
+import functools
+from typing import Dict, Iterable, List, Tuple
+
+import numpy as np
+import numpy.typing as npt
+
+from clash_royale.envs.game_engine.entities.store import STAT_FIELDS, EntityStore
+from clash_royale.envs.game_engine.struct import Stats
+
+REFERENCE_FPS: int = 30  # Frame rate frame based values are converted from
+
+# Every entry, as:
+# (name, elixir, units spawned, speed in tiles per second, attack range, sight range,
+#  health, damage, troop size, seconds between attacks, seconds to deploy)
+# The order of this list determines the ID of each entry, so only ever append to it!
+# Entries listed in FLYING are flying units, every other entry is on the ground.
+CARDS: List[Tuple[str, int, int, float, float, float, int, int, float, float, float]] = [
+    ('none', 0, 0, 0, 0, 0, 0, 0, 0, 0, 0),
+    ('king_tower', 0, 1, 0, 7, 7, 4824, 109, 4, 1.0, 0),
+    ('princess_tower', 0, 1, 0, 7.5, 7.5, 3052, 109, 3, 0.8, 0),
+    ('knight', 3, 1, 1.0, 1.2, 5.5, 1766, 202, 1, 1.2, 1),
+    ('archers', 3, 2, 1.0, 5, 5.5, 304, 107, 1, 0.9, 1),
+    ('giant', 5, 1, 0.75, 1.2, 7.5, 4091, 254, 2, 1.5, 1),
+    ('musketeer', 4, 1, 1.0, 6, 6, 721, 217, 1, 1.0, 1),
+    ('mini_pekka', 4, 1, 1.5, 0.8, 5.5, 1361, 720, 1, 1.6, 1),
+    ('valkyrie', 4, 1, 1.0, 1.2, 5.5, 1908, 267, 1, 1.5, 1),
+    ('hog_rider', 4, 1, 2.0, 0.8, 9.5, 1696, 318, 1, 1.6, 1),
+    ('skeletons', 1, 3, 1.5, 0.5, 5.5, 81, 81, 0.5, 1.0, 1),
+    ('goblins', 2, 3, 2.0, 0.5, 5.5, 202, 120, 0.5, 1.1, 1),
+    ('bomber', 2, 1, 1.0, 4.5, 4.5, 332, 222, 1, 1.8, 1),
+]
+
+# Names of entries that fly, see Stats.flying:
+FLYING: Tuple[str, ...] = ()
+
+# Structure of each catalog row:
+CATALOG_DTYPE: np.dtype = np.dtype(
+    [('name', 'U24'), ('elixir', np.int64), ('count', np.int64), ('deploy_time', np.int64)] +
+    [(name, EntityStore.COLUMNS[name]) for name in STAT_FIELDS])
+
+# ID of each entry, by name:
+CARD_IDS: Dict[str, int] = {entry[0]: index for index, entry in enumerate(CARDS)}
+
+
+@functools.lru_cache(maxsize=None)
+def get_catalog(fps: int=REFERENCE_FPS) -> npt.NDArray[np.void]:
+    """
+    Gets the catalog, with frame based stats converted to the given frame rate.
+
+    Catalogs are built once per frame rate, and shared for the rest of the process,
+    so they are read-only.
+
+    :param fps: Frame rate of the simulation, defaults to REFERENCE_FPS
+    :type fps: int
+    :return: Structured array with one row per entry, see CATALOG_DTYPE
+    :rtype: npt.NDArray[np.void]
+    """
+
+    table = np.zeros(len(CARDS), dtype=CATALOG_DTYPE)
+
+    for index, (name, elixir, count, speed, attack_range, sight_range,
+                health, damage, troop_size, hit_speed, deploy) in enumerate(CARDS):
+
+        table[index] = (name, elixir, count, round(deploy * fps),
+                        speed / fps, attack_range, sight_range,
+                        health, damage, troop_size, round(hit_speed * fps), name in FLYING)
+
+    table.flags.writeable = False
+
+    return table
+
+
+def card_id(name: str) -> int:
+    """
+    Gets the ID of an entry by name.
+
+    :param name: Name of the entry
+    :type name: str
+    :return: ID of the entry
+    :rtype: int
+    """
+
+    if name not in CARD_IDS:
+        raise ValueError(f"Unknown card: {name}")
+
+    return CARD_IDS[name]
+
+
+def card_ids(cards: Iterable[str | int]) -> npt.NDArray[np.int64]:
+    """
+    Converts card names (or IDs) into an array of IDs.
+    """
+
+    return np.array([card_id(card) if isinstance(card, str) else int(card) for card in cards],
+                    dtype=np.int64)
+
+
+def stats_of(type_id: int, fps: int=REFERENCE_FPS) -> Stats:
+    """
+    Creates standalone Stats for an entry, for entities that are not in a store.
+    """
+
+    row = get_catalog(fps)[type_id]
+
+    return Stats(str(row['name']), **{name: row[name].item() for name in STAT_FIELDS})
@@ -0,0 +1,248 @@
+"""
+Bulk lifecycle components
+
+This file contains the methods that load, start and unload
+many entities of a collection at once.
+They call the same lifecycle methods on each entity as the single entity methods,
+but update the collection (and store) in a single pass.
+"""
+
+from __future__ import annotations
+
+# The bulk methods mirror the single entity methods of EntityCollection on purpose:
+# pylint: disable=duplicate-code
+
+from typing import TYPE_CHECKING, Dict, Iterable, List
+
+import numpy as np
+import numpy.typing as npt
+
+from clash_royale.envs.game_engine.struct import Stats
+from clash_royale.envs.game_engine.entities.store import STAT_FIELDS, EntityStore, \
+    swap_remove_order
+
+if TYPE_CHECKING:
+    # Only import for typechecking to prevent circular dependency
+    from clash_royale.envs.game_engine.entities.entity import Entity
+
+
+class BulkLifecycleMixin:
+    """
+    BulkLifecycleMixin - Loads and unloads many entities at once
+
+    This mixin is inherited by EntityCollection,
+    and relies on the storage and single entity methods defined there.
+    """
+
+    entities: List[Entity]  # Loaded entities, see EntityCollection
+    store: EntityStore | None  # Array-backed storage, if enabled
+    pools: Dict[type, List[Entity]] | None  # Entity pools, if enabled
+    num_loaded: int = 0  # Number of entity's currently loaded
+    max_loaded: int = 0  # Max number of entity's loaded
+
+    def load_many(self,
+                  entities: List[Entity],
+                  records: np.void | npt.NDArray[np.void] | None=None) -> List[Entity]:
+        """
+        Adds many entities to the collection at once.
+
+        This is the same as calling load_entity() on each entity,
+        but the collection and store are updated in one pass.
+        If the load() method of an entity fails,
+        then the entities before it are still loaded.
+
+        :param entities: Entities to add
+        :type entities: List[Entity]
+        :param records: Catalog row for every entity, or one row for all of them, defaults to None
+        :type records: np.void | npt.NDArray[np.void] | None
+        :return: Entities we loaded
+        :rtype: List[Entity]
+        """
+
+        for index, entity in enumerate(entities):
+
+            try:
+
+                entity.load()
+
+            except Exception as e:
+
+                # Load the entities that succeeded, then raise an exception:
+
+                if index > 0:
+                    done = entities[:index]
+                    self._load_many(done, records if records is None or isinstance(records, np.void)
+                                    else records[:index])
+
+                raise Exception(f"entity load() method failed! Not loading: {entity}", e)
+
+        self._load_many(entities, records)
+
+        return entities
+
+    def unload_many(self, entities: Iterable[Entity]) -> List[Entity]:
+        """
+        Removes many entities from the collection at once.
+
+        This is the same as calling unload_entity() on each entity,
+        but the collection and store are updated in one pass.
+        If the unload() method of an entity fails,
+        then the entities before it are still unloaded.
+
+        :param entities: Entities to unload
+        :type entities: Iterable[Entity]
+        :return: Entities we unloaded
+        :rtype: List[Entity]
+        """
+
+        entities = list(entities)
+
+        for index, entity in enumerate(entities):
+
+            if entity.running:
+                entity.stop()
+
+            try:
+
+                entity.unload()
+
+            except Exception as e:
+
+                # Unload the entities that succeeded, and this one:
+
+                self._unload_many(entities[:index + 1])
+
+                raise Exception(f"entity failed to unload! Unloading: {entity}", e)
+
+        self._unload_many(entities)
+
+        return entities
+
+    def unload_where(self, mask: npt.NDArray[np.bool_]) -> List[Entity]:
+        """
+        Unloads every entity selected by a mask, see unload_many().
+
+        The mask has one value per entity, in the order of 'entities'
+        (which is also the row order of the store),
+        so it can be computed straight from store columns,
+        for example `store.column('health') <= 0`.
+
+        :param mask: Mask of entities to unload
+        :type mask: npt.NDArray[np.bool_]
+        :return: Entities we unloaded
+        :rtype: List[Entity]
+        """
+
+        entities = self.entities
+
+        return self.unload_many([entities[index] for index in np.flatnonzero(mask).tolist()])
+
+    def start_many(self, entities: Iterable[Entity]) -> None:
+        """
+        Starts many entities, see start_entity().
+
+        If an entity fails to start, then it is unloaded,
+        and the entities after it are not started.
+
+        :param entities: Entities to start
+        :type entities: Iterable[Entity]
+        """
+
+        entity = None
+
+        try:
+
+            for entity in entities:
+                entity.start()
+
+        except Exception as e:
+
+            # entity failed to start! Unload it...
+
+            self._unload_entity(entity)
+
+            raise Exception(f"entity start() method failed! Unloading: {entity}", e)
+
+    def _load_many(self,
+                   entities: List[Entity],
+                   records: np.void | npt.NDArray[np.void] | None=None) -> None:
+        """
+        Adds many entities to our collection, see _load_entity().
+
+        This low-level method is not intended to
+        be worked with by end users!
+
+        :param entities: Entities to add
+        :type entities: List[Entity]
+        :param records: Catalog row for every entity, or one row for all of them, defaults to None
+        :type records: np.void | npt.NDArray[np.void] | None
+        """
+
+        for slot, entity in enumerate(entities, start=len(self.entities)):
+            entity.slot = slot
+            entity.collection = self
+
+        self.entities.extend(entities)
+
+        self.max_loaded += len(entities)
+        self.num_loaded += len(entities)
+
+        if self.store is not None:
+            self.store.add_many(entities, records)
+        elif records is not None:
+            for index, entity in enumerate(entities):
+                record = records if isinstance(records, np.void) else records[index]
+                entity.stats = Stats(str(record['name']),
+                                     **{name: record[name].item() for name in STAT_FIELDS})
+
+    def _unload_many(self, entities: List[Entity]) -> None:
+        """
+        Removes many entities from our collection, see _unload_entity().
+
+        The entity list (and store) end up in the same order
+        as if each entity was removed in turn,
+        but are only rearranged once.
+
+        This low-level method is not intended to
+        be worked with by end users!
+
+        :param entities: Entities to remove, each only once
+        :type entities: List[Entity]
+        """
+
+        if not entities:
+            return
+
+        current = self.entities
+
+        for entity in entities:
+            slot = entity.slot
+            if slot < 0 or slot >= len(current) or current[slot] is not entity:
+                raise ValueError(f"entity is not in this collection: {entity}")
+
+        order = swap_remove_order(len(current), [entity.slot for entity in entities])
+        current[:] = [current[slot] for slot in order]
+
+        for slot, original in enumerate(order):
+            if slot != original:
+                current[slot].slot = slot
+
+        for entity in entities:
+            entity.slot = -1
+
+        # Pooled entities are recycled, so they don't need a copy of their stats:
+
+        pooled = [self.pools is not None and entity.pooled for entity in entities]
+
+        # Remove the entities from the store, if any:
+
+        if self.store is not None:
+            bound = [index for index, entity in enumerate(entities) if entity.store is self.store]
+            self.store.remove_many([entities[index] for index in bound],
+                                   [not pooled[index] for index in bound])
+
+        for entity, recycle in zip(entities, pooled):
+            if recycle:
+                self.release(entity)
+
+        self.num_loaded -= len(entities)
@@ -4,14 +4,20 @@ Base entity components
 
 from __future__ import annotations
 
-from typing import TYPE_CHECKING, List
+from typing import TYPE_CHECKING, Any, Dict, List, Type, TypeVar
+
+import numpy as np
 
 from clash_royale.envs.game_engine.struct import Stats
+from clash_royale.envs.game_engine.entities.bulk import BulkLifecycleMixin
+from clash_royale.envs.game_engine.entities.store import STAT_FIELDS, EntityStore, StatsView
 
 if TYPE_CHECKING:
     # Only import for typechecking to prevent circular dependency
     from clash_royale.envs.game_engine.arena import Arena
 
+E = TypeVar('E', bound='Entity')
+
 
 class Entity:
     """
@@ -42,6 +48,11 @@ class Entity:
     * Running - Entity is running and working in some way
     * Stopped - Entity is stopped, stop code is ran and entity is no longer working with data
     * Unloaded - Entity is unloaded, unload code is ran
+
+    Entities can optionally be bound to an EntityStore,
+    in which case the position, team, state and stats
+    are kept in a row of the store instead of on this object.
+    The attributes defined here work the same either way.
     """
 
     CREATED: int = 0
@@ -52,14 +63,235 @@ class Entity:
 
     def __init__(self) -> None:
 
-        self.state: int = Entity.CREATED  # Current entity state
+        self._state: int = Entity.CREATED  # Current entity state
 
-        self.x: int = 0  # X Position
-        self.y: int  = 0  # Y Position
+        self._x: float = 0  # X Position
+        self._y: float = 0  # Y Position
+        self._team: int = 0  # Team we are on
+        self._type_id: int = 0  # Type of entity, used when describing the arena
 
-        self.stats: Stats = Stats()  # Use default stats unless otherwise stated
+        self._stats: Stats | None = None  # Stats while unbound, created on first access
         self.collection: Arena  # EntityCollection we are apart of
 
+        self.store: EntityStore | None = None  # Store we are bound to, if any
+        self.row: int = -1  # Row in the store we are bound to
+        self.slot: int = -1  # Index in the entity list of our collection
+
+        self.pooled: bool = False  # Whether we are returned to a pool when unloaded
+
+    def setup(self, *args: Any, **kwargs: Any) -> None:
+        """
+        Configures this entity for use.
+
+        Entities that can be pooled (see EntityCollection.acquire())
+        should do all of their per-instance configuration here,
+        and call this method from their constructor with the same arguments,
+        so a recycled entity can be configured exactly like a new one.
+        Sub-classes are free to take whatever arguments they need.
+        """
+
+    def recycle(self) -> None:
+        """
+        Resets this entity in place, to how it was when it was created.
+
+        This is called on entities taken from a pool, before setup() is called.
+        Sub-classes with state of their own should reset it here.
+        """
+
+        self._state = Entity.CREATED
+        self._x = 0
+        self._y = 0
+        self._team = 0
+        self._type_id = 0
+
+        self.store = None
+        self.row = -1
+        self.slot = -1
+
+    @property
+    def state(self) -> int:
+        """
+        Current entity state.
+
+        :return: Entity state
+        :rtype: int
+        """
+
+        if self.store is None:
+            return self._state
+        return int(self.store.columns['state'][self.row])
+
+    @state.setter
+    def state(self, value: int) -> None:
+        if self.store is None:
+            self._state = value
+        else:
+            self.store.columns['state'][self.row] = value
+
+    @property
+    def x(self) -> float:
+        """
+        X Position of this entity.
+
+        :return: X Position
+        :rtype: float
+        """
+
+        if self.store is None:
+            return self._x
+        return self.store.columns['x'][self.row]
+
+    @x.setter
+    def x(self, value: float) -> None:
+        if self.store is None:
+            self._x = value
+        else:
+            self.store.columns['x'][self.row] = value
+
+    @property
+    def y(self) -> float:
+        """
+        Y Position of this entity.
+
+        :return: Y Position
+        :rtype: float
+        """
+
+        if self.store is None:
+            return self._y
+        return self.store.columns['y'][self.row]
+
+    @y.setter
+    def y(self, value: float) -> None:
+        if self.store is None:
+            self._y = value
+        else:
+            self.store.columns['y'][self.row] = value
+
+    @property
+    def team(self) -> int:
+        """
+        Team this entity belongs to.
+
+        :return: Team ID
+        :rtype: int
+        """
+
+        if self.store is None:
+            return self._team
+        return int(self.store.columns['team'][self.row])
+
+    @team.setter
+    def team(self, value: int) -> None:
+        if self.store is None:
+            self._team = value
+        else:
+            self.store.columns['team'][self.row] = value
+
+    @property
+    def type_id(self) -> int:
+        """
+        Type of this entity.
+
+        This is an integer describing what this entity is (a tower, a specific troop, ect.),
+        which is used by components that describe the arena, such as observations.
+        0 means the type is unknown.
+
+        :return: Type ID
+        :rtype: int
+        """
+
+        if self.store is None:
+            return self._type_id
+        return int(self.store.columns['type_id'][self.row])
+
+    @type_id.setter
+    def type_id(self, value: int) -> None:
+        if self.store is None:
+            self._type_id = value
+        else:
+            self.store.columns['type_id'][self.row] = value
+
+    @property
+    def stats(self) -> Stats | StatsView:
+        """
+        Stats of this entity.
+
+        If we are bound to a store,
+        then a view over our row is returned.
+        Entities that are loaded with a catalog record never need their own stats,
+        so default stats are only created when they are first accessed.
+
+        :return: Entity stats
+        :rtype: Stats | StatsView
+        """
+
+        if self.store is None:
+            if self._stats is None:
+                self._stats = Stats()
+            return self._stats
+        return StatsView(self)
+
+    @stats.setter
+    def stats(self, value: Stats) -> None:
+        if self.store is None:
+            self._stats = value
+        else:
+            for name in STAT_FIELDS:
+                self.store.columns[name][self.row] = getattr(value, name)
+            self.store.names[self.row] = value.name
+
+    def bind(self, store: EntityStore, row: int) -> None:
+        """
+        Binds this entity to a row in a store.
+
+        This low-level method is not intended to
+        be worked with by end users!
+        The store is responsible for populating the row.
+
+        :param store: Store to bind to
+        :type store: EntityStore
+        :param row: Row to bind to
+        :type row: int
+        """
+
+        self.store = store
+        self.row = row
+
+    def unbind(self, keep_stats: bool=True) -> None:
+        """
+        Unbinds this entity from its store.
+
+        We copy the data in our row back onto ourselves,
+        so this entity remains valid once it leaves the store.
+        Copying the stats creates a new Stats instance,
+        which can be skipped for entities that are about to be recycled.
+
+        This low-level method is not intended to
+        be worked with by end users!
+
+        :param keep_stats: Whether to copy our stats, defaults to True
+        :type keep_stats: bool
+        """
+
+        if self.store is None:
+            return
+
+        cols = self.store.columns
+        row = self.row
+
+        self._x = cols['x'][row].item()
+        self._y = cols['y'][row].item()
+        self._team = int(cols['team'][row])
+        self._type_id = int(cols['type_id'][row])
+        self._state = int(cols['state'][row])
+
+        if keep_stats:
+            self._stats = self.store.read_stats(row)
+
+        self.store = None
+        self.row = -1
+
     @property
     def running(self) -> bool:
         """
@@ -190,7 +422,7 @@ class Entity:
         pass
 
 
-class EntityCollection(object):
+class EntityCollection(BulkLifecycleMixin):
     """
     EntityCollection - Class all entity collections MUST inherit!
 
@@ -200,22 +432,129 @@ class EntityCollection(object):
 
     We keep the list of entity's in a simple list,
     for the sake of simplicity.
-    TODO: Maybe we could implement a better data structure here
+    Each entity knows its index in the list ('slot'),
+    and removed entities are replaced by the last entity in the list,
+    so removal is O(1), though it does not preserve the order of the list.
+    When a store is used, the list is in the same order as the rows of the store.
+
+    Many entities can be loaded and unloaded at once, see load_many() and unload_many().
+    These call the same lifecycle methods on each entity,
+    but update the collection (and store) in a single pass (see BulkLifecycleMixin).
+
+    Optionally, we can also keep entity data in an EntityStore.
+    When enabled, loaded entities are bound to a row of the store,
+    allowing high level components to work with whole columns at once.
+
+    Optionally, we can also pool entities.
+    When enabled, entities created via acquire() are kept in a pool per class
+    once they are unloaded, and are recycled by later calls to acquire(),
+    instead of creating (and garbage collecting) a new entity each time.
+    References to an unloaded pooled entity must not be kept,
+    as the entity may come back as a different unit!
 
     It can be safely assumed that all methods defined here WILL
     be present in the final class that inherits us.
     """
 
-    def __init__(self) -> None:
+    def __init__(self, use_store: bool=False, use_pool: bool=False) -> None:
 
         # entity storage component
         self.entities: List[Entity] = []
 
+        # Array-backed storage, if enabled:
+        self.store: EntityStore | None = EntityStore() if use_store else None
+
+        # Unloaded entities waiting to be recycled, per class, if enabled:
+        self.pools: Dict[type, List[Entity]] | None = {} if use_pool else None
+        self.pool_hits: int = 0  # Entities acquired from a pool
+        self.pool_misses: int = 0  # Entities acquired by creating a new one
+
         self.running: bool = False  # Value determining if we are running
         self.num_loaded: int = 0  # Number of entity's currently loaded
         self.max_loaded: int = 0  # Max number of entity's loaded
 
-    def load_entity(self, entity: Entity) -> Entity:
+    def acquire(self, cls: Type[E], *args: Any, **kwargs: Any) -> E:
+        """
+        Gets an entity of a class, ready to be loaded.
+
+        If pooling is enabled and an entity of the class is waiting in the pool,
+        then it is recycled and set up with the given arguments,
+        otherwise a new entity is created with them.
+        Either way, the entity will be returned to the pool when it is unloaded.
+
+        :param cls: Class of the entity
+        :type cls: Type[E]
+        :return: Entity that has not been loaded
+        :rtype: E
+        """
+
+        pool = self.pools.get(cls) if self.pools is not None else None
+
+        if pool:
+            entity = pool.pop()
+            entity.recycle()
+            entity.setup(*args, **kwargs)
+            self.pool_hits += 1
+        else:
+            entity = cls(*args, **kwargs)
+            self.pool_misses += 1
+
+        entity.pooled = self.pools is not None
+
+        return entity
+
+    def release(self, entity: Entity) -> None:
+        """
+        Returns an unloaded entity to its pool.
+
+        This low-level method is not intended to
+        be worked with by end users!
+        Entities are released automatically when they are unloaded.
+
+        :param entity: Entity to release
+        :type entity: Entity
+        """
+
+        self.pools.setdefault(type(entity), []).append(entity)
+
+    def reclaim(self, entities: List[Entity]) -> None:
+        """
+        Removes entities from the pools.
+
+        This must be called when entities are brought back without being acquired,
+        such as when restoring a snapshot,
+        so the pools never hand out an entity that is in use.
+
+        :param entities: Entities that are in use
+        :type entities: List[Entity]
+        """
+
+        if not self.pools:
+            return
+
+        used = set(entities)
+
+        for pool in self.pools.values():
+            pool[:] = [entity for entity in pool if entity not in used]
+
+    def pool_stats(self) -> Dict[str, Any]:
+        """
+        Reports how well pooling is working.
+
+        :return: Hits, misses, hit rate, and the number of entities waiting in each pool
+        :rtype: Dict[str, Any]
+        """
+
+        total = self.pool_hits + self.pool_misses
+
+        return {
+            'hits': self.pool_hits,
+            'misses': self.pool_misses,
+            'hit_rate': self.pool_hits / total if total else 0,
+            'pooled': {cls.__name__: len(pool) for cls, pool in (self.pools or {}).items()},
+        }
+
+    def load_entity(self, entity: Entity, record: np.void | None=None) -> Entity:
         """
         Adds the given entity to the collection.
 
@@ -224,10 +563,15 @@ class EntityCollection(object):
         If we do encounter an exception,
         then we will not load this entity!
 
+        If a catalog record is given, the stats of the entity
+        are taken from the record, see catalog.get_catalog().
+
         We also return the instance of the entity we loaded.
 
         :param entity: Entity to add
         :type entity: Entity
+        :param record: Catalog row to take stats from, defaults to None
+        :type record: np.void | None
         :return: entity we loaded
         :rtype: Entity
         """
@@ -246,7 +590,7 @@ class EntityCollection(object):
 
         # Add the entity to our collection:
 
-        self._load_entity(entity)
+        self._load_entity(entity, record)
 
         # Finally, return the entity:
 
@@ -412,17 +756,9 @@ class EntityCollection(object):
 
         self.running = True
 
-        # Start all connected entity's:
-
-        for mod in self.entities:
-
-            # Determine if this entity needs starting:
-
-            if not mod.running:
+        # Start all connected entity's that need starting:
 
-                # Start the entity:
-
-                self.start_entity(mod)
+        self.start_many([mod for mod in self.entities if not mod.running])
 
     def stop(self) -> None:
         """
@@ -450,7 +786,7 @@ class EntityCollection(object):
 
         return
 
-    def _load_entity(self, entity: Entity) -> None:
+    def _load_entity(self, entity: Entity, record: np.void | None=None) -> None:
         """
         Adds the entity to our collection. 
 
@@ -459,9 +795,12 @@ class EntityCollection(object):
 
         :param entity: entity to add
         :type entity: Entity
+        :param record: Catalog row to take stats from, defaults to None
+        :type record: np.void | None
         """
 
         # Create the data to be stored:
+        entity.slot = len(self.entities)
         self.entities.append(entity)
 
         # Update our stats:
@@ -473,6 +812,22 @@ class EntityCollection(object):
 
         entity.collection = self
 
+        # Bind the entity to the store, if any:
+
+        if self.store is not None:
+            self.store.add(entity, record)
+        elif record is not None:
+            entity.stats = Stats(str(record['name']),
+                                 **{name: record[name].item() for name in STAT_FIELDS})
+
+    def _reindex(self) -> None:
+        """
+        Updates the slot of every entity, after the entity list was replaced.
+        """
+
+        for slot, entity in enumerate(self.entities):
+            entity.slot = slot
+
     def _unload_entity(self, entity: Entity) -> None:
         """
         Low-level method for unloading entities from the list.
@@ -486,8 +841,33 @@ class EntityCollection(object):
         :type key: str
         """
 
-        # Remove the offending entity:
-        self.entities.remove(entity)
+        # Remove the offending entity, by moving the last entity into its slot:
+
+        entities = self.entities
+        slot = entity.slot
+
+        if slot < 0 or slot >= len(entities) or entities[slot] is not entity:
+            raise ValueError(f"entity is not in this collection: {entity}")
+
+        last = entities.pop()
+
+        if last is not entity:
+            entities[slot] = last
+            last.slot = slot
+
+        entity.slot = -1
+
+        # Pooled entities are recycled, so they don't need a copy of their stats:
+
+        pooled = self.pools is not None and entity.pooled
+
+        # Remove the entity from the store, if any:
+
+        if self.store is not None and entity.store is self.store:
+            self.store.remove(entity, keep_stats=not pooled)
+
+        if pooled:
+            self.release(entity)
 
         # Update our stats:
 
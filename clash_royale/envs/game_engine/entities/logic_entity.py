@@ -2,7 +2,10 @@
 Entities that utilize the logical framework    
 """
 
+from __future__ import annotations
+
 from clash_royale.envs.game_engine.entities.entity import Entity
+from clash_royale.envs.game_engine.entities.store import NEVER
 from clash_royale.envs.game_engine.logic.attack import BaseAttack
 from clash_royale.envs.game_engine.logic.target import BaseTarget
 from clash_royale.envs.game_engine.logic.movement import BaseMovement
@@ -22,29 +25,80 @@ class LogicEntity(Entity):
 
     The entity will react to these components,
     and will ask them to do something each frame.
+    Components are attached to this entity when provided,
+    and are pointed at our arena when we are started.
     """
 
-    def __init__(self) -> None:
+    def __init__(self,
+                 attack: BaseAttack | None=None,
+                 target: BaseTarget | None=None,
+                 movement: BaseMovement | None=None) -> None:
         super().__init__()
 
-        self.attack: BaseAttack  # Attack component to use
-        self.target: BaseTarget  # Target component to use
-        self.movement: BaseMovement  # Movement component to use
+        self.attack: BaseAttack = attack  # Attack component to use
+        self.target: BaseTarget = target  # Target component to use
+        self.movement: BaseMovement = movement  # Movement component to use
+
+        self.target_entity: Entity | None = None  # Current entity being considered
+
+        for component in (attack, target, movement):
+            if component is not None:
+                component.entity = self
+
+    def start(self) -> None:
+        """
+        Starts this entity, attaching our components to the arena.
+        """
+
+        for component in (self.attack, self.target, self.movement):
+            if component is not None:
+                component.arena = self.collection
+
+        super().start()
+
+    def recycle(self) -> None:
+        """
+        Resets this entity in place, along with the state of our components.
+        """
 
-        self.target_entity: Entity  # Current entity being considered
+        super().recycle()
+
+        self.target_entity = None
+
+        if self.attack is not None:
+            self.attack.last_attack = NEVER
+
+    def unbind(self, keep_stats: bool=True) -> None:
+        """
+        Unbinds this entity from its store.
+
+        We also copy the last attack frame back into our attack component.
+        """
+
+        if self.store is not None and self.attack is not None:
+            self.attack.last_attack = int(self.store.columns['last_attack'][self.row])
+
+        super().unbind(keep_stats)
 
     def simulate(self):
         """
         Preforms an entity simulation.
         """
 
+        prof = getattr(self.collection, 'profiler', None)
+
+        if prof is not None:
+            prof.count('calls.target')
+            prof.count('calls.attack')
+            prof.count('calls.movement')
+
         # First, ask for targeting:
 
         self.target_entity = self.target.target()
 
         # Next, determine attack:
 
-        self.attack.attack()
+        self.attack.attack(self.collection.frame)
 
         # Finally, determine movement:
 
@@ -0,0 +1,449 @@
+"""
+Array-backed entity storage
+
+This file contains a structure-of-arrays store for entity data.
+Instead of each entity keeping its position and stats on its own object,
+the data for every entity lives in contiguous NumPy columns,
+and entities simply act as views over a single row.
+
+This allows for high level components to operate on whole columns at once,
+which is MUCH faster than asking each entity to work with its own data.
+"""
+
+from __future__ import annotations
+
+import dataclasses
+from typing import TYPE_CHECKING, Dict, List, Sequence, Tuple
+
+import numpy as np
+import numpy.typing as npt
+
+from clash_royale.envs.game_engine.struct import Stats
+
+NEVER: int = -(1 << 62)  # Frame of last attack for entities that have never attacked
+
+if TYPE_CHECKING:
+    # Only import for typechecking to prevent circular dependency
+    from clash_royale.envs.game_engine.entities.entity import Entity
+
+
+# Names of all numeric stats, in the order they are defined in Stats:
+STAT_FIELDS: List[str] = [field.name for field in dataclasses.fields(Stats) if field.name != 'name']
+
+
+def swap_remove_order(size: int, removed: Sequence[int]) -> List[int]:
+    """
+    Determines the layout left behind by swap-removing many items, one after another.
+
+    Each removal moves the last item into the hole it leaves,
+    so the result is the same as removing the items individually,
+    but the items themselves only need to be moved once.
+
+    :param size: Number of items before removal
+    :type size: int
+    :param removed: Original index of each item to remove, in removal order
+    :type removed: Sequence[int]
+    :return: Original index of the item that ends up at each index
+    :rtype: List[int]
+    """
+
+    order = list(range(size))  # Original index of the item at each index
+    position = list(range(size))  # Current index of each original item
+
+    for index in removed:
+
+        hole = position[index]
+        moved = order.pop()
+
+        if hole < len(order):
+            order[hole] = moved
+            position[moved] = hole
+
+    return order
+
+
+class EntityStore:
+    """
+    EntityStore - Structure-of-arrays storage for entities
+
+    We keep one NumPy column per entity attribute
+    (position, team, type, state, and all numeric stats).
+    Rows are densely packed, so rows [0, size) are always valid entities.
+    When an entity is removed, the last row is moved into its place,
+    which keeps removal O(1) and the columns contiguous.
+
+    Entities that are bound to a store read and write
+    all of their data through their row,
+    so the store is always the source of truth for bound entities.
+
+    Columns are preallocated and doubled in size when full,
+    so views obtained via column() are only valid until the next add().
+    Likewise, the 'target' column holds row numbers,
+    so it is only valid until the next add() or remove().
+    """
+
+    COLUMNS: Dict[str, npt.DTypeLike] = {
+        'x': np.float64,  # X Position
+        'y': np.float64,  # Y Position
+        'team': np.int8,  # Team this entity belongs to
+        'type_id': np.int16,  # Type of entity, see Entity
+        'state': np.int8,  # Entity state, see Entity
+        'speed': np.float64,
+        'attack_range': np.float64,
+        'sight_range': np.float64,
+        'health': np.int64,
+        'damage': np.int64,
+        'troop_size': np.float64,
+        'attack_delay': np.int64,
+        'flying': np.bool_,
+        'target': np.int64,  # Row of the current target, -1 if none
+        'last_attack': np.int64,  # Frame of the last attack
+    }
+
+    def __init__(self, capacity: int=64) -> None:
+
+        self.size: int = 0  # Number of rows in use
+        self.capacity: int = max(1, capacity)  # Number of rows allocated
+
+        self.columns: Dict[str, npt.NDArray] = {
+            name: np.zeros(self.capacity, dtype=dtype) for name, dtype in self.COLUMNS.items()
+        }
+
+        self.names: List[str] = []  # Entity names, not numeric so kept in a list
+        self.entities: List[Entity] = []  # Entity that owns each row
+
+    def column(self, name: str) -> npt.NDArray:
+        """
+        Returns a view of the in-use rows of a column.
+
+        :param name: Name of the column
+        :type name: str
+        :return: View of rows [0, size) of the column
+        :rtype: npt.NDArray
+        """
+
+        return self.columns[name][:self.size]
+
+    def add(self, entity: Entity, record: np.void | None=None) -> int:
+        """
+        Adds an entity to the store, and binds the entity to its new row.
+
+        We copy the current position, state and stats of the entity
+        into the new row before binding.
+        If a catalog record is given, the stats are copied from the record instead,
+        so the entity never needs a Stats instance.
+
+        :param entity: Entity to add
+        :type entity: Entity
+        :param record: Catalog row to copy stats from, defaults to None
+        :type record: np.void | None
+        :return: Row the entity was placed in
+        :rtype: int
+        """
+
+        if self.size == self.capacity:
+            self._grow()
+
+        row = self.size
+        self.size += 1
+
+        cols = self.columns
+        cols['x'][row] = entity.x
+        cols['y'][row] = entity.y
+        cols['team'][row] = entity.team
+        cols['type_id'][row] = entity.type_id
+        cols['state'][row] = entity.state
+        cols['target'][row] = -1
+        cols['last_attack'][row] = getattr(getattr(entity, 'attack', None), 'last_attack', NEVER)
+
+        if record is None:
+            stats = entity.stats
+            for name in STAT_FIELDS:
+                cols[name][row] = getattr(stats, name)
+            self.names.append(stats.name)
+        else:
+            for name in STAT_FIELDS:
+                cols[name][row] = record[name]
+            self.names.append(str(record['name']))
+
+        self.entities.append(entity)
+
+        entity.bind(self, row)
+
+        return row
+
+    def add_many(self, entities: List[Entity], records: np.void | npt.NDArray[np.void] | None=None) -> None:
+        """
+        Adds many entities to the store at once, see add().
+
+        Each column is written once for all of the entities.
+
+        :param entities: Entities to add
+        :type entities: List[Entity]
+        :param records: Catalog row for every entity, or one row to use for all of them,
+            defaults to None (copy the stats of each entity)
+        :type records: np.void | npt.NDArray[np.void] | None
+        """
+
+        count = len(entities)
+
+        while self.size + count > self.capacity:
+            self._grow()
+
+        rows = slice(self.size, self.size + count)
+        cols = self.columns
+
+        cols['x'][rows] = [entity.x for entity in entities]
+        cols['y'][rows] = [entity.y for entity in entities]
+        cols['team'][rows] = [entity.team for entity in entities]
+        cols['type_id'][rows] = [entity.type_id for entity in entities]
+        cols['state'][rows] = [entity.state for entity in entities]
+        cols['target'][rows] = -1
+        cols['last_attack'][rows] = [getattr(getattr(entity, 'attack', None), 'last_attack', NEVER)
+                                     for entity in entities]
+
+        if records is None:
+            stats = [entity.stats for entity in entities]
+            for name in STAT_FIELDS:
+                cols[name][rows] = [getattr(stat, name) for stat in stats]
+            self.names.extend(stat.name for stat in stats)
+        else:
+            for name in STAT_FIELDS:
+                cols[name][rows] = records[name]
+            if isinstance(records, np.void):
+                self.names.extend([str(records['name'])] * count)
+            else:
+                self.names.extend(records['name'].tolist())
+
+        for row, entity in enumerate(entities, start=self.size):
+            self.entities.append(entity)
+            entity.bind(self, row)
+
+        self.size += count
+
+    def remove(self, entity: Entity, keep_stats: bool=True) -> None:
+        """
+        Removes an entity from the store.
+
+        The entity is unbound, and receives a copy of its row data.
+        The last row is then moved into the freed row.
+
+        :param entity: Entity to remove
+        :type entity: Entity
+        :param keep_stats: Whether the entity receives a copy of its stats, defaults to True
+        :type keep_stats: bool
+        """
+
+        row = entity.row
+        last = self.size - 1
+
+        entity.unbind(keep_stats)
+
+        if row != last:
+
+            # Move the last row into the hole:
+
+            for col in self.columns.values():
+                col[row] = col[last]
+
+            moved = self.entities[last]
+            self.entities[row] = moved
+            self.names[row] = self.names[last]
+            moved.row = row
+
+        self.entities.pop()
+        self.names.pop()
+        self.size -= 1
+
+    def remove_many(self, entities: List[Entity], keep_stats: bool | Sequence[bool]=True) -> None:
+        """
+        Removes many entities from the store at once.
+
+        Rows end up exactly where they would if each entity was removed in turn via remove(),
+        but each column is rearranged only once.
+
+        :param entities: Entities to remove
+        :type entities: List[Entity]
+        :param keep_stats: Whether the entities receive a copy of their stats,
+            either for all of them or for each one, defaults to True
+        :type keep_stats: bool | Sequence[bool]
+        """
+
+        if not entities:
+            return
+
+        removed = [entity.row for entity in entities]
+
+        if isinstance(keep_stats, bool):
+            keep_stats = [keep_stats] * len(entities)
+
+        for entity, keep in zip(entities, keep_stats):
+            entity.unbind(keep)
+
+        order = swap_remove_order(self.size, removed)
+        size = len(order)
+        index = np.array(order, dtype=np.int64)
+
+        for col in self.columns.values():
+            col[:size] = col[index]
+
+        self.entities[:] = [self.entities[row] for row in order]
+        self.names[:] = [self.names[row] for row in order]
+        self.size = size
+
+        for row, original in enumerate(order):
+            if row != original:
+                self.entities[row].row = row
+
+    def read_stats(self, row: int) -> Stats:
+        """
+        Creates a standalone copy of the stats in a row.
+
+        :param row: Row to read
+        :type row: int
+        :return: Stats of the row
+        :rtype: Stats
+        """
+
+        cols = self.columns
+        return Stats(self.names[row], **{name: cols[name][row].item() for name in STAT_FIELDS})
+
+    def clear(self) -> None:
+        """
+        Removes all entities from the store.
+
+        Entities are unbound, and receive a copy of their data.
+        """
+
+        for entity in self.entities:
+            entity.unbind()
+
+        self.entities.clear()
+        self.names.clear()
+        self.size = 0
+
+    def snapshot(self) -> Tuple[int, Dict[str, npt.NDArray], List[str], List[Entity]]:
+        """
+        Captures the contents of the store.
+
+        The in-use rows of each column are copied,
+        and entities are captured by reference (along with the row they are in),
+        so snapshots should be restored into the store that created them.
+
+        :return: Snapshot that can be passed to restore()
+        :rtype: Tuple[int, Dict[str, npt.NDArray], List[str], List[Entity]]
+        """
+
+        return (self.size,
+                {name: col[:self.size].copy() for name, col in self.columns.items()},
+                list(self.names),
+                list(self.entities))
+
+    def restore(self, snapshot: Tuple[int, Dict[str, npt.NDArray], List[str], List[Entity]]) -> None:
+        """
+        Restores the contents of the store from a snapshot.
+
+        Entities that are in the store but not in the snapshot are unbound,
+        and entities in the snapshot are bound to their captured rows,
+        even if they have been removed since.
+        The snapshot is left untouched, so it can be restored many times.
+
+        :param snapshot: Snapshot created by snapshot()
+        :type snapshot: Tuple[int, Dict[str, npt.NDArray], List[str], List[Entity]]
+        """
+
+        size, columns, names, entities = snapshot
+
+        # Unbind entities added since the snapshot, while their rows are still intact:
+
+        kept = set(entities)
+
+        for entity in self.entities:
+            if entity not in kept:
+                entity.unbind()
+
+        while self.capacity < size:
+            self._grow()
+
+        for name, col in columns.items():
+            self.columns[name][:size] = col
+
+        self.size = size
+        self.names = list(names)
+        self.entities = list(entities)
+
+        for row, entity in enumerate(self.entities):
+            entity.bind(self, row)
+
+    @property
+    def nbytes(self) -> int:
+        """
+        Number of bytes allocated for the numeric columns.
+
+        :return: Bytes allocated
+        :rtype: int
+        """
+
+        return sum(col.nbytes for col in self.columns.values())
+
+    def _grow(self) -> None:
+        """
+        Doubles the capacity of all columns.
+        """
+
+        self.capacity *= 2
+
+        for name, col in self.columns.items():
+            new = np.zeros(self.capacity, dtype=col.dtype)
+            new[:self.size] = col[:self.size]
+            self.columns[name] = new
+
+
+class StatsView:
+    """
+    StatsView - Stats compatible view over a store row
+
+    Entities bound to a store hand this out instead of their Stats,
+    so that code like `entity.stats.health -= 10` writes straight into the store.
+    """
+
+    __slots__ = ('entity',)
+
+    def __init__(self, entity: Entity) -> None:
+        self.entity: Entity = entity
+
+    @property
+    def name(self) -> str:
+        """
+        Name of the entity
+
+        :return: Entity name
+        :rtype: str
+        """
+
+        return self.entity.store.names[self.entity.row]
+
+    @name.setter
+    def name(self, value: str) -> None:
+        self.entity.store.names[self.entity.row] = value
+
+    def __repr__(self) -> str:
+        return f"StatsView({self.entity.store.read_stats(self.entity.row)!r})"
+
+
+def _stat_property(name: str) -> property:
+    """
+    Creates a property that maps a stat onto its store column.
+    """
+
+    def fget(self: StatsView):
+        return self.entity.store.columns[name][self.entity.row]
+
+    def fset(self: StatsView, value) -> None:
+        self.entity.store.columns[name][self.entity.row] = value
+
+    return property(fget, fset, doc=f"'{name}' column of the bound row")
+
+
+for _name in STAT_FIELDS:
+    setattr(StatsView, _name, _stat_property(_name))
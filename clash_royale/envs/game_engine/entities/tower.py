@@ -0,0 +1,74 @@
+"""
+Tower entities
+
+Each player starts with three towers, a king tower and two princess towers.
+Towers are entities that attack anything that comes within range,
+but never move.
+"""
+
+from __future__ import annotations
+
+from typing import Dict, List, Tuple
+
+from clash_royale.envs.game_engine.catalog import card_id, stats_of
+from clash_royale.envs.game_engine.entities.logic_entity import LogicEntity
+from clash_royale.envs.game_engine.logic.attack import SingleAttack
+from clash_royale.envs.game_engine.logic.target import RadiusTarget
+from clash_royale.envs.game_engine.struct import Stats
+
+# Type IDs of towers, which are their catalog IDs:
+
+KING_TOWER: int = card_id('king_tower')
+PRINCESS_TOWER: int = card_id('princess_tower')
+
+# Stats of each tower type, at the reference frame rate of the catalog:
+
+TOWER_STATS: Dict[int, Stats] = {
+    KING_TOWER: stats_of(KING_TOWER),
+    PRINCESS_TOWER: stats_of(PRINCESS_TOWER),
+}
+
+
+def tower_layout(width: int, height: int) -> List[Tuple[int, float, float, int]]:
+    """
+    Determines the starting towers of an arena.
+
+    Player 0 defends the bottom of the arena (low y),
+    and player 1 defends the top, mirrored.
+
+    :param width: Width of the arena
+    :type width: int
+    :param height: Height of the arena
+    :type height: int
+    :return: List of (type ID, x, y, team) for each tower
+    :rtype: List[Tuple[int, float, float, int]]
+    """
+
+    layout = []
+
+    for team in (0, 1):
+        for type_id, x, y in ((KING_TOWER, width / 2, 3),
+                              (PRINCESS_TOWER, 3.5, 6.5),
+                              (PRINCESS_TOWER, width - 3.5, 6.5)):
+            layout.append((type_id, x, y if team == 0 else height - y, team))
+
+    return layout
+
+
+class Tower(LogicEntity):
+    """
+    Tower - A defensive building that attacks from a fixed position
+
+    Towers use the stats of their type,
+    and target the closest enemy within their sight range.
+    Stats are converted to the given frame rate.
+    """
+
+    def __init__(self, type_id: int, x: float, y: float, team: int, fps: int=30) -> None:
+        super().__init__(attack=SingleAttack(), target=RadiusTarget())
+
+        self.type_id = type_id
+        self.x = x
+        self.y = y
+        self.team = team
+        self.stats = stats_of(type_id, fps)
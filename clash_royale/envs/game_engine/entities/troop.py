@@ -0,0 +1,40 @@
+"""
+Troop entities
+
+Troops are the units spawned by playing a card.
+They target the closest enemy within sight, walk towards it,
+and attack once it is within range.
+"""
+
+from __future__ import annotations
+
+from clash_royale.envs.game_engine.entities.logic_entity import LogicEntity
+from clash_royale.envs.game_engine.logic.attack import SingleAttack
+from clash_royale.envs.game_engine.logic.movement import SimpleMovement
+from clash_royale.envs.game_engine.logic.target import RadiusTarget
+
+
+class Troop(LogicEntity):
+    """
+    Troop - A unit spawned from a card
+
+    Stats are copied from the catalog row of the card when loaded,
+    see Arena.spawn().
+    Troops are pooled by the arena, so they are configured in setup().
+    """
+
+    def __init__(self, type_id: int, x: float, y: float, team: int) -> None:
+        super().__init__(attack=SingleAttack(), target=RadiusTarget(), movement=SimpleMovement())
+
+        self.setup(type_id, x, y, team)
+
+    def setup(self, type_id: int, x: float, y: float,  # pylint: disable=arguments-differ
+              team: int) -> None:
+        """
+        Places this troop, see Entity.setup().
+        """
+
+        self.type_id = type_id
+        self.x = x
+        self.y = y
+        self.team = team
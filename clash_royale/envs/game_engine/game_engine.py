@@ -8,15 +8,46 @@ as they will greatly simplify the simulation procedure.
 
 from __future__ import annotations
 
-from typing import List, Tuple
+import dataclasses
+import math
+import random
+import struct
+import zlib
+from typing import TYPE_CHECKING, Any, Dict, List, Tuple
 import numpy as np
 import numpy.typing as npt
-import pygame
 
 from clash_royale.envs.game_engine.arena import Arena
-from clash_royale.envs.game_engine.struct import Scheduler, GameScheduler, DefaultScheduler
+from clash_royale.envs.game_engine.struct import Scheduler, DefaultScheduler, \
+    ATTACK_READY, DEPLOY, ELIXIR_THRESHOLD
 from clash_royale.envs.game_engine.player import Player
-from clash_royale.envs.game_engine.card import Card
+from clash_royale.envs.game_engine.card import Card, make_deck
+from clash_royale.envs.game_engine.entities.entity import Entity
+from clash_royale.envs.game_engine.features import build_planes
+from clash_royale.envs.game_engine.profiling import Profiler
+from clash_royale.envs.game_engine.render import make_renderer
+from clash_royale.envs.game_engine.replay import Replay, ReplayRecorder
+
+if TYPE_CHECKING:
+    # Only import for typechecking, renderers are loaded when first used
+    from clash_royale.envs.game_engine.render.base import BaseRenderer
+
+
+@dataclasses.dataclass(frozen=True, slots=True)
+class Snapshot:
+    """
+    Snapshot - Captured state of a GameEngine
+
+    Each field holds the snapshot of a component,
+    see the snapshot() method of each component for the contents.
+    Snapshots are never modified when restored,
+    so one snapshot can be restored any number of times.
+    """
+
+    arena: Tuple[Any, ...]
+    player1: Tuple[Any, ...]
+    player2: Tuple[Any, ...]
+    scheduler: Tuple[Any, ...]
 
 
 class GameEngine:
@@ -35,17 +66,24 @@ class GameEngine:
     """
 
     def __init__(self,
-                 deck1: List[str],
-                 deck2: List[str],
+                 deck1: List[str | int | Card],
+                 deck2: List[str | int | Card],
                  width: int=18,
                  height: int=32,
                  resolution: Tuple[int, int]=(128, 128),
-                 fps: int=30
+                 fps: int=30,
+                 renderer: str='numpy'
                  ) -> None:
         """
         The game_engine should be initialized with settings such as resolution
         and framerate, this shouldn't be used to initialize
         any specific actual game, that will be handled in reset.
+
+        Decks are lists of card names or catalog IDs, see catalog.CARDS.
+
+        The renderer is selected by name, see render.RENDERERS.
+        The default 'numpy' renderer needs no display, and is fine for headless training.
+        Renderers are only created (and imported) the first time an image is made.
         """
 
         self.width: int = width  # Width of arena
@@ -53,50 +91,242 @@ class GameEngine:
         self.resolution: Tuple[int, int] = resolution
         self.fps: int = fps
 
-        self.arena: Arena = Arena(width=self.width, height=self.height)
-        self.player1: Player = Player(deck1, fps)
-        self.player2: Player = Player(deck2, fps)
+        self.arena: Arena = Arena(width=self.width, height=self.height, fps=fps)
+        self.player1: Player = Player(make_deck(deck1), fps)
+        self.player2: Player = Player(make_deck(deck2), fps)
 
         self.scheduler: Scheduler = Scheduler(fps) # counting frames
         self.game_scheduler: DefaultScheduler = DefaultScheduler(self.scheduler) # determining elixir etc.
 
-    def reset(self) -> None:
+        self.renderer_name: str = renderer
+        self.renderer: BaseRenderer | None = None  # Created by make_image()
+
+        self.seed: int = 0  # Seed of the current game, see reset()
+        self.recorder: ReplayRecorder | None = None  # Recorder of the current game, if any
+        self.profiler: Profiler | None = None  # Profiler of the simulation, if any
+
+        # Legal action masks for each player, see legal_actions():
+
+        self.legal_masks: npt.NDArray[np.bool_] = np.zeros((2, height, width, 4), dtype=bool)
+        self.legal_keys: List[Tuple[int, bytes] | None] = [None, None]
+
+    def reset(self, seed: int | None=None) -> None:
         """
         This should be called to reset the game engine
         to its default/starting state.
 
-        Arena.reset() method missing.
-        Player.reset() method missing.
+        All randomness in a game (currently, deck shuffling) is derived from the seed,
+        so games with the same seed and actions play out the same.
+        If no seed is given, a random one is chosen and kept in 'seed',
+        so every game can be reproduced.
+        If we are recording, a new replay is started.
+
+        :param seed: Seed of the new game, defaults to None
+        :type seed: int | None
         """
 
+        if seed is None:
+            seed = random.getrandbits(63)
+
+        self.seed = seed
+        rng = random.Random(seed)
+
         self.arena.reset()
-        self.player1.reset(elixir=5)
-        self.player2.reset(elixir=5)
+        self.player1.reset(elixir=5, seed=rng.getrandbits(63))
+        self.player2.reset(elixir=5, seed=rng.getrandbits(63))
         self.scheduler.reset()
+        self.game_scheduler.reset()
+
+        if self.recorder is not None:
+            self.recorder.begin(self)
+
+    def start_recording(self, checksum_interval: int=0) -> ReplayRecorder:
+        """
+        Starts recording the current game into a replay.
+
+        Recording must start at the first frame of a game,
+        and continues into new games when reset() is called.
+
+        :param checksum_interval: Frames between recorded checksums, defaults to 0 (none)
+        :type checksum_interval: int
+        :return: Recorder of the game
+        :rtype: ReplayRecorder
+        """
+
+        self.recorder = ReplayRecorder(checksum_interval)
+        self.recorder.begin(self)
+
+        return self.recorder
+
+    def stop_recording(self) -> Replay:
+        """
+        Stops recording, and returns the replay of the current game.
+
+        :return: Replay of the game so far
+        :rtype: Replay
+        """
+
+        replay = self.recorder.replay
+        self.recorder = None
+
+        return replay
+
+    def enable_profiling(self, profiler: Profiler | None=None) -> Profiler:
+        """
+        Starts recording timings and counters of the simulation.
+
+        See the profiling module for what is recorded.
+
+        :param profiler: Profiler to record into, defaults to None (create a new one)
+        :type profiler: Profiler | None
+        :return: Profiler that is recording
+        :rtype: Profiler
+        """
+
+        self.profiler = profiler or Profiler()
+        self.arena.profiler = self.profiler
+
+        return self.profiler
+
+    def disable_profiling(self) -> Profiler | None:
+        """
+        Stops recording timings and counters of the simulation.
+
+        :return: Profiler that was recording, if any
+        :rtype: Profiler | None
+        """
+
+        profiler = self.profiler
+
+        self.profiler = None
+        self.arena.profiler = None
+
+        return profiler
+
+    def checksum(self) -> int:
+        """
+        Computes a checksum of the simulation state.
+
+        We hash the entity store, along with the frame, elixir and hand of each player.
+        Two engines with the same checksum are (almost certainly) in the same state,
+        so this can be used to detect when simulations diverge.
+
+        :return: CRC32 of the state
+        :rtype: int
+        """
+
+        store = self.arena.store
+        crc = zlib.crc32(struct.pack('<q', self.scheduler.frame()))
+
+        for name in store.COLUMNS:
+            crc = zlib.crc32(store.column(name).tobytes(), crc)
+
+        for player in (self.player1, self.player2):
+            crc = zlib.crc32(struct.pack('<d', player.elixir), crc)
+            crc = zlib.crc32(player.hand_ids().tobytes(), crc)
+
+        return crc
+
+    def snapshot(self) -> Snapshot:
+        """
+        Captures the state of the game.
+
+        This is much cheaper than copying the engine,
+        as entity data is captured by copying the columns of the entity store,
+        and everything else is a handful of small lists.
+        Entities themselves are captured by reference,
+        so snapshots must be restored into the engine that created them.
+
+        :return: Snapshot of the game
+        :rtype: Snapshot
+        """
+
+        return Snapshot(self.arena.snapshot(),
+                        self.player1.snapshot(),
+                        self.player2.snapshot(),
+                        self.scheduler.snapshot())
+
+    def restore(self, snap: Snapshot) -> None:
+        """
+        Restores the game to a snapshot created by snapshot().
+
+        :param snap: Snapshot to restore
+        :type snap: Snapshot
+        """
+
+        self.arena.restore(snap.arena)
+        self.player1.restore(snap.player1)
+        self.player2.restore(snap.player2)
+        self.scheduler.restore(snap.scheduler)
 
     def make_image(self, player_id: int) -> npt.NDArray[np.uint8]:
         """
-        Asks the arena to render itself.
+        Renders the arena from the perspective of a player.
+
+        :param player_id: Player to render for
+        :type player_id: int
+        :return: Image with shape (resolution[0], resolution[1], 3)
+        :rtype: npt.NDArray[np.uint8]
+        """
+
+        if self.renderer is None:
+            self.renderer = make_renderer(self.renderer_name, self.width, self.height, self.resolution)
+
+        if self.profiler is None:
+            return self._render(player_id)
+
+        with self.profiler.phase('render'):
+            return self._render(player_id)
+
+    def _render(self, player_id: int) -> npt.NDArray[np.uint8]:
+        """
+        Renders the arena, copying the image only if the renderer reuses its buffer.
+        """
 
-        TODO: We need to figure out this procedure!
-        Arena should render any generic components,
-        and then ask the entities to render themselves.
+        image = self.renderer.render(self.arena, player_id)
 
-        individual sprite rendering methods required.
-        arena.get_entities() missing
+        if self.renderer.reuses_buffer:
+            return image.copy()
+
+        return image
+
+    def make_features(self, player_id: int) -> Dict[str, npt.NDArray[Any]]:
         """
+        Describes the game from the perspective of a player,
+        without rendering anything.
+
+        We return the planes built by features.build_planes(),
+        as well as the elixir, hand and next card of the player.
+        Cards are described by their catalog ID,
+        and the elixir cost of each card in hand is included.
+        """
+
+        player: Player = self.player1 if player_id == 0 else self.player2
+        prof = self.profiler
 
-        entities: List[Entity] = self.arena.get_entities()
-        canvas = pygame.Surface(size=self.resolution)
+        if prof is not None:
+            start = prof.begin()
 
-        #rendering logic goes here...
+        features = {
+            'planes': build_planes(self.arena, player_id),
+            'elixir': np.array([player.elixir], dtype=np.float32),
+            'hand': player.hand_ids(),
+            'hand_elixir': player.hand_cost().astype(np.int64),
+            'next': np.array([player.card_ids[player.cycle[player.cycle_head]]], dtype=np.int64),
+        }
 
-        return np.array(pygame.surfarray.pixels3d(canvas))
+        if prof is not None:
+            prof.since('features', start)
+
+        return features
 
     def apply(self, player_id: int, action: Tuple[int, int, int] | None) -> None:
         """
         Applies a given action to the environment, checks
         for validity of the action via asserts.
+
+        The units of the card are spawned straight away,
+        and start once the card has finished deploying.
         """
         if action is None:
             return
@@ -111,44 +341,257 @@ class GameEngine:
         else:
             curr_player = self.player2
 
-        card: Card = curr_player.hand[action[2]]
+        card: Card = curr_player.cards[curr_player.hand_slots[action[2]]]
         assert card.elixir <= curr_player.elixir
 
-        self.arena.play_card(action[0], action[1], card)
+        prof = self.profiler
+
+        if prof is not None:
+            start = prof.begin()
+
+        units = self.arena.play_card(action[0], action[1], card, player_id)
         curr_player.play_card(action[2])
 
-    def step(self, frames: int=1) -> None:
+        # Start the units once they have deployed:
+
+        deploy_time = int(self.arena.catalog[card.id]['deploy_time'])
+
+        if deploy_time > 0:
+            self.scheduler.schedule(self.scheduler.frame() + deploy_time, DEPLOY, units)
+        else:
+            self.arena.start_many(units)
+
+        if prof is not None:
+            prof.since('spawn', start)
+            prof.count('cards_played')
+            prof.count('units_spawned', len(units))
+
+        if self.recorder is not None:
+            self.recorder.on_apply(player_id, action)
+
+    def step(self, frames: int=1) -> List[Tuple[int, int, int]]:
         """
         Steps through a number of frames,
         applying simulations and updating required components.
+
+        Stepping many frames at once gives the same result as stepping one by one.
+        The arena only targets and attacks once per call to Arena.step(),
+        so we split the frames at the next change in the arena
+        (see Arena.next_event_frame()) and at each pending event,
+        and step the arena through each part at once.
+
+        Elixir is integrated across any phase transitions within the step.
+        We report every whole elixir amount that a player reached during the step,
+        along with the frame it was reached on.
+
+        :param frames: Number of frames to step
+        :type frames: int
+        :return: (player ID, elixir amount, frame) for each amount reached, in frame order
+        :rtype: List[Tuple[int, int, int]]
         """
 
+        prof = self.profiler
+
+        if prof is not None:
+            start = prof.begin()
+
+        crossings = []
+        remaining = frames
+
+        while remaining > 0:
+
+            # Determine how far we can step before something interesting happens:
+
+            part = 1 if remaining == 1 else min(self._next_split_frame() - self.scheduler.frame(),
+                                                remaining)
+
+            crossings += self._advance(part)
+            remaining -= part
+
+        if self.recorder is not None:
+            self.recorder.on_step(self, frames)
+
+        if prof is not None:
+            prof.since('step', start)
+            prof.count('frames', frames)
+
+        return sorted(crossings, key=lambda crossing: (crossing[2], crossing[0]))
+
+    def _advance(self, frames: int) -> List[Tuple[int, int, int]]:
+        """
+        Steps through a number of frames where nothing interesting happens,
+        see step().
+
+        :param frames: Number of frames to step, at most up to the next interesting frame
+        :type frames: int
+        :return: (player ID, elixir amount, frame) for each amount reached
+        :rtype: List[Tuple[int, int, int]]
+        """
+
+        prof = self.profiler
+
+        if prof is not None:
+            prof.begin()
+
         # update elixir first, order TBD.
-        elixir_rate: float = self.game_scheduler.elixir_rate()
-        self.player1.step(elixir_rate, frames)
-        self.player2.step(elixir_rate, frames)
+
+        frame = self.scheduler.frame()
+        gained = float(self.game_scheduler.elixir_gained_at(frame, frames))
+
+        crossings = []
+
+        for player_id, player in enumerate((self.player1, self.player2)):
+
+            before = player.elixir
+            player.add_elixir(gained)
+
+            for amount in range(math.floor(before) + 1, math.floor(player.elixir) + 1):
+                crossings.append((player_id, amount,
+                                  int(self.game_scheduler.elixir_frame_at(frame, amount - before))))
+
+        if prof is not None:
+            prof.lap('elixir')
 
         self.arena.step(frames)
-        self.scheduler.step(frames)
 
+        for event in self.scheduler.step(frames):
+
+            if event.kind == DEPLOY:
+                self.arena.start_many([unit for unit in event.data if unit.state == Entity.LOADED])
 
-    def legal_actions(self, player_id: int) -> npt.NDArray[np.float64]:
+        if prof is not None:
+            prof.lap('deploy')
+
+        return crossings
+
+    def _next_split_frame(self) -> int:
         """
-        Returns a list of legal actions.
+        Determines the frame a step must be split at, see step().
+
+        Only changes in the arena and pending events (such as deploys and phase transitions)
+        change what a step does, so unlike next_event_frame(),
+        the events that depend on the current state are left as they are.
+
+        :return: Frame to split at, always after the current frame
+        :rtype: int
         """
-        actions = np.zeros(shape=(32, 18, 4), dtype=np.float64)
 
-        hand: List[int]
-        if player_id == 0:
-            hand = self.player1.get_pseudo_legal_cards()
-        else:
-            hand = self.player2.get_pseudo_legal_cards()
+        frame = self.scheduler.frame()
+        arena_frame = self.arena.next_event_frame()
+
+        if arena_frame == frame + 1:
+            return arena_frame
+
+        next_frame = self.scheduler.next_event_frame()
+        frames = [value for value in (arena_frame, next_frame) if value is not None]
 
-        placement_mask = self.arena.get_placement_mask()
-        for card_index in hand:
-            actions[placement_mask, card_index] = 1
+        return max(min(frames), frame + 1) if frames else frame + 1
+
+    def next_event_frame(self) -> int:
+        """
+        Determines the next frame where something interesting happens.
+
+        We first refresh the events that depend on the current state,
+        which are the next attack (or movement) in the arena,
+        and the frame each player can afford another card in their hand.
+        The earliest pending event is then taken from the scheduler,
+        which also holds the phase transitions of the game.
+
+        Nothing changes between now and the returned frame,
+        so stepping straight to it is the same as stepping frame by frame.
+
+        :return: Frame of the next event, always after the current frame
+        :rtype: int
+        """
+
+        scheduler = self.scheduler
+        frame = scheduler.frame()
+
+        # Next change in the arena, nothing can come sooner if it changes every frame:
+
+        arena_frame = self.arena.next_event_frame()
+
+        if arena_frame == frame + 1:
+            return arena_frame
+
+        scheduler.cancel_kind(ATTACK_READY)
+        scheduler.cancel_kind(ELIXIR_THRESHOLD)
+
+        if arena_frame is not None:
+            scheduler.schedule(arena_frame, ATTACK_READY)
+
+        # Next card each player can afford:
+
+        for player_id, player in enumerate((self.player1, self.player2)):
+
+            costs = player.hand_cost()
+            costs = costs[costs > player.elixir]
+
+            if costs.size:
+                ready = int(self.game_scheduler.elixir_frame_at(frame, costs.min() - player.elixir))
+                scheduler.schedule(max(ready, frame + 1), ELIXIR_THRESHOLD, player_id)
+
+        next_frame = scheduler.next_event_frame()
+
+        return frame + 1 if next_frame is None else max(next_frame, frame + 1)
+
+    def fast_forward(self, max_frames: int) -> int:
+        """
+        Steps straight to the next interesting frame, see next_event_frame().
+
+        :param max_frames: Maximum number of frames to step
+        :type max_frames: int
+        :return: Number of frames stepped
+        :rtype: int
+        """
+
+        frames = min(self.next_event_frame() - self.scheduler.frame(), max_frames)
+
+        self.step(frames)
+
+        return frames
+
+
+    def legal_actions(self, player_id: int) -> npt.NDArray[np.bool_]:
+        """
+        Returns a mask of legal actions, with shape (height, width, 4).
+
+        The mask is kept in a persistent buffer per player,
+        which is only recomputed when the placement territory
+        or the set of affordable cards changes.
+        The returned array is read-only,
+        and will be updated in place by later calls.
+        """
+
+        player: Player = self.player1 if player_id == 0 else self.player2
+        affordable = player.affordable()
+
+        key = (self.arena.placement_version, affordable.tobytes())
+        mask = self.legal_masks[player_id]
+
+        if self.legal_keys[player_id] != key:
+
+            # Something changed, recompute the mask:
+
+            np.logical_and(self.arena.get_placement_mask(player_id)[..., None], affordable,
+                           out=mask)
+
+            self.legal_keys[player_id] = key
+
+        view = mask.view()
+        view.flags.writeable = False
+
+        return view
+
+    def legal_actions_flat(self, player_id: int) -> npt.NDArray[np.bool_]:
+        """
+        Returns a flat view of the legal action mask, matching Discrete(height * width * 4).
+
+        Flat index (y * width + x) * 4 + card_index corresponds to action (x, y, card_index).
+        No copy is made, see legal_actions().
+        """
 
-        return actions
+        return self.legal_actions(player_id).reshape(-1)
 
     def is_terminal(self) -> bool:
         """
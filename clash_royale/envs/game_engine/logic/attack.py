@@ -6,16 +6,28 @@ We determine how an entity attacks the target
 (single? AOE?)
 We also describe what an attack does to an enemy, 
 be it do damage (default) or effect done to enemy (slowness)
+
+We also define a batched attack phase,
+which resolves the attacks of every entity in an arena at once
+by working on the columns of the arena's EntityStore.
+Damage is accumulated into a buffer before being applied,
+so the result does not depend on the order entities are stored in.
 """
 
+from __future__ import annotations
+
 from typing import TYPE_CHECKING
 
-from clash_royale.envs.game_engine.arena import Arena
+import numpy as np
+import numpy.typing as npt
+
 from clash_royale.envs.game_engine.entities.entity import Entity
+from clash_royale.envs.game_engine.entities.store import NEVER
 from clash_royale.envs.game_engine.utils import distance
 
 if TYPE_CHECKING:
     # Only import for typechecking to prevent circular dependency
+    from clash_royale.envs.game_engine.arena import Arena
     from clash_royale.envs.game_engine.entities.logic_entity import LogicEntity
 
 
@@ -23,9 +35,9 @@ class BaseAttack:
     """
     BaseAttack - Class all attacks should inherit!
 
-    TODO: We need to implement an attack delay,
-    that being the time between attacks so entities do not attack each frame.
-    Should we also have a delay that determines how long the attack so take?
+    Entities must wait 'attack_delay' frames between attacks.
+
+    TODO: Should we also have a delay that determines how long the attack so take?
     """
 
     def __init__(self) -> None:
@@ -33,7 +45,7 @@ class BaseAttack:
         self.entity: LogicEntity  # Entity we are managing
         self.arena: Arena  # Arena we are apart of
 
-        self.last_attack: int = 0  # Frame of last attack
+        self.last_attack: int = NEVER  # Frame of last attack
 
     def entity_distance(self, target_entity: Entity) -> float:
         """
@@ -47,13 +59,15 @@ class BaseAttack:
 
         return distance(self.entity.x, self.entity.y, target_entity.x, target_entity.y)
 
-    def can_attack(self) -> bool:
+    def can_attack(self, frame: int) -> bool:
         """
         Determines if this entity can attack.
 
         We ensure the targeted entity is within our attack range,
         and that the attack delay has been reached.
 
+        :param frame: Current frame
+        :type frame: int
         :return: True if we can attack, False if not
         :rtype: bool
         """
@@ -64,11 +78,11 @@ class BaseAttack:
 
             # Determine if our delay has passed:
 
-            if self.entity.collection.engine.scheduler.frame() > (self.entity.stats.attack_delay + self.last_attack):
+            if frame - self.last_attack >= self.entity.stats.attack_delay:
 
                 # Determine if entity is within range:
 
-                if self.entity.stats.attack_range <= self.entity_distance(self.entity.target_entity):
+                if self.entity_distance(self.entity.target_entity) <= self.entity.stats.attack_range:
 
                     # Within range, return True:
 
@@ -78,9 +92,12 @@ class BaseAttack:
 
         return False
 
-    def attack(self):
+    def attack(self, frame: int) -> None:
         """
         Preforms an attack on a target, if any.
+
+        :param frame: Current frame
+        :type frame: int
         """
 
         raise NotImplementedError("Must implement this function!")
@@ -95,15 +112,103 @@ class SingleAttack(BaseAttack):
     and preforms an attack by subtracting health from damage.
     """
 
-    def attack(self):
+    def attack(self, frame: int) -> None:
         """
         Preforms an attack operation.
+
+        :param frame: Current frame
+        :type frame: int
         """
 
         # Determine if we can attack:
 
-        if self.can_attack():
+        if self.can_attack(frame):
 
             # Otherwise, preform an attack:
 
             self.entity.target_entity.stats.health -= self.entity.stats.damage
+            self.last_attack = frame
+
+
+def attack_damage(x: npt.NDArray[np.float64],
+                  y: npt.NDArray[np.float64],
+                  target: npt.NDArray[np.int64],
+                  attack_range: npt.NDArray[np.float64],
+                  attack_delay: npt.NDArray[np.int64],
+                  damage: npt.NDArray[np.int64],
+                  last_attack: npt.NDArray[np.int64],
+                  active: npt.NDArray[np.bool_],
+                  frame: int | npt.NDArray[np.int64]) -> npt.NDArray[np.int64]:
+    """
+    Determines the damage dealt to every entity by all ready attackers.
+
+    All arrays have the shape (..., n), where n is the number of entities,
+    and 'target' holds the index of each target within its batch (-1 if none).
+    'frame' must broadcast against (..., n), so batches can be at different frames.
+
+    An attacker is ready if it is active, has an active target within attack range,
+    and 'attack_delay' frames have passed since its last attack.
+    The 'last_attack' of ready attackers is set to 'frame' in place.
+    Damage is scatter-added into a buffer,
+    so multiple attackers on the same target accumulate.
+
+    :return: Damage taken by each entity
+    :rtype: npt.NDArray[np.int64]
+    """
+
+    buffer = np.zeros(x.shape, dtype=np.int64)
+
+    n = x.shape[-1]
+
+    if n == 0:
+        return buffer
+
+    # Gather target positions:
+
+    has_target = active & (target >= 0)
+    index = np.where(has_target, target, 0)
+
+    dx = np.take_along_axis(x, index, axis=-1) - x
+    dy = np.take_along_axis(y, index, axis=-1) - y
+
+    # Determine ready attackers:
+
+    ready = has_target & np.take_along_axis(active, index, axis=-1)
+    ready &= frame - last_attack >= attack_delay
+    ready &= dx * dx + dy * dy <= attack_range * attack_range
+    ready &= damage > 0
+
+    last_attack[ready] = np.broadcast_to(frame, x.shape)[ready]
+
+    # Scatter damage into the buffer, offsetting each batch:
+
+    offsets = np.arange(buffer.size, step=n).reshape(x.shape[:-1] + (1,))
+    np.add.at(buffer.reshape(-1), (index + offsets)[ready], damage[ready])
+
+    return buffer
+
+
+def attack_all(arena: Arena) -> None:
+    """
+    Preforms attacks for every entity in an arena at once.
+
+    The arena must keep its entities in an EntityStore,
+    and the targeting pass must have been preformed this frame.
+    All damage dealt this frame is applied at once,
+    deaths are handled separately by the arena.
+
+    :param arena: Arena to preform attacks on
+    :type arena: Arena
+    """
+
+    store = arena.store
+
+    store.column('health')[:] -= attack_damage(store.column('x'),
+                                               store.column('y'),
+                                               store.column('target'),
+                                               store.column('attack_range'),
+                                               store.column('attack_delay'),
+                                               store.column('damage'),
+                                               store.column('last_attack'),
+                                               store.column('state') == Entity.STARTED,
+                                               arena.frame)
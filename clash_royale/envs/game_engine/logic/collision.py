@@ -0,0 +1,306 @@
+"""
+Logic components for collisions.
+
+Units take up space, a circle with a diameter of their 'troop_size',
+so units that overlap after moving are pushed apart.
+Ground units only collide with ground units, and flying units only collide with flying units,
+see layers() for what else decides which units collide.
+
+Checking every pair of units is far too slow with a crowded board,
+so overlapping pairs are found with a uniform grid,
+and all pushes are accumulated and applied at once.
+"""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Tuple
+
+import numpy as np
+import numpy.typing as npt
+
+from clash_royale.envs.game_engine.entities.entity import Entity
+from clash_royale.envs.game_engine.pathing import tile_of, walkable_mask
+
+if TYPE_CHECKING:
+    # Only import for typechecking to prevent circular dependency
+    from clash_royale.envs.game_engine.arena import Arena
+
+# Offsets (dx, dy) of the cells each cell is checked against,
+# only half of the neighbours so each pair of cells is checked once:
+FORWARD_CELLS: Tuple[Tuple[int, int], ...] = ((0, 0), (1, 0), (-1, 1), (0, 1), (1, 1))
+
+
+def overlapping_pairs(x: npt.NDArray[np.float64],
+                      y: npt.NDArray[np.float64],
+                      radius: npt.NDArray[np.float64],
+                      layer: npt.NDArray[np.int64]) -> Tuple[npt.NDArray[np.int64], npt.NDArray[np.int64]]:
+    """
+    Finds every pair of entities whose circles overlap.
+
+    Entities are binned into square cells as large as the largest diameter,
+    so each entity can only overlap entities in its own cell or the 8 cells around it.
+    Entities in different layers never overlap.
+
+    Entities are sorted by cell, so the entities of a cell are contiguous,
+    and the candidates of each entity are found with a binary search per neighbouring cell.
+    Each pair is returned once.
+
+    :param x: X positions
+    :type x: npt.NDArray[np.float64]
+    :param y: Y positions
+    :type y: npt.NDArray[np.float64]
+    :param radius: Radius of each entity
+    :type radius: npt.NDArray[np.float64]
+    :param layer: Layer of each entity, any non-negative integers
+    :type layer: npt.NDArray[np.int64]
+    :return: Indices of the first and second entity of each pair
+    :rtype: Tuple[npt.NDArray[np.int64], npt.NDArray[np.int64]]
+    """
+
+    count = len(x)
+    cell_size = 2 * radius.max() if count else 0
+
+    if cell_size <= 0:
+        return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+
+    # Determine the cell of each entity, leaving a border of empty cells,
+    # so neighbouring cells never wrap around into another row or layer:
+
+    cx = np.floor(x / cell_size).astype(np.int64)
+    cy = np.floor(y / cell_size).astype(np.int64)
+    cx -= cx.min() - 1
+    cy -= cy.min() - 1
+
+    cols = int(cx.max()) + 2
+    rows = int(cy.max()) + 2
+
+    key = (layer * rows + cy) * cols + cx
+
+    order = np.argsort(key, kind='stable')
+    sorted_key = key[order]
+
+    rank = np.empty(count, dtype=np.int64)  # Position of each entity in the sorted order
+    rank[order] = np.arange(count)
+
+    first = []
+    second = []
+
+    for dx, dy in FORWARD_CELLS:
+
+        neighbour = key + dy * cols + dx
+
+        if dx == 0 and dy == 0:
+            start = rank + 1  # Only entities after us in our own cell
+        else:
+            start = np.searchsorted(sorted_key, neighbour, side='left')
+
+        stop = np.searchsorted(sorted_key, neighbour, side='right')
+        length = np.maximum(stop - start, 0)
+        total = int(length.sum())
+
+        if total == 0:
+            continue
+
+        # Expand each range [start, stop) into the sorted positions it covers:
+
+        offset = np.arange(total) - np.repeat(np.cumsum(length) - length, length)
+
+        first.append(np.repeat(np.arange(count), length))
+        second.append(order[np.repeat(start, length) + offset])
+
+    if not first:
+        return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+
+    i = np.concatenate(first)
+    j = np.concatenate(second)
+
+    # Keep the candidates that actually overlap:
+
+    dx = x[i] - x[j]
+    dy = y[i] - y[j]
+    reach = radius[i] + radius[j]
+    overlap = dx * dx + dy * dy < reach * reach
+
+    return i[overlap], j[overlap]
+
+
+def separate(x: npt.NDArray[np.float64],
+             y: npt.NDArray[np.float64],
+             radius: npt.NDArray[np.float64],
+             layer: npt.NDArray[np.int64]) -> int:
+    """
+    Pushes overlapping entities apart, in place.
+
+    Each overlapping pair is pushed apart along the line between them,
+    half of the way each, until they just touch.
+    Pushes from every pair are summed, so crowds spread out over a few frames.
+    Entities in the exact same spot are pushed apart horizontally.
+
+    :param x: X positions, updated in place
+    :type x: npt.NDArray[np.float64]
+    :param y: Y positions, updated in place
+    :type y: npt.NDArray[np.float64]
+    :param radius: Radius of each entity
+    :type radius: npt.NDArray[np.float64]
+    :param layer: Layer of each entity, see overlapping_pairs()
+    :type layer: npt.NDArray[np.int64]
+    :return: Number of overlapping pairs that were pushed apart
+    :rtype: int
+    """
+
+    i, j = overlapping_pairs(x, y, radius, layer)
+
+    if len(i) == 0:
+        return 0
+
+    # Determine the direction and depth of each overlap:
+
+    dx = x[i] - x[j]
+    dy = y[i] - y[j]
+    dist = np.sqrt(dx * dx + dy * dy)
+    apart = dist > 0
+
+    scale = 1 / np.where(apart, dist, 1)
+    push = (radius[i] + radius[j] - dist) / 2
+
+    push_x = np.where(apart, dx * scale, 1) * push
+    push_y = np.where(apart, dy * scale, 0) * push
+
+    count = len(x)
+
+    x += np.bincount(i, weights=push_x, minlength=count) - np.bincount(j, weights=push_x, minlength=count)
+    y += np.bincount(i, weights=push_y, minlength=count) - np.bincount(j, weights=push_y, minlength=count)
+
+    return len(i)
+
+
+def layers(team: npt.NDArray[np.int8],
+           flying: npt.NDArray[np.bool_],
+           group: npt.NDArray[np.int64] | None=None) -> npt.NDArray[np.int64]:
+    """
+    Determines the collision layer of each unit, see overlapping_pairs().
+
+    Units only collide with units of the same team, in the same layer (ground or air).
+    Attack ranges are measured between centers,
+    so enemies must be able to get closer than their sizes allow to fight.
+
+    :param team: Team of each unit
+    :type team: npt.NDArray[np.int8]
+    :param flying: Mask of flying units
+    :type flying: npt.NDArray[np.bool_]
+    :param group: Group of each unit, units in different groups never collide,
+        defaults to None (one group)
+    :type group: npt.NDArray[np.int64] | None
+    :return: Layer of each unit
+    :rtype: npt.NDArray[np.int64]
+    """
+
+    layer = team.astype(np.int64) * 2 + flying
+
+    if group is not None:
+        layer += 4 * group
+
+    return layer
+
+
+def solid_mask(state: npt.NDArray[np.int8],
+               troop_size: npt.NDArray[np.float64],
+               speed: npt.NDArray[np.float64]) -> npt.NDArray[np.bool_]:
+    """
+    Determines which entities collide.
+
+    Only running units that take up space collide.
+    Buildings (entities that can't move) are not solid,
+    for the same reason enemies don't collide, see layers().
+
+    :return: Mask of solid entities
+    :rtype: npt.NDArray[np.bool_]
+    """
+
+    return (state == Entity.STARTED) & (troop_size > 0) & (speed > 0)
+
+
+def collide(width: int,
+            height: int,
+            x: npt.NDArray[np.float64],
+            y: npt.NDArray[np.float64],
+            troop_size: npt.NDArray[np.float64],
+            layer: npt.NDArray[np.int64],
+            flying: npt.NDArray[np.bool_]) -> Tuple[npt.NDArray[np.float64], npt.NDArray[np.float64]]:
+    """
+    Resolves collisions between units, see separate().
+
+    Pushed units are kept inside the arena,
+    and ground units are never pushed into the river.
+
+    :param width: Width of the arena
+    :type width: int
+    :param height: Height of the arena
+    :type height: int
+    :param x: X positions
+    :type x: npt.NDArray[np.float64]
+    :param y: Y positions
+    :type y: npt.NDArray[np.float64]
+    :param troop_size: Diameter of each unit
+    :type troop_size: npt.NDArray[np.float64]
+    :param layer: Layer of each unit, see layers()
+    :type layer: npt.NDArray[np.int64]
+    :param flying: Mask of flying units
+    :type flying: npt.NDArray[np.bool_]
+    :return: New X and Y positions
+    :rtype: Tuple[npt.NDArray[np.float64], npt.NDArray[np.float64]]
+    """
+
+    new_x = x.astype(np.float64)
+    new_y = y.astype(np.float64)
+
+    if not separate(new_x, new_y, troop_size / 2, layer):
+        return new_x, new_y
+
+    np.clip(new_x, 0, width, out=new_x)
+    np.clip(new_y, 0, height, out=new_y)
+
+    # Ground units pushed onto tiles they can't walk on stay where they were:
+
+    col, row = tile_of(width, height, new_x, new_y)
+    blocked = ~flying & ~walkable_mask(width, height)[row, col]
+
+    new_x[blocked] = x[blocked]
+    new_y[blocked] = y[blocked]
+
+    return new_x, new_y
+
+
+def collide_all(arena: Arena) -> bool:
+    """
+    Resolves collisions between every solid entity in an arena at once.
+
+    The arena must keep its entities in an EntityStore.
+
+    :param arena: Arena to resolve collisions in
+    :type arena: Arena
+    :return: True if any entity was pushed, False if not
+    :rtype: bool
+    """
+
+    store = arena.store
+    x = store.column('x')
+    y = store.column('y')
+
+    solid = solid_mask(store.column('state'), store.column('troop_size'), store.column('speed'))
+
+    if np.count_nonzero(solid) < 2:
+        return False
+
+    flying = store.column('flying')[solid]
+    old_x = x[solid]
+    old_y = y[solid]
+
+    new_x, new_y = collide(arena.width, arena.height, old_x, old_y,
+                           store.column('troop_size')[solid],
+                           layers(store.column('team')[solid], flying), flying)
+
+    x[solid] = new_x
+    y[solid] = new_y
+
+    return not (np.array_equal(new_x, old_x) and np.array_equal(new_y, old_y))
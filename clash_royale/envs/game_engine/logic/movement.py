@@ -4,16 +4,31 @@ Logic components for movement.
 These components describe how movement is preformed.
 All entities have targets that they will move to.
 This class will move towards a target in some way.
+
+Ground units can't walk through the river,
+so units without a target, or with a target across the river,
+follow the precomputed flow fields of the arena instead (see pathing).
+
+We also define a batched movement pass,
+which moves every entity in an arena at once
+by working on the columns of the arena's EntityStore.
 """
 
+from __future__ import annotations
+
 import math
 
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Tuple
+
+import numpy as np
+import numpy.typing as npt
 
-from clash_royale.envs.game_engine.arena import Arena
+from clash_royale.envs.game_engine.entities.entity import Entity
+from clash_royale.envs.game_engine.pathing import river_rows, tile_of
 
 if TYPE_CHECKING:
     # Only import for typechecking to prevent circular dependency
+    from clash_royale.envs.game_engine.arena import Arena
     from clash_royale.envs.game_engine.entities.logic_entity import LogicEntity
 
 
@@ -27,7 +42,7 @@ class BaseMovement:
         self.entity: LogicEntity  # Entity we are attached to
         self.arena: Arena  # Arena component to consider
 
-    def move(self) -> None:
+    def move(self, frames: int=1) -> None:
         """
         Moves the entity in some way.
 
@@ -41,25 +56,238 @@ class BaseMovement:
 class SimpleMovement(BaseMovement):
     """
     SimpleMovement - Simply move in a straight line to the target 
+
+    We stop once the target is within our attack range,
+    and positions are kept as floats so slow entities still make progress.
+    Without a target, or with a target across the river,
+    we follow the flow fields of the arena instead, see steer().
     """
 
-    def move(self) -> None:
+    def move(self, frames: int=1) -> None:
         """
         Moves in a straight line towards target.
         """
 
-        # Determine slopes:
+        entity = self.entity
+        target = entity.target_entity
+
+        # Determine if we should follow a flow field:
+
+        direction = self.flow_direction()
+
+        if direction is not None:
 
-        dx = self.entity.x - self.entity.target_ent.x
-        dy = self.entity.y - self.entity.target_ent.y
+            travel = entity.stats.speed * frames
+            entity.x += direction[0] * travel
+            entity.y += direction[1] * travel
 
-        # Find angle between entities:
+            return
 
-        angle = math.atan2(dy, dx)
+        if target is None:
+            return
+
+        # Determine direction and distance:
+
+        dx = target.x - self.entity.x
+        dy = target.y - self.entity.y
+        dist = math.hypot(dx, dy)
+
+        # Determine how far we can travel without entering attack range:
+
+        stats = self.entity.stats
+        travel = min(max(dist - stats.attack_range, 0), stats.speed * frames)
+
+        if travel <= 0:
+            return
 
         # Determine new position:
 
-        speed = self.entity.stats.speed
+        self.entity.x += dx / dist * travel
+        self.entity.y += dy / dist * travel
+
+    def flow_direction(self) -> Tuple[float, float] | None:
+        """
+        Determines the direction of the flow field we should follow, if any.
+
+        This is the same rule as steer(), applied to a single entity
+        without building any arrays.
+
+        :return: Direction to follow, None if we should not follow a field
+        :rtype: Tuple[float, float] | None
+        """
+
+        entity = self.entity
+        target = entity.target_entity
+
+        col, row = tile_of(self.arena.width, self.arena.height, entity.x, entity.y)
+        direction = self.arena.lane_fields()[entity.team, row, col]
+
+        if target is not None:
+
+            # Only head for a bridge if the target is across the river and out of range:
+
+            start, stop = river_rows(self.arena.height)
+            up = entity.y < stop <= target.y
+            down = target.y < start <= entity.y
+
+            dx = target.x - entity.x
+            dy = target.y - entity.y
+            reach = entity.stats.attack_range
+
+            if not (up or down) or dx * dx + dy * dy <= reach * reach:
+                return None
+
+            direction = self.arena.bridges.bridge_direction(int(up), row, col, target.x, target.y)
+
+        dir_x, dir_y = float(direction[0]), float(direction[1])
+
+        if dir_x == 0 and dir_y == 0:
+            return None
+
+        return dir_x, dir_y
+
+
+def advance(x: npt.NDArray[np.float64],
+            y: npt.NDArray[np.float64],
+            target_x: npt.NDArray[np.float64],
+            target_y: npt.NDArray[np.float64],
+            speed: npt.NDArray[np.float64],
+            stop_range: npt.NDArray[np.float64],
+            moving: npt.NDArray[np.bool_],
+            frames: int=1) -> npt.NDArray[np.bool_]:
+    """
+    Moves entities in a straight line towards their targets, in place.
+
+    All arrays have the same shape, with one element per entity,
+    and any leading batch dimensions are allowed.
+    Each moving entity travels 'speed' tiles per frame for 'frames' frames
+    along the normalized direction to its target,
+    stopping once the target is within 'stop_range'.
+    Positions are floats, so entities slower than one tile per frame still move.
+
+    :param x: X positions, updated in place
+    :type x: npt.NDArray[np.float64]
+    :param y: Y positions, updated in place
+    :type y: npt.NDArray[np.float64]
+    :param target_x: X positions of the targets
+    :type target_x: npt.NDArray[np.float64]
+    :param target_y: Y positions of the targets
+    :type target_y: npt.NDArray[np.float64]
+    :param speed: Tiles moved per frame
+    :type speed: npt.NDArray[np.float64]
+    :param stop_range: Distance from the target to stop at
+    :type stop_range: npt.NDArray[np.float64]
+    :param moving: Mask of entities that should move
+    :type moving: npt.NDArray[np.bool_]
+    :param frames: Number of frames to move for, defaults to 1
+    :type frames: int
+    :return: Mask of entities that moved
+    :rtype: npt.NDArray[np.bool_]
+    """
+
+    dx = target_x - x
+    dy = target_y - y
+    dist = np.sqrt(dx * dx + dy * dy)
+
+    # Distance to travel, never entering the stop range:
+
+    travel = np.minimum(np.maximum(dist - stop_range, 0), speed * frames)
+    travel = np.where(moving & (dist > 0), travel, 0)
+
+    # Scale the normalized direction, avoiding division by zero:
+
+    scale = travel / np.where(dist > 0, dist, 1)
+
+    x += dx * scale
+    y += dy * scale
+
+    return travel > 0
+
+
+def steer(arena: Arena,
+          x: npt.NDArray[np.float64],
+          y: npt.NDArray[np.float64],
+          team: npt.NDArray[np.int8],
+          target_x: npt.NDArray[np.float64],
+          target_y: npt.NDArray[np.float64],
+          has_target: npt.NDArray[np.bool_],
+          attack_range: npt.NDArray[np.float64]) -> Tuple[npt.NDArray[np.float64], npt.NDArray[np.bool_]]:
+    """
+    Determines which entities follow a flow field of the arena, and in what direction.
+
+    Entities without a target follow the lane of their team towards the closest enemy tower,
+    and entities with a target across the river head for a bridge, see BridgeFields.steer().
+    Each entity only needs to look up the tile it is on.
+
+    :param arena: Arena to get the flow fields from
+    :type arena: Arena
+    :param x: X positions
+    :type x: npt.NDArray[np.float64]
+    :param y: Y positions
+    :type y: npt.NDArray[np.float64]
+    :param team: Team of each entity
+    :type team: npt.NDArray[np.int8]
+    :param target_x: X positions of the targets
+    :type target_x: npt.NDArray[np.float64]
+    :param target_y: Y positions of the targets
+    :type target_y: npt.NDArray[np.float64]
+    :param has_target: Mask of entities with a target
+    :type has_target: npt.NDArray[np.bool_]
+    :param attack_range: Attack range of each entity
+    :type attack_range: npt.NDArray[np.float64]
+    :return: Direction to move in, shape (N, 2), and mask of entities that follow a field
+    :rtype: Tuple[npt.NDArray[np.float64], npt.NDArray[np.bool_]]
+    """
+
+    col, row = tile_of(arena.width, arena.height, x, y)
+
+    return arena.bridges.steer(arena.lane_fields()[team, row, col],
+                               x, y, target_x, target_y, has_target, attack_range)
+
+
+def move_all(arena: Arena, frames: int=1) -> bool:
+    """
+    Preforms movement for every entity in an arena at once.
+
+    The arena must keep its entities in an EntityStore,
+    and the targeting pass must have been preformed this frame.
+    Every running entity with a target moves towards it,
+    and entities that follow a flow field (see steer()) move along it.
+
+    :param arena: Arena to preform movement on
+    :type arena: Arena
+    :param frames: Number of frames to move for, defaults to 1
+    :type frames: int
+    :return: True if any entity moved, False if not
+    :rtype: bool
+    """
+
+    store = arena.store
+
+    x = store.column('x')
+    y = store.column('y')
+    target = store.column('target')
+    speed = store.column('speed')
+    attack_range = store.column('attack_range')
+
+    has_target = target >= 0
+    index = np.where(has_target, target, 0)
+    target_x = x[index]
+    target_y = y[index]
+    running = store.column('state') == Entity.STARTED
+
+    # Determine which entities follow a flow field, before anything moves:
+
+    direction, follow = steer(arena, x, y, store.column('team'),
+                              target_x, target_y, has_target, attack_range)
+    follow &= running & (speed > 0)
+
+    moved = advance(x, y, target_x, target_y, speed, attack_range,
+                    has_target & running & ~follow, frames)
+
+    travel = np.where(follow, speed * frames, 0)
+
+    x += direction[:, 0] * travel
+    y += direction[:, 1] * travel
 
-        self.entity.x += int(speed * math.cos(angle))
-        self.entity.y += int(speed * math.sin(angle))
+    return bool(moved.any() or follow.any())
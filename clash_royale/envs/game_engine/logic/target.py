@@ -4,16 +4,25 @@ Logic components for targeting.
 These components describe how targeting is preformed.
 'Targeting' is the process of determining what things get targeted.
 If no entities are selected, then we simply defer targeting to another component.
+
+We also define a batched targeting pass,
+which determines the targets of every entity in an arena at once
+by working on the columns of the arena's EntityStore.
 """
 
+from __future__ import annotations
+
 from typing import TYPE_CHECKING
 
-from clash_royale.envs.game_engine.arena import Arena
+import numpy as np
+import numpy.typing as npt
+
 from clash_royale.envs.game_engine.entities.entity import Entity
 from clash_royale.envs.game_engine.utils import distance
 
 if TYPE_CHECKING:
     # Only import for typechecking to prevent circular dependency
+    from clash_royale.envs.game_engine.arena import Arena
     from clash_royale.envs.game_engine.entities.logic_entity import LogicEntity
 
 class BaseTarget:
@@ -38,7 +47,7 @@ class BaseTarget:
 
         return distance(self.entity.x, self.entity.y, target_entity.x, target_entity.y)
 
-    def target(self) -> None:
+    def target(self) -> Entity | None:
         """
         Finds a target in the arena, and returns an entity.
         """
@@ -48,25 +57,119 @@ class BaseTarget:
 
 class RadiusTarget(BaseTarget):
     """
-    Finds the first entity within our radius.
+    Finds the closest enemy entity within our radius.
 
     We take into consideration the sight range of this entity,
-    and will target the first entity within our radius.
+    and will target the closest running enemy within our radius.
+    Candidates are found using the spatial index of the arena,
+    so only nearby entities are considered.
     """
 
-    def target(self) -> None:
+    def target(self) -> Entity | None:
         """
-        Finds the first target that is within our radius.
+        Finds the closest enemy that is within our radius.
         """
 
-        # Iterate over entities:
+        best: Entity | None = None
+        best_distance = float('inf')
+
+        # Iterate over nearby enemies:
+
+        for ent in self.arena.query_radius(self.entity.x, self.entity.y,
+                                           self.entity.stats.sight_range,
+                                           team=1 - self.entity.team):
+
+            if not ent.running:
+                continue
+
+            # Determine if entity is closer than the current best:
+
+            dist = self.entity_distance(ent)
+
+            if dist < best_distance:
+                best = ent
+                best_distance = dist
+
+        return best
+
+
+def nearest_enemy(x: npt.NDArray[np.float64],
+                  y: npt.NDArray[np.float64],
+                  team: npt.NDArray[np.integer],
+                  sight_range: npt.NDArray[np.float64],
+                  active: npt.NDArray[np.bool_]) -> npt.NDArray[np.int64]:
+    """
+    Finds the closest enemy within sight range for every entity.
+
+    All arrays have the shape (..., n), where n is the number of entities.
+    Any leading dimensions are treated as independent batches,
+    so entities only consider other entities within the same batch.
+
+    We work with squared distances, so no square roots are taken.
+    Only active entities can search for, or be selected as, targets,
+    and entities without a sight range never select a target.
+
+    :param x: X positions
+    :type x: npt.NDArray[np.float64]
+    :param y: Y positions
+    :type y: npt.NDArray[np.float64]
+    :param team: Team of each entity
+    :type team: npt.NDArray[np.integer]
+    :param sight_range: Sight range of each entity
+    :type sight_range: npt.NDArray[np.float64]
+    :param active: Mask of entities that participate
+    :type active: npt.NDArray[np.bool_]
+    :return: Index of the target of each entity, -1 if there is none
+    :rtype: npt.NDArray[np.int64]
+    """
 
-        for ent in self.arena.entities:
+    if x.shape[-1] == 0:
+        return np.full(x.shape, -1, dtype=np.int64)
+
+    # Pairwise squared distances, seeker on axis -2 and candidate on axis -1:
+
+    dx = x[..., :, None] - x[..., None, :]
+    dy = y[..., :, None] - y[..., None, :]
+    dist2 = dx * dx + dy * dy
+
+    # Determine valid seeker/candidate pairs:
+
+    seeker = active & (sight_range > 0)
+    valid = team[..., :, None] != team[..., None, :]
+    valid &= seeker[..., :, None] & active[..., None, :]
+    valid &= dist2 <= (sight_range * sight_range)[..., :, None]
+
+    # Select the closest valid candidate:
+
+    dist2 = np.where(valid, dist2, np.inf)
+    index = dist2.argmin(axis=-1)
+
+    return np.where(valid.any(axis=-1), index, -1)
+
+
+def target_all(arena: Arena) -> None:
+    """
+    Preforms targeting for every entity in an arena at once.
+
+    The arena must keep its entities in an EntityStore.
+    We determine the closest enemy within sight range of every running entity,
+    record the row of the target in the 'target' column of the store,
+    and set the 'target_entity' of each entity.
+
+    :param arena: Arena to preform targeting on
+    :type arena: Arena
+    """
 
-            # Determine if entity is near us:
+    store = arena.store
+    entities = store.entities
 
-            if self.entity.stats.sight_range >= self.entity_distance(self.entity.target_entity):
+    targets = nearest_enemy(store.column('x'),
+                            store.column('y'),
+                            store.column('team'),
+                            store.column('sight_range'),
+                            store.column('state') == Entity.STARTED)
 
-                # We found a target, set:
+    store.column('target')[:] = targets
 
-                self.entity.target_entity = ent
+    for ent, index in zip(entities, targets.tolist()):
+        ent.target_entity = entities[index] if index >= 0 else None
@@ -0,0 +1,419 @@
+"""
+Precomputed flow fields for pathing
+
+This file contains components that determine how ground units find their way around the arena.
+Units can't walk through the river, so they must cross at one of the bridges.
+
+Instead of searching for a path for each unit on each frame,
+we precompute flow fields over the tiles of the arena:
+the distance from every tile to a set of goal tiles (avoiding the river),
+and the direction to travel from every tile to get closer.
+Moving a unit then only requires looking up the direction of the tile it is on.
+
+Fields only depend on the size of the arena and the goal tiles,
+so they are built once and shared for the rest of the process (and are read-only).
+"""
+
+from __future__ import annotations
+
+import dataclasses
+import functools
+import math
+from typing import List, Tuple
+
+import numpy as np
+import numpy.typing as npt
+
+# Offsets (dx, dy) to each neighbouring tile, and the cost of moving there:
+
+NEIGHBOURS: Tuple[Tuple[int, int], ...] = ((1, 0), (-1, 0), (0, 1), (0, -1),
+                                           (1, 1), (1, -1), (-1, 1), (-1, -1))
+COSTS: Tuple[float, ...] = (1, 1, 1, 1, math.sqrt(2), math.sqrt(2), math.sqrt(2), math.sqrt(2))
+
+
+def river_rows(height: int) -> Tuple[int, int]:
+    """
+    Determines the tile rows [start, stop) that the river occupies.
+    """
+
+    return height // 2 - 1, height // 2 + 1
+
+
+def bridge_columns(width: int) -> List[Tuple[int, int]]:
+    """
+    Determines the tile columns [start, stop) of each bridge.
+    """
+
+    return [(2, 5), (width - 5, width - 2)]
+
+
+@functools.lru_cache(maxsize=None)
+def walkable_mask(width: int, height: int) -> npt.NDArray[np.bool_]:
+    """
+    Determines the tiles ground units can walk on,
+    which is every tile besides the river (bridges are walkable).
+
+    :param width: Width of the arena
+    :type width: int
+    :param height: Height of the arena
+    :type height: int
+    :return: Read-only mask with shape (height, width)
+    :rtype: npt.NDArray[np.bool_]
+    """
+
+    mask = np.ones((height, width), dtype=bool)
+    start, stop = river_rows(height)
+    mask[start:stop] = False
+
+    for left, right in bridge_columns(width):
+        mask[start:stop, max(left, 0):max(right, 0)] = True
+
+    mask.flags.writeable = False
+
+    return mask
+
+
+def _shift(grid: npt.NDArray, dx: int, dy: int, fill) -> npt.NDArray:
+    """
+    Shifts a (height, width) grid, so each tile holds the value of its neighbour at (dx, dy).
+    Neighbours outside of the grid are given the fill value.
+    """
+
+    height, width = grid.shape
+    out = np.full_like(grid, fill)
+
+    out[max(-dy, 0):height - max(dy, 0), max(-dx, 0):width - max(dx, 0)] = \
+        grid[max(dy, 0):height - max(-dy, 0), max(dx, 0):width - max(-dx, 0)]
+
+    return out
+
+
+@functools.lru_cache(maxsize=None)
+def _allowed_moves(width: int, height: int) -> npt.NDArray[np.bool_]:
+    """
+    Determines which moves to each neighbour are allowed.
+
+    A move must end on a walkable tile,
+    and diagonal moves may not cut the corner of a tile that can't be walked on.
+
+    :return: Read-only mask with shape (8, height, width), in the order of NEIGHBOURS
+    :rtype: npt.NDArray[np.bool_]
+    """
+
+    walkable = walkable_mask(width, height)
+    allowed = np.zeros((len(NEIGHBOURS), height, width), dtype=bool)
+
+    for index, (dx, dy) in enumerate(NEIGHBOURS):
+
+        allowed[index] = _shift(walkable, dx, dy, False)
+
+        if dx and dy:
+            allowed[index] &= _shift(walkable, dx, 0, False) & _shift(walkable, 0, dy, False)
+
+    allowed.flags.writeable = False
+
+    return allowed
+
+
+@functools.lru_cache(maxsize=None)
+def distance_field(width: int, height: int, goal: Tuple[int, int]) -> npt.NDArray[np.float64]:
+    """
+    Determines the walking distance from every tile to a goal tile.
+
+    Units may move to any of the 8 neighbouring tiles, see _allowed_moves().
+    We relax every tile at once until the distances settle,
+    which takes at most one pass per tile along the longest path.
+    Tiles that can't reach the goal have an infinite distance.
+
+    :param width: Width of the arena
+    :type width: int
+    :param height: Height of the arena
+    :type height: int
+    :param goal: Goal tile as (x, y)
+    :type goal: Tuple[int, int]
+    :return: Read-only distances with shape (height, width)
+    :rtype: npt.NDArray[np.float64]
+    """
+
+    allowed = _allowed_moves(width, height)
+
+    dist = np.full((height, width), np.inf)
+    dist[goal[1], goal[0]] = 0
+
+    while True:
+
+        best = dist.copy()
+
+        for index, (dx, dy) in enumerate(NEIGHBOURS):
+            step = np.where(allowed[index], _shift(dist, dx, dy, np.inf) + COSTS[index], np.inf)
+            np.minimum(best, step, out=best)
+
+        if np.array_equal(best, dist):
+            break
+
+        dist = best
+
+    dist.flags.writeable = False
+
+    return dist
+
+
+def directions(width: int, height: int, dist: npt.NDArray[np.float64]) -> npt.NDArray[np.float64]:
+    """
+    Determines the direction to travel from every tile to follow a distance field.
+
+    Each tile points at the allowed neighbour closest to the goal,
+    and tiles that are already closest (such as the goal itself) don't point anywhere.
+
+    :param width: Width of the arena
+    :type width: int
+    :param height: Height of the arena
+    :type height: int
+    :param dist: Distances with shape (height, width), see distance_field()
+    :type dist: npt.NDArray[np.float64]
+    :return: Unit vectors (dx, dy) with shape (height, width, 2), zero where there is nowhere to go
+    :rtype: npt.NDArray[np.float64]
+    """
+
+    allowed = _allowed_moves(width, height)
+
+    # Distance of each neighbour, including the tile itself so tiles only point downhill:
+
+    candidates = np.full((len(NEIGHBOURS) + 1, height, width), np.inf)
+    candidates[0] = dist
+
+    for index, (dx, dy) in enumerate(NEIGHBOURS):
+        candidates[index + 1] = np.where(allowed[index], _shift(dist, dx, dy, np.inf), np.inf)
+
+    best = np.argmin(candidates, axis=0)
+
+    # Map the closest neighbour to its normalized offset:
+
+    offsets = np.zeros((len(NEIGHBOURS) + 1, 2))
+
+    for index, (dx, dy) in enumerate(NEIGHBOURS):
+        offsets[index + 1] = (dx, dy) / np.hypot(dx, dy)
+
+    return offsets[best]
+
+
+@functools.lru_cache(maxsize=None)
+def flow_field(width: int, height: int, goals: Tuple[Tuple[int, int], ...]) -> npt.NDArray[np.float64]:
+    """
+    Determines the direction to travel from every tile towards the closest of many goal tiles.
+
+    The distance field of each goal is cached separately,
+    so changing the set of goals only requires combining the existing fields.
+
+    :param width: Width of the arena
+    :type width: int
+    :param height: Height of the arena
+    :type height: int
+    :param goals: Goal tiles as (x, y)
+    :type goals: Tuple[Tuple[int, int], ...]
+    :return: Read-only unit vectors with shape (height, width, 2), see directions()
+    :rtype: npt.NDArray[np.float64]
+    """
+
+    dist = np.full((height, width), np.inf)
+
+    for goal in goals:
+        np.minimum(dist, distance_field(width, height, goal), out=dist)
+
+    field = directions(width, height, dist)
+    field.flags.writeable = False
+
+    return field
+
+
+def tile_of(width: int,
+            height: int,
+            x: npt.NDArray[np.float64],
+            y: npt.NDArray[np.float64]) -> Tuple[npt.NDArray[np.int64], npt.NDArray[np.int64]]:
+    """
+    Determines the tile each position is on, clamped to the arena.
+
+    :return: Column and row of each position
+    :rtype: Tuple[npt.NDArray[np.int64], npt.NDArray[np.int64]]
+    """
+
+    col = np.clip(np.floor(x).astype(np.int64), 0, width - 1)
+    row = np.clip(np.floor(y).astype(np.int64), 0, height - 1)
+
+    return col, row
+
+
+@dataclasses.dataclass(frozen=True)
+class BridgeFields:
+    """
+    BridgeFields - Flow fields for crossing the river
+
+    There is a field for each bridge and each side of the river,
+    leading to the tiles just past the far end of the bridge.
+    Units with a target across the river follow the field of whichever bridge
+    makes for the shortest trip to the target.
+    """
+
+    width: int
+    height: int
+    distance: npt.NDArray[np.float64]  # Walking distance, shape (bridges, 2, height, width)
+    direction: npt.NDArray[np.float64]  # Unit vectors, shape (bridges, 2, height, width, 2)
+    exits: npt.NDArray[np.float64]  # Center of the far end, shape (bridges, 2, 2)
+
+    def steer(self,
+              lane: npt.NDArray[np.float64],
+              x: npt.NDArray[np.float64],
+              y: npt.NDArray[np.float64],
+              target_x: npt.NDArray[np.float64],
+              target_y: npt.NDArray[np.float64],
+              has_target: npt.NDArray[np.bool_],
+              attack_range: npt.NDArray[np.float64]) -> Tuple[npt.NDArray[np.float64], npt.NDArray[np.bool_]]:
+        """
+        Determines the direction units should follow instead of heading straight for their target.
+
+        Units without a target follow their lane (usually towards the closest enemy tower),
+        and units with a target across the river head for a bridge,
+        unless the target is already within attack range.
+        Everything else can walk straight to its target (or stay put).
+
+        All arrays have one element per unit, and any leading batch dimensions are allowed.
+
+        :param lane: Direction of the lane at each unit, shape (..., 2)
+        :type lane: npt.NDArray[np.float64]
+        :param x: X positions
+        :type x: npt.NDArray[np.float64]
+        :param y: Y positions
+        :type y: npt.NDArray[np.float64]
+        :param target_x: X positions of the targets
+        :type target_x: npt.NDArray[np.float64]
+        :param target_y: Y positions of the targets
+        :type target_y: npt.NDArray[np.float64]
+        :param has_target: Mask of units with a target
+        :type has_target: npt.NDArray[np.bool_]
+        :param attack_range: Attack range of each unit
+        :type attack_range: npt.NDArray[np.float64]
+        :return: Direction to follow, shape (..., 2), and mask of units that follow a field
+        :rtype: Tuple[npt.NDArray[np.float64], npt.NDArray[np.bool_]]
+        """
+
+        col, row = tile_of(self.width, self.height, x, y)
+        start, stop = river_rows(self.height)
+
+        # Determine which units are on the other side of the river from their target:
+
+        up = has_target & (target_y >= stop) & (y < stop)
+        down = has_target & (target_y < start) & (y >= start)
+        crossing = up | down
+
+        direction = np.array(lane, dtype=np.float64)
+
+        if crossing.any():
+
+            # Pick the bridge with the shortest trip, walking to it and then straight to the target:
+
+            side = up[crossing].astype(np.int64)
+            row_c = row[crossing]
+            col_c = col[crossing]
+
+            cost = self.distance[:, side, row_c, col_c] + \
+                np.hypot(target_x[crossing] - self.exits[:, side, 0],
+                         target_y[crossing] - self.exits[:, side, 1])
+
+            direction[crossing] = self.direction[np.argmin(cost, axis=0), side, row_c, col_c]
+
+        # Units already in range of their target stay put:
+
+        dx = target_x - x
+        dy = target_y - y
+        in_range = dx * dx + dy * dy <= attack_range * attack_range
+
+        follow = (~has_target | (crossing & ~in_range)) & (direction != 0).any(axis=-1)
+
+        return direction, follow
+
+    def bridge_direction(self,
+                         side: int,
+                         row: int,
+                         col: int,
+                         target_x: float,
+                         target_y: float) -> npt.NDArray[np.float64]:
+        """
+        Determines the direction a single unit crossing the river should follow.
+
+        This is the bridge choice of steer(), for one unit.
+
+        :param side: Side of the river to cross to, 1 for up and 0 for down
+        :type side: int
+        :param row: Row of the tile the unit is on
+        :type row: int
+        :param col: Column of the tile the unit is on
+        :type col: int
+        :param target_x: X position of the target
+        :type target_x: float
+        :param target_y: Y position of the target
+        :type target_y: float
+        :return: Direction to follow, shape (2,)
+        :rtype: npt.NDArray[np.float64]
+        """
+
+        cost = self.distance[:, side, row, col] + \
+            np.hypot(target_x - self.exits[:, side, 0], target_y - self.exits[:, side, 1])
+
+        return self.direction[int(np.argmin(cost)), side, row, col]
+
+
+@functools.lru_cache(maxsize=None)
+def bridge_fields(width: int, height: int) -> BridgeFields:
+    """
+    Builds the flow fields for crossing the river at each bridge, see BridgeFields.
+
+    :param width: Width of the arena
+    :type width: int
+    :param height: Height of the arena
+    :type height: int
+    :return: Read-only fields
+    :rtype: BridgeFields
+    """
+
+    bridges = bridge_columns(width)
+    start, stop = river_rows(height)
+
+    distance = np.full((len(bridges), 2, height, width), np.inf)
+    direction = np.zeros((len(bridges), 2, height, width, 2))
+    exits = np.zeros((len(bridges), 2, 2))
+
+    for index, (left, right) in enumerate(bridges):
+
+        # Side 0 leads down to the row below the river, side 1 leads up to the row above it:
+
+        for side, row in ((0, start - 1), (1, stop)):
+
+            for col in range(max(left, 0), min(right, width)):
+                np.minimum(distance[index, side], distance_field(width, height, (col, row)),
+                           out=distance[index, side])
+
+            direction[index, side] = directions(width, height, distance[index, side])
+            exits[index, side] = ((left + right) / 2, row + 0.5)
+
+    for array in (distance, direction, exits):
+        array.flags.writeable = False
+
+    return BridgeFields(width, height, distance, direction, exits)
+
+
+def tower_goals(towers: List[Tuple[float, float]], width: int, height: int) -> Tuple[Tuple[int, int], ...]:
+    """
+    Determines the goal tiles of a lane leading to some towers.
+
+    :param towers: Position (x, y) of each tower
+    :type towers: List[Tuple[float, float]]
+    :param width: Width of the arena
+    :type width: int
+    :param height: Height of the arena
+    :type height: int
+    :return: Tile each tower stands on, as (x, y)
+    :rtype: Tuple[Tuple[int, int], ...]
+    """
+
+    return tuple((min(max(int(x), 0), width - 1), min(max(int(y), 0), height - 1))
+                 for x, y in towers)
@@ -1,8 +1,10 @@
-from typing import List
+from typing import Any, List, Tuple
 
-from queue import Queue
 import random
 
+import numpy as np
+import numpy.typing as npt
+
 from clash_royale.envs.game_engine.card import Card
 
 class Player():
@@ -11,47 +13,144 @@ class Player():
 
     This class represents the current state of players' cards, and the logic of playing cards.
     Handle elixir and legal cards.
+
+    Elixir is capped at MAX_ELIXIR, any elixir gained past the cap is lost.
+
+    The deck is kept as 8 integer slots, each an index into 'cards':
+    'hand_slots' holds the 4 cards in hand,
+    and 'cycle' is a ring of the other 4 cards, starting at 'cycle_head' with the next card.
+    Playing a card swaps it with the next card and advances the head,
+    so cycling is O(1) and never allocates.
+    This is the same layout as a single row of the hand, cycle and cycle_head
+    arrays of BatchedGameEngine, so state can be copied between the two directly.
     """
 
+    MAX_ELIXIR: float = 10  # Most elixir a player can hold
+
     def __init__(self,
                  deck: List[Card],
-                 fps: int) -> None:
+                 fps: int,
+                 seed: int | None=None) -> None:
         """
         Player component is initialized with deck of string, 
         specifying the cards' names in the deck.
+
+        The deck is shuffled with a private random generator,
+        so the order of cards only depends on the seed given here or to reset().
         """
 
         self.elixir: float = 0
         self.fps: int = fps
 
-        random.shuffle(deck)
-        self.deck: Queue = Queue(maxsize = 8)
-        for card in deck:
-            self.deck.put(card, block = False)
+        self.cards: List[Card] = list(deck)  # Deck in its original order
+        self.random: random.Random = random.Random(seed)
+
+        # Catalog ID and elixir cost of each card in the deck:
+
+        self.card_ids: npt.NDArray[np.int64] = np.array([card.id for card in self.cards], dtype=np.int64)
+        self.card_cost: npt.NDArray[np.float64] = np.array([card.elixir_cost for card in self.cards],
+                                                           dtype=np.float64)
 
-        self.hand: list[Card] = [self.deck.get(block = False) for i in range(4)]
-        self.next: Card = self.deck.get(block = False)
+        # Deck slots in hand, and the ring of remaining slots:
 
-    def reset(self, elixir: int = 5) -> None:
+        self.hand_slots: npt.NDArray[np.int64] = np.zeros(4, dtype=np.int64)
+        self.cycle: npt.NDArray[np.int64] = np.zeros(4, dtype=np.int64)
+        self.cycle_head: int = 0
+
+        self.shuffle()
+
+    @property
+    def hand(self) -> List[Card]:
+        """
+        Cards currently in hand.
+        """
+
+        return [self.cards[slot] for slot in self.hand_slots.tolist()]
+
+    @property
+    def next(self) -> Card:
+        """
+        Card that replaces the next card played.
+        """
+
+        return self.cards[int(self.cycle[self.cycle_head])]
+
+    def shuffle(self) -> None:
+        """
+        Shuffles the deck, and deals a new hand and next card.
+        """
+
+        order = list(range(len(self.cards)))
+        self.random.shuffle(order)
+
+        self.hand_slots[:] = order[:4]
+        self.cycle[:] = order[4:]
+        self.cycle_head = 0
+
+    def reset(self, elixir: int = 5, seed: int | None=None) -> None:
         """
         This method is used to reset Player class.
-        TODO: implement deck shuffling
+
+        The deck is reshuffled, after reseeding if a seed is given.
         """
 
         self.elixir: float = elixir
 
+        if seed is not None:
+            self.random.seed(seed)
+
+        self.shuffle()
+
+    def snapshot(self) -> Tuple[Any, ...]:
+        """
+        Captures the elixir, hand, and deck cycle of the player.
+        """
+
+        return self.elixir, self.hand_slots.copy(), self.cycle.copy(), self.cycle_head
+
+    def restore(self, snapshot: Tuple[Any, ...]) -> None:
+        """
+        Restores the player from a snapshot created by snapshot().
+        """
+
+        elixir, hand_slots, cycle, cycle_head = snapshot
+
+        self.elixir = elixir
+        self.hand_slots[:] = hand_slots
+        self.cycle[:] = cycle
+        self.cycle_head = cycle_head
+
+    def hand_ids(self) -> npt.NDArray[np.int64]:
+        """
+        Catalog ID of each card in hand.
+        """
+
+        return self.card_ids[self.hand_slots]
+
+    def hand_cost(self) -> npt.NDArray[np.float64]:
+        """
+        Elixir cost of each card in hand.
+        """
+
+        return self.card_cost[self.hand_slots]
+
+    def affordable(self) -> npt.NDArray[np.bool_]:
+        """
+        Determines which cards in hand can be played with the current amount of elixir.
+
+        :return: Mask with shape (4,)
+        :rtype: npt.NDArray[np.bool_]
+        """
+
+        return self.card_cost[self.hand_slots] <= self.elixir
+
     def get_pseudo_legal_cards(self) -> List[int]:
         """
         This method is used to get all cards that can be 
         played given the current amount of elixir.
         """
 
-        legal_cards: list[int] = []
-        for card_index in len(self.hand):
-            if self.hand[card_index].elixir <= self.elixir:
-                legal_cards.append(card_index)
-
-        return legal_cards
+        return np.flatnonzero(self.affordable()).tolist()
 
     def step(self,
              elixir_rate: float,
@@ -61,22 +160,32 @@ class Player():
         to better customize the elixir_rate that can vary depends on game modes.
         """
 
-        self.elixir += (elixir_rate / self.fps) * frames
+        self.add_elixir((elixir_rate / self.fps) * frames)
+
+    def add_elixir(self, amount: float) -> None:
+        """
+        Gives elixir to the player, clamping at the elixir cap.
+        """
+
+        self.elixir = min(self.elixir + amount, self.MAX_ELIXIR)
 
     def pop(self, card_index: int) -> None:
 
         """
         
-        A helper function to discard a card in hand and put it into Queue of remaining cards
-        that are not able to be played at the current state.
+        A helper function to discard a card in hand,
+        replacing it with the next card, and putting it at the back of the cycle.
 
         """
 
         assert card_index >= 0 and card_index < 4
 
-        self.deck.put(self.hand[card_index], block = False)
-        self.hand[card_index] = self.next
-        self.next = self.deck.get(block = False)
+        head = self.cycle_head
+        slot = self.hand_slots[card_index]
+
+        self.hand_slots[card_index] = self.cycle[head]
+        self.cycle[head] = slot
+        self.cycle_head = (head + 1) % 4
 
     def play_card(self, card_index: int) -> None:
 
@@ -87,7 +196,7 @@ class Player():
         """
 
         assert card_index >= 0 and card_index < 4
-        elixir_cost: float = self.hand[card_index].elixir_cost
+        elixir_cost: float = float(self.card_cost[self.hand_slots[card_index]])
 
         assert elixir_cost <= self.elixir
         self.pop(card_index)
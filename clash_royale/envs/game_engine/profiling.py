@@ -0,0 +1,358 @@
+"""
+Opt-in profiling of the simulation
+
+This file contains components for finding out where simulation time goes.
+A Profiler is attached to a GameEngine (see GameEngine.enable_profiling() or profile()),
+which then records how long each phase of a step takes,
+how many entities were simulated, and how many times each logic component was ran.
+
+When no profiler is attached, the engine only pays for a few 'is None' checks per step.
+
+Phases recorded by the engine:
+
+    step           - Whole call to GameEngine.step()
+    elixir         - Integrating elixir
+    arena.target   - Targeting pass
+    arena.attack   - Attack pass
+    arena.move     - Movement pass
+    arena.deaths   - Unloading dead entities
+    arena.collide  - Pushing apart overlapping entities
+    arena.grid     - Updating the spatial index, when it is queried after entities moved
+    deploy         - Starting units that finished deploying
+    spawn          - Spawning the units of a played card
+    render         - GameEngine.make_image()
+    features       - GameEngine.make_features()
+
+Durations and entity counts are kept in log2 bucketed histograms,
+so recording a value is a handful of integer operations,
+and memory use does not grow with the number of steps.
+"""
+
+from __future__ import annotations
+
+import contextlib
+import time
+from typing import TYPE_CHECKING, Dict, Iterator, List, Tuple
+
+if TYPE_CHECKING:
+    # Only import for typechecking to prevent circular dependency
+    from clash_royale.envs.game_engine.game_engine import GameEngine
+
+NUM_BUCKETS: int = 64
+
+
+class Histogram:
+    """
+    Histogram - Distribution of recorded values
+
+    Values are multiplied by 'scale' and truncated to integers,
+    then counted in power of two buckets:
+    bucket 0 holds 0, and bucket i holds [2 ** (i - 1), 2 ** i).
+    Durations are recorded in seconds with a scale of 1e9,
+    so their buckets are in nanoseconds.
+    """
+
+    def __init__(self, scale: float=1) -> None:
+
+        self.scale: float = scale
+        self.count: int = 0
+        self.total: float = 0
+        self.min: float = float('inf')
+        self.max: float = 0
+        self.buckets: List[int] = [0] * NUM_BUCKETS
+
+    def record(self, value: float) -> None:
+        """
+        Adds a value to the histogram.
+        """
+
+        self.count += 1
+        self.total += value
+
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+
+        self.buckets[min(int(value * self.scale).bit_length(), NUM_BUCKETS - 1)] += 1
+
+    @property
+    def mean(self) -> float:
+        """
+        Mean of the recorded values, 0 if nothing was recorded.
+        """
+
+        return self.total / self.count if self.count else 0
+
+    def edges(self) -> List[float]:
+        """
+        Upper edge of each bucket, in the units of the recorded values.
+        """
+
+        return [(1 << index) / self.scale for index in range(NUM_BUCKETS)]
+
+    def percentile(self, q: float) -> float:
+        """
+        Estimates a percentile of the recorded values.
+
+        The estimate is the upper edge of the bucket the percentile falls in,
+        clamped to the largest value recorded.
+
+        :param q: Percentile to estimate, between 0 and 100
+        :type q: float
+        :return: Estimated value
+        :rtype: float
+        """
+
+        if self.count == 0:
+            return 0
+
+        rank = q / 100 * self.count
+        seen = 0
+
+        for index, count in enumerate(self.buckets):
+
+            seen += count
+
+            if count and seen >= rank:
+                return min((1 << index) / self.scale, self.max)
+
+        return self.max
+
+    def summary(self) -> Dict[str, float]:
+        """
+        Summarizes the recorded values.
+
+        :return: Count, total, mean, min, max, and estimated p50, p90 and p99
+        :rtype: Dict[str, float]
+        """
+
+        return {
+            'count': self.count,
+            'total': self.total,
+            'mean': self.mean,
+            'min': self.min if self.count else 0,
+            'max': self.max,
+            'p50': self.percentile(50),
+            'p90': self.percentile(90),
+            'p99': self.percentile(99),
+        }
+
+
+class Profiler:
+    """
+    Profiler - Records timings and counters of a simulation
+
+    Phases are timed as laps:
+    begin() marks the current time,
+    and each call to lap() records the time since the last mark under a phase,
+    and marks the current time again.
+    This allows consecutive phases to be timed with one clock read each.
+    Arbitrary code can be timed with the phase() context manager.
+
+    Counters count events, such as calls to logic components,
+    and values (such as entity counts) are kept in histograms like durations.
+    """
+
+    def __init__(self) -> None:
+
+        self.timers: Dict[str, Histogram] = {}  # Duration of each phase, in seconds
+        self.values: Dict[str, Histogram] = {}  # Distribution of observed values
+        self.counters: Dict[str, int] = {}  # Number of times each event occurred
+
+        self.mark: float = time.perf_counter()  # Time the current lap started
+
+    def reset(self) -> None:
+        """
+        Discards everything recorded so far.
+        """
+
+        self.timers.clear()
+        self.values.clear()
+        self.counters.clear()
+
+    def begin(self) -> float:
+        """
+        Starts timing a sequence of laps.
+
+        :return: Current time, which can be given to since() to record the whole sequence
+        :rtype: float
+        """
+
+        self.mark = time.perf_counter()
+
+        return self.mark
+
+    def lap(self, phase: str) -> None:
+        """
+        Records the time since the last mark under a phase.
+        """
+
+        now = time.perf_counter()
+        self.time(phase, now - self.mark)
+        self.mark = now
+
+    def time(self, phase: str, seconds: float) -> None:
+        """
+        Records a duration under a phase.
+        """
+
+        timer = self.timers.get(phase)
+
+        if timer is None:
+            timer = self.timers[phase] = Histogram(scale=1e9)
+
+        timer.record(seconds)
+
+    def since(self, phase: str, start: float) -> None:
+        """
+        Records the time since a time returned by begin() under a phase.
+        """
+
+        self.time(phase, time.perf_counter() - start)
+
+    def observe(self, name: str, value: float) -> None:
+        """
+        Records a value, such as the number of entities simulated.
+        """
+
+        hist = self.values.get(name)
+
+        if hist is None:
+            hist = self.values[name] = Histogram()
+
+        hist.record(value)
+
+    def count(self, name: str, amount: int=1) -> None:
+        """
+        Increments a counter.
+        """
+
+        self.counters[name] = self.counters.get(name, 0) + amount
+
+    @contextlib.contextmanager
+    def phase(self, phase: str) -> Iterator[None]:
+        """
+        Times the body of a with statement under a phase.
+        """
+
+        start = time.perf_counter()
+
+        try:
+            yield
+        finally:
+            self.time(phase, time.perf_counter() - start)
+
+    def histogram(self, name: str) -> Tuple[List[float], List[int]]:
+        """
+        Gets the histogram of a phase or value.
+
+        Only buckets up to the last non-empty bucket are returned.
+
+        :param name: Name of the phase or value
+        :type name: str
+        :return: Upper edge of each bucket, and the number of values in each bucket
+        :rtype: Tuple[List[float], List[int]]
+        """
+
+        hist = self.timers.get(name) or self.values.get(name)
+
+        if hist is None:
+            raise KeyError(f"Nothing has been recorded under {name!r}")
+
+        last = max((index for index, count in enumerate(hist.buckets) if count), default=0)
+
+        return hist.edges()[:last + 1], hist.buckets[:last + 1]
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        """
+        Summarizes everything recorded.
+
+        :return: Summary of each phase (in seconds) and value, see Histogram.summary(),
+            and the counters
+        :rtype: Dict[str, Dict[str, float]]
+        """
+
+        return {
+            'timers': {phase: timer.summary() for phase, timer in self.timers.items()},
+            'values': {name: hist.summary() for name, hist in self.values.items()},
+            'counters': dict(self.counters),
+        }
+
+    def scalars(self, prefix: str='profile/') -> Dict[str, float]:
+        """
+        Flattens the summary into scalars, ready to be logged to a dashboard.
+
+        Durations are given in milliseconds, for example:
+        'profile/arena.target/mean_ms', 'profile/entities/max', 'profile/calls.attack'
+
+        :param prefix: Prefix of every key, defaults to 'profile/'
+        :type prefix: str
+        :return: Mapping of name to value
+        :rtype: Dict[str, float]
+        """
+
+        out = {}
+
+        for phase, timer in self.timers.items():
+
+            summary = timer.summary()
+            out[f'{prefix}{phase}/count'] = timer.count
+
+            for stat in ('mean', 'p50', 'p90', 'p99', 'max'):
+                out[f'{prefix}{phase}/{stat}_ms'] = summary[stat] * 1e3
+
+        for name, hist in self.values.items():
+            out[f'{prefix}{name}/mean'] = hist.mean
+            out[f'{prefix}{name}/max'] = hist.max
+
+        for name, count in self.counters.items():
+            out[f'{prefix}{name}'] = count
+
+        return out
+
+    def report(self) -> str:
+        """
+        Formats the summary as a table, with the slowest phases first.
+        """
+
+        timers = sorted(self.timers.items(), key=lambda item: item[1].total, reverse=True)
+
+        lines = [f"{'phase':>14} {'calls':>8} {'total (ms)':>11} "
+                 f"{'mean (us)':>10} {'p99 (us)':>10}"]
+
+        for phase, timer in timers:
+            lines.append(f"{phase:>14} {timer.count:>8} {timer.total * 1e3:>11.2f} "
+                         f"{timer.mean * 1e6:>10.2f} {timer.percentile(99) * 1e6:>10.2f}")
+
+        for name, hist in self.values.items():
+            lines.append(f"{name:>14} mean {hist.mean:.1f}, max {hist.max:g}")
+
+        for name, count in sorted(self.counters.items()):
+            lines.append(f"{name:>14} {count}")
+
+        return '\n'.join(lines)
+
+
+@contextlib.contextmanager
+def profile(engine: GameEngine, profiler: Profiler | None=None) -> Iterator[Profiler]:
+    """
+    Profiles an engine for the duration of a with statement.
+
+    The previous profiler of the engine (if any) is put back afterwards.
+
+    :param engine: Engine to profile
+    :type engine: GameEngine
+    :param profiler: Profiler to record into, defaults to None (create a new one)
+    :type profiler: Profiler | None
+    :return: Profiler that is recording
+    :rtype: Iterator[Profiler]
+    """
+
+    previous = engine.profiler
+
+    try:
+        yield engine.enable_profiling(profiler)
+    finally:
+        if previous is None:
+            engine.disable_profiling()
+        else:
+            engine.enable_profiling(previous)
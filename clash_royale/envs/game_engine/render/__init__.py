@@ -0,0 +1,51 @@
+"""
+This submodule contains components for rendering the arena to an image.
+
+Renderers are selected by name via make_renderer(),
+and are only imported when they are requested.
+This way, optional dependencies (pygame) are only needed
+if the renderer that uses them is actually used.
+"""
+
+from __future__ import annotations
+
+import importlib
+from typing import TYPE_CHECKING, Dict, Tuple
+
+if TYPE_CHECKING:
+    # Only import for typechecking to prevent loading every renderer
+    from clash_royale.envs.game_engine.render.base import BaseRenderer
+
+
+# Location of each renderer, as 'module:class':
+RENDERERS: Dict[str, str] = {
+    'numpy': 'clash_royale.envs.game_engine.render.numpy_renderer:NumpyRenderer',
+    'pygame': 'clash_royale.envs.game_engine.render.pygame_renderer:PygameRenderer',
+}
+
+
+def make_renderer(name: str,
+                  width: int=18,
+                  height: int=32,
+                  resolution: Tuple[int, int]=(128, 128)) -> BaseRenderer:
+    """
+    Creates a renderer by name.
+
+    :param name: Name of the renderer, see RENDERERS
+    :type name: str
+    :param width: Width of the arena, in tiles
+    :type width: int
+    :param height: Height of the arena, in tiles
+    :type height: int
+    :param resolution: Resolution of the image, in pixels
+    :type resolution: Tuple[int, int]
+    :return: Renderer instance
+    :rtype: BaseRenderer
+    """
+
+    if name not in RENDERERS:
+        raise ValueError(f"Unknown renderer: {name}, must be one of {list(RENDERERS)}")
+
+    module, cls = RENDERERS[name].split(':')
+
+    return getattr(importlib.import_module(module), cls)(width, height, resolution)
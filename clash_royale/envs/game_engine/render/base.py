@@ -0,0 +1,135 @@
+"""
+Base rendering components
+
+We define the layout and colors of the arena here,
+so every renderer draws the same image.
+Renderers must snap tiles to the same integer pixel edges
+(int(tile * scale)), and center sprites the same way,
+so the images match pixel for pixel.
+
+Images are indexed as [x, y, channel] (the same layout as pygame.surfarray),
+and are drawn from the perspective of player 0,
+meaning the bottom of the image is the side player 0 defends.
+Images for player 1 are rotated by 180 degrees.
+"""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Dict, Tuple
+
+import numpy as np
+import numpy.typing as npt
+
+from clash_royale.envs.game_engine.entities.entity import Entity
+from clash_royale.envs.game_engine.entities.tower import KING_TOWER, PRINCESS_TOWER
+
+if TYPE_CHECKING:
+    # Only import for typechecking to prevent circular dependency
+    from clash_royale.envs.game_engine.arena import Arena
+
+
+Color = Tuple[int, int, int]
+
+GRASS: Tuple[Color, Color] = ((106, 168, 79), (96, 158, 69))  # Checkered tile colors
+RIVER: Color = (64, 120, 200)
+BRIDGE: Color = (140, 100, 60)
+
+TEAM_COLORS: Tuple[Color, Color] = ((60, 90, 220), (220, 60, 60))  # Unit colors of each team
+TOWER_COLORS: Tuple[Color, Color] = ((30, 50, 150), (150, 30, 30))  # Tower colors of each team
+
+TOWER_TYPES: Tuple[int, ...] = (KING_TOWER, PRINCESS_TOWER)
+
+
+def entity_color(type_id: int, team: int) -> Color:
+    """
+    Determines the color an entity is drawn with.
+    """
+
+    return TOWER_COLORS[team] if type_id in TOWER_TYPES else TEAM_COLORS[team]
+
+
+class BaseRenderer:
+    """
+    BaseRenderer - Class all renderers must inherit!
+
+    Renderers draw the arena and its entities into an image
+    with the shape (resolution[0], resolution[1], 3).
+    """
+
+    def __init__(self, width: int, height: int, resolution: Tuple[int, int]) -> None:
+
+        self.width: int = width  # Width of the arena, in tiles
+        self.height: int = height  # Height of the arena, in tiles
+        self.resolution: Tuple[int, int] = resolution  # Size of the image, in pixels
+
+        self.scale_x: float = resolution[0] / width  # Pixels per tile, horizontally
+        self.scale_y: float = resolution[1] / height  # Pixels per tile, vertically
+
+        self.reuses_buffer: bool = True  # Whether rendered images are overwritten by the next call
+
+    def to_pixels(self,
+                  x: npt.NDArray[np.float64],
+                  y: npt.NDArray[np.float64]) -> Tuple[npt.NDArray[np.intp], npt.NDArray[np.intp]]:
+        """
+        Converts arena positions into pixel positions.
+
+        :return: Pixel positions along the x and y axis of the image
+        """
+
+        px = (np.asarray(x) * self.scale_x).astype(np.intp)
+        py = ((self.height - np.asarray(y)) * self.scale_y).astype(np.intp)
+
+        return px, py
+
+    def entity_groups(self, arena: Arena) -> Dict[int, Dict[str, npt.NDArray]]:
+        """
+        Groups the running entities in an arena by type.
+
+        :return: Mapping of type ID to 'x', 'y', 'team' and 'troop_size' arrays
+        """
+
+        if arena.store is not None:
+            store = arena.store
+            running = store.column('state') == Entity.STARTED
+            columns = {name: store.column(name)[running]
+                       for name in ('x', 'y', 'team', 'type_id', 'troop_size')}
+        else:
+            ents = [ent for ent in arena.entities if ent.running]
+            columns = {
+                'x': np.array([ent.x for ent in ents], dtype=np.float64),
+                'y': np.array([ent.y for ent in ents], dtype=np.float64),
+                'team': np.array([ent.team for ent in ents], dtype=np.int8),
+                'type_id': np.array([ent.type_id for ent in ents], dtype=np.int16),
+                'troop_size': np.array([ent.stats.troop_size for ent in ents], dtype=np.float64),
+            }
+
+        groups = {}
+
+        for type_id in np.unique(columns['type_id']).tolist():
+            mask = columns['type_id'] == type_id
+            groups[type_id] = {name: col[mask] for name, col in columns.items()}
+
+        return groups
+
+    def render(self, arena: Arena, player_id: int) -> npt.NDArray[np.uint8]:
+        """
+        Renders the arena from the perspective of a player.
+
+        If reuses_buffer is True, the returned image may be reused by the renderer,
+        so it is only valid until the next call.
+        Otherwise, a new image is returned on every call.
+
+        :param arena: Arena to render
+        :type arena: Arena
+        :param player_id: Player to render for
+        :type player_id: int
+        :return: Image with shape (resolution[0], resolution[1], 3)
+        :rtype: npt.NDArray[np.uint8]
+        """
+
+        raise NotImplementedError("Must be implemented in child class!")
+
+    def close(self) -> None:
+        """
+        Releases any resources held by this renderer.
+        """
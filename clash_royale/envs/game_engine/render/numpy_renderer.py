@@ -0,0 +1,226 @@
+"""
+Pure NumPy renderer
+
+This renderer draws the arena using only NumPy,
+so no display or pygame installation is required.
+This makes it ideal for headless training.
+"""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Dict, Tuple
+
+import numpy as np
+import numpy.typing as npt
+
+from clash_royale.envs.game_engine.pathing import bridge_columns, river_rows
+from clash_royale.envs.game_engine.render.base import (
+    BRIDGE, GRASS, RIVER, BaseRenderer, entity_color)
+
+if TYPE_CHECKING:
+    # Only import for typechecking to prevent circular dependency
+    from clash_royale.envs.game_engine.arena import Arena
+
+
+def ellipse_mask(width: int, height: int) -> npt.NDArray[np.bool_]:
+    """
+    Determines the pixels of a filled ellipse inside a box.
+
+    We use the same midpoint algorithm as pygame.draw.ellipse(),
+    so sprites cover exactly the same pixels in both renderers.
+
+    :param width: Width of the box, in pixels
+    :type width: int
+    :param height: Height of the box, in pixels
+    :type height: int
+    :return: Mask with shape (width, height), True for pixels inside the ellipse
+    :rtype: npt.NDArray[np.bool_]
+    """
+
+    mask = np.zeros((width, height), dtype=bool)
+
+    if width == 1 or height == 1:
+        mask[:] = True
+        return mask
+
+    # Center of the ellipse, which is also its radius along each axis:
+
+    cx, cy = width // 2, height // 2
+    off_x, off_y = (width + 1) % 2, (height + 1) % 2
+
+    def fill(x: int, y: int) -> None:
+
+        # Fill the rows above and below the center,
+        # swapping the ends of the span like pygame does:
+
+        left, right = sorted((cx - x, cx + x - off_x))
+
+        for row in (cy - y, cy + y - off_y):
+            if 0 <= row < height:
+                mask[max(left, 0):min(right, width - 1) + 1, row] = True
+
+    x, y = 0, cy
+    dx, dy = 0, 2 * cx * cx * y
+
+    # Region where the slope is below 1:
+
+    d1 = cy * cy - cx * cx * cy + 0.25 * cx * cx
+
+    while dx < dy:
+
+        fill(x, y)
+        x += 1
+        dx += 2 * cy * cy
+
+        if d1 < 0:
+            d1 += dx + cy * cy
+        else:
+            y -= 1
+            dy -= 2 * cx * cx
+            d1 += dx - dy + cy * cy
+
+    # Region where the slope is above 1:
+
+    d2 = cy * cy * (x + 0.5) ** 2 + cx * cx * (y - 1) ** 2 - cx * cx * cy * cy
+
+    while y >= 0:
+
+        fill(x, y)
+        y -= 1
+        dy -= 2 * cx * cx
+
+        if d2 > 0:
+            d2 += cx * cx - dy
+        else:
+            x += 1
+            dx += 2 * cy * cy
+            d2 += dx - dy + cx * cx
+
+    return mask
+
+
+class NumpyRenderer(BaseRenderer):
+    """
+    NumpyRenderer - Rasterizes the arena with NumPy
+
+    The static background (grass, river and bridges) is drawn once,
+    and copied into a reused image buffer at the start of each frame.
+    Entities are then drawn as filled ellipses sized by their troop size,
+    where every entity of a type is stamped at once with a single fancy-indexed write.
+    """
+
+    def __init__(self, width: int, height: int, resolution: Tuple[int, int]) -> None:
+        super().__init__(width, height, resolution)
+
+        self.background: npt.NDArray[np.uint8] = self._draw_background()
+        self.buffer: npt.NDArray[np.uint8] = np.empty_like(self.background)
+
+        # Sprite pixel offsets, cached by troop size:
+
+        self.sprites: Dict[float, Tuple[npt.NDArray[np.intp], npt.NDArray[np.intp]]] = {}
+
+    def _draw_background(self) -> npt.NDArray[np.uint8]:
+        """
+        Draws the static parts of the arena.
+        """
+
+        # Determine the tile of each pixel,
+        # using the same integer tile edges as the pygame renderer:
+
+        edges_x = (np.arange(self.width + 1) * self.scale_x).astype(np.intp)
+        edges_y = (np.arange(self.height + 1) * self.scale_y).astype(np.intp)
+
+        px = np.arange(self.resolution[0])
+        py = np.arange(self.resolution[1])
+        tile_x = (np.searchsorted(edges_x, px, side='right') - 1)[:, None]
+        tile_y = (self.height - np.searchsorted(edges_y, py, side='right'))[None, :]
+
+        # Checkered grass:
+
+        image = np.where(((tile_x + tile_y) % 2 == 0)[..., None],
+                         np.array(GRASS[0], dtype=np.uint8),
+                         np.array(GRASS[1], dtype=np.uint8))
+
+        # River, with bridges on top:
+
+        start, stop = river_rows(self.height)
+        river = (tile_y >= start) & (tile_y < stop)
+
+        bridge = np.zeros_like(tile_x, dtype=bool)
+        for left, right in bridge_columns(self.width):
+            bridge |= (tile_x >= left) & (tile_x < right)
+
+        image[river & ~bridge] = RIVER
+        image[river & bridge] = BRIDGE
+
+        return np.ascontiguousarray(image, dtype=np.uint8)
+
+    def _sprite(self, troop_size: float) -> Tuple[npt.NDArray[np.intp], npt.NDArray[np.intp]]:
+        """
+        Determines the pixel offsets covered by an entity of a given size.
+        """
+
+        if troop_size not in self.sprites:
+
+            # Use the same bounding box as the pygame sprites,
+            # centered the same way as pygame.Rect(center=...):
+
+            radius = max(troop_size / 2, 0.5)
+            w = max(int(2 * radius * self.scale_x), 1)
+            h = max(int(2 * radius * self.scale_y), 1)
+
+            ox, oy = np.nonzero(ellipse_mask(w, h))
+
+            self.sprites[troop_size] = (ox - w // 2, oy - h // 2)
+
+        return self.sprites[troop_size]
+
+    def draw_entities(self,
+                      image: npt.NDArray[np.uint8],
+                      x: npt.NDArray[np.float64],
+                      y: npt.NDArray[np.float64],
+                      colors: npt.NDArray[np.uint8],
+                      troop_size: float) -> None:
+        """
+        Draws many entities of the same size at once.
+
+        :param image: Image to draw on
+        :type image: npt.NDArray[np.uint8]
+        :param x: X positions of the entities, in tiles
+        :type x: npt.NDArray[np.float64]
+        :param y: Y positions of the entities, in tiles
+        :type y: npt.NDArray[np.float64]
+        :param colors: Color of each entity, with shape (n, 3)
+        :type colors: npt.NDArray[np.uint8]
+        :param troop_size: Size of the entities, in tiles
+        :type troop_size: float
+        """
+
+        ox, oy = self._sprite(troop_size)
+        cx, cy = self.to_pixels(x, y)
+
+        px = cx[:, None] + ox[None, :]
+        py = cy[:, None] + oy[None, :]
+
+        valid = (px >= 0) & (px < image.shape[0]) & (py >= 0) & (py < image.shape[1])
+
+        image[px[valid], py[valid]] = np.broadcast_to(colors[:, None, :],
+                                                      (len(colors), len(ox), 3))[valid]
+
+    def render(self, arena: Arena, player_id: int) -> npt.NDArray[np.uint8]:
+
+        image = self.buffer
+        np.copyto(image, self.background)
+
+        for type_id, group in self.entity_groups(arena).items():
+
+            colors = np.array([entity_color(type_id, 0), entity_color(type_id, 1)],
+                              dtype=np.uint8)[group['team']]
+
+            self.draw_entities(image, group['x'], group['y'], colors,
+                               float(group['troop_size'][0]))
+
+        if player_id == 1:
+            return image[::-1, ::-1]
+
+        return image
@@ -0,0 +1,207 @@
+"""
+Pygame renderer
+
+This renderer draws the arena using pygame surfaces.
+
+Sprites and the arena background are drawn once per process into a SpriteAtlas,
+and each frame only blits them, restoring the background under the sprites
+drawn in the previous frame instead of redrawing the whole arena.
+"""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Dict, List, Tuple
+
+import numpy as np
+import numpy.typing as npt
+import pygame
+
+from clash_royale.envs.game_engine.pathing import bridge_columns, river_rows
+from clash_royale.envs.game_engine.render.base import (
+    BRIDGE, GRASS, RIVER, TEAM_COLORS, TOWER_TYPES, BaseRenderer, Color, entity_color)
+from clash_royale.envs.game_engine.entities.tower import TOWER_STATS
+
+if TYPE_CHECKING:
+    # Only import for typechecking to prevent circular dependency
+    from clash_royale.envs.game_engine.arena import Arena
+
+
+class SpriteAtlas:
+    """
+    SpriteAtlas - Pre-rendered surfaces for an arena layout
+
+    We keep the arena background, along with a sprite
+    for each color and troop size, drawn at the scale of the layout.
+    Tower sprites and unit sprites for common sizes are drawn up front,
+    any other size is drawn the first time it is requested.
+
+    Atlases should be obtained via get_atlas(),
+    so each layout is only drawn once per process.
+    """
+
+    def __init__(self, width: int, height: int, resolution: Tuple[int, int]) -> None:
+
+        self.width: int = width  # Width of the arena, in tiles
+        self.height: int = height  # Height of the arena, in tiles
+        self.resolution: Tuple[int, int] = resolution  # Size of the image, in pixels
+
+        self.scale_x: float = resolution[0] / width
+        self.scale_y: float = resolution[1] / height
+
+        self.background: pygame.Surface = self._draw_background()
+
+        # Sprite surfaces, keyed by (color, troop size):
+
+        self.sprites: Dict[Tuple[Color, float], pygame.Surface] = {}
+
+        for type_id in TOWER_TYPES:
+            for team in (0, 1):
+                self.sprite(entity_color(type_id, team), float(TOWER_STATS[type_id].troop_size))
+
+        for color in TEAM_COLORS:
+            for troop_size in (0.5, 1.0, 1.5, 2.0):
+                self.sprite(color, troop_size)
+
+    def tile_rect(self, x: float, y: float, w: float=1, h: float=1) -> pygame.Rect:
+        """
+        Determines the pixel rectangle covering an area of tiles.
+
+        (x, y) is the tile with the lowest coordinates in the area.
+        """
+
+        left = int(x * self.scale_x)
+        top = int((self.height - y - h) * self.scale_y)
+        right = int((x + w) * self.scale_x)
+        bottom = int((self.height - y) * self.scale_y)
+
+        return pygame.Rect(left, top, right - left, bottom - top)
+
+    def _draw_background(self) -> pygame.Surface:
+        """
+        Draws the static parts of the arena.
+        """
+
+        surface = pygame.Surface(self.resolution)
+
+        for tile_x in range(self.width):
+            for tile_y in range(self.height):
+                surface.fill(GRASS[(tile_x + tile_y) % 2], self.tile_rect(tile_x, tile_y))
+
+        start, stop = river_rows(self.height)
+        surface.fill(RIVER, self.tile_rect(0, start, self.width, stop - start))
+
+        for left, right in bridge_columns(self.width):
+            surface.fill(BRIDGE, self.tile_rect(left, start, right - left, stop - start))
+
+        return surface
+
+    def sprite(self, color: Color, troop_size: float) -> pygame.Surface:
+        """
+        Gets the sprite for an entity of a color and size.
+
+        :param color: Color of the entity
+        :type color: Color
+        :param troop_size: Size of the entity, in tiles
+        :type troop_size: float
+        :return: Sprite with a transparent background
+        :rtype: pygame.Surface
+        """
+
+        key = (color, troop_size)
+
+        if key not in self.sprites:
+
+            radius = max(troop_size / 2, 0.5)
+            size = (max(int(2 * radius * self.scale_x), 1), max(int(2 * radius * self.scale_y), 1))
+
+            surface = pygame.Surface(size, pygame.SRCALPHA)
+            pygame.draw.ellipse(surface, color, surface.get_rect())
+
+            self.sprites[key] = surface
+
+        return self.sprites[key]
+
+
+# Atlases that have been drawn in this process, keyed by layout:
+_ATLASES: Dict[Tuple[int, int, Tuple[int, int]], SpriteAtlas] = {}
+
+
+def get_atlas(width: int, height: int, resolution: Tuple[int, int]) -> SpriteAtlas:
+    """
+    Gets the atlas for an arena layout, drawing it if this is the first request.
+
+    :param width: Width of the arena, in tiles
+    :type width: int
+    :param height: Height of the arena, in tiles
+    :type height: int
+    :param resolution: Size of the image, in pixels
+    :type resolution: Tuple[int, int]
+    :return: Atlas for the layout
+    :rtype: SpriteAtlas
+    """
+
+    key = (width, height, tuple(resolution))
+
+    if key not in _ATLASES:
+        _ATLASES[key] = SpriteAtlas(width, height, resolution)
+
+    return _ATLASES[key]
+
+
+class PygameRenderer(BaseRenderer):
+    """
+    PygameRenderer - Draws the arena with pygame
+
+    Sprites are blitted from a shared SpriteAtlas onto a persistent canvas.
+    Before drawing a frame, we only restore the background
+    under the sprites drawn in the previous frame (the dirty rectangles),
+    so the cost of a frame scales with the number of entities,
+    not the size of the image.
+    """
+
+    def __init__(self, width: int, height: int, resolution: Tuple[int, int]) -> None:
+        super().__init__(width, height, resolution)
+
+        self.atlas: SpriteAtlas = get_atlas(width, height, resolution)
+
+        self.canvas: pygame.Surface = self.atlas.background.copy()
+        self.dirty: List[pygame.Rect] = []  # Areas drawn over in the last frame
+
+        # Images are copied out of the canvas, so they are never reused:
+
+        self.reuses_buffer = False
+
+    def render(self, arena: Arena, player_id: int) -> npt.NDArray[np.uint8]:
+
+        canvas = self.canvas
+        atlas = self.atlas
+
+        # Restore the background under the last frame's sprites:
+
+        for rect in self.dirty:
+            canvas.blit(atlas.background, rect, rect)
+
+        # Blit the sprites for this frame:
+
+        dirty = []
+
+        for type_id, group in self.entity_groups(arena).items():
+
+            px, py = self.to_pixels(group['x'], group['y'])
+
+            for x, y, team, size in zip(px.tolist(), py.tolist(),
+                                        group['team'].tolist(), group['troop_size'].tolist()):
+
+                sprite = atlas.sprite(entity_color(type_id, team), size)
+                rect = sprite.get_rect(center=(x, y))
+
+                dirty.append(canvas.blit(sprite, rect))
+
+        self.dirty = dirty
+
+        image = pygame.surfarray.pixels3d(canvas)
+
+        if player_id == 1:
+            image = image[::-1, ::-1]
+
+        return np.array(image)
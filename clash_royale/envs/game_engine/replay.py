@@ -0,0 +1,299 @@
+"""
+Replay recording and re-simulation
+
+Instead of storing frames, a match is recorded as everything needed to simulate it again:
+the seed and decks the match was reset with,
+and the stream of apply() and step() calls that were made.
+The engine is deterministic given these, so re-simulating a replay
+reproduces the match exactly.
+
+Replays are stored in a compact binary format:
+
+    header  - '<4sHQHHHBB' magic, version, seed, fps, width, height, deck sizes
+    decks   - '<H' catalog ID of each card of each deck, in original order
+    records - One byte tag followed by the record:
+        STEP  - '<II' count, frames: step(frames) was called 'count' times in a row
+        APPLY - '<BHHB' player, x, y, card index: apply(player, (x, y, card index))
+        CHECK - '<II' frame, checksum: GameEngine.checksum() after stepping to 'frame'
+
+Consecutive calls to step() with the same frame count are merged into one record,
+so a match costs a few bytes per action, not per frame.
+CHECK records are optional, and allow divergence to be detected when re-simulating.
+"""
+
+from __future__ import annotations
+
+import dataclasses
+import struct
+from typing import TYPE_CHECKING, Iterator, List, Tuple
+
+if TYPE_CHECKING:
+    # Only import for typechecking to prevent circular dependency
+    from clash_royale.envs.game_engine.game_engine import GameEngine
+
+
+MAGIC: bytes = b'CRRP'
+VERSION: int = 2
+
+# Record tags:
+STEP: int = 0
+APPLY: int = 1
+CHECK: int = 2
+
+HEADER = struct.Struct('<4sHQHHHBB')
+CARD = struct.Struct('<H')
+RECORDS = {
+    STEP: struct.Struct('<II'),
+    APPLY: struct.Struct('<BHHB'),
+    CHECK: struct.Struct('<II'),
+}
+
+
+class ReplayDivergence(Exception):
+    """
+    Raised when a re-simulated match does not match its recorded checksums.
+    """
+
+
+@dataclasses.dataclass(slots=True)
+class Replay:
+    """
+    Replay - Recorded match that can be simulated again
+
+    Records are tuples starting with their tag, see the module docstring.
+    """
+
+    seed: int  # Seed the match was reset with
+    fps: int
+    width: int
+    height: int
+    deck1: List[int]  # Catalog ID of each card, in original order
+    deck2: List[int]
+    records: List[Tuple[int, ...]] = dataclasses.field(default_factory=list)
+
+    @property
+    def frames(self) -> int:
+        """
+        Number of frames the recorded match lasted.
+
+        :return: Frames stepped
+        :rtype: int
+        """
+
+        return sum(record[1] * record[2] for record in self.records if record[0] == STEP)
+
+    def to_bytes(self) -> bytes:
+        """
+        Encodes this replay into the binary format.
+
+        :return: Encoded replay
+        :rtype: bytes
+        """
+
+        parts = [HEADER.pack(MAGIC, VERSION, self.seed, self.fps, self.width, self.height,
+                             len(self.deck1), len(self.deck2))]
+        parts.extend(CARD.pack(card) for card in self.deck1 + self.deck2)
+
+        for tag, *fields in self.records:
+            parts.append(bytes((tag,)))
+            parts.append(RECORDS[tag].pack(*fields))
+
+        return b''.join(parts)
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> Replay:
+        """
+        Decodes a replay from the binary format.
+
+        :param data: Encoded replay
+        :type data: bytes
+        :return: Decoded replay
+        :rtype: Replay
+        """
+
+        magic, version, seed, fps, width, height, size1, size2 = HEADER.unpack_from(data)
+
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"Not a version {VERSION} replay!")
+
+        offset = HEADER.size
+        cards = [CARD.unpack_from(data, offset + i * CARD.size)[0] for i in range(size1 + size2)]
+        offset += (size1 + size2) * CARD.size
+
+        records = []
+
+        while offset < len(data):
+            tag = data[offset]
+            record = RECORDS[tag]
+            records.append((tag, *record.unpack_from(data, offset + 1)))
+            offset += 1 + record.size
+
+        return cls(seed, fps, width, height, cards[:size1], cards[size1:], records)
+
+    def save(self, path: str) -> None:
+        """
+        Writes this replay to a file.
+        """
+
+        with open(path, 'wb') as file:
+            file.write(self.to_bytes())
+
+    @classmethod
+    def load(cls, path: str) -> Replay:
+        """
+        Reads a replay from a file.
+        """
+
+        with open(path, 'rb') as file:
+            return cls.from_bytes(file.read())
+
+    def make_engine(self, **kwargs) -> GameEngine:
+        """
+        Creates an engine with the settings of this replay, reset to the start of the match.
+
+        Any keyword arguments are passed along to GameEngine.
+
+        :return: Engine at the first frame of the match
+        :rtype: GameEngine
+        """
+
+        # Import here, as the engine imports us:
+        from clash_royale.envs.game_engine.game_engine import GameEngine  # pylint: disable=import-outside-toplevel
+
+        engine = GameEngine(list(self.deck1), list(self.deck2),
+                            width=self.width, height=self.height, fps=self.fps, **kwargs)
+        engine.reset(seed=self.seed)
+
+        return engine
+
+    def iter_frames(self,
+                    start: int=0,
+                    stop: int | None=None,
+                    verify: bool=False,
+                    engine: GameEngine | None=None) -> Iterator[GameEngine]:
+        """
+        Re-simulates the match, yielding the engine after each recorded step.
+
+        Only steps that end within [start, stop) are yielded,
+        though every step before 'start' must still be simulated.
+        The same engine is yielded every time, and is updated in place.
+
+        :param start: First frame to yield, defaults to 0
+        :type start: int
+        :param stop: Frame to stop at, defaults to None (end of match)
+        :type stop: int | None
+        :param verify: Whether to compare against recorded checksums, defaults to False
+        :type verify: bool
+        :param engine: Engine to simulate with, defaults to None (create one via make_engine())
+        :type engine: GameEngine | None
+        :raises ReplayDivergence: If verifying and a checksum does not match
+        """
+
+        if engine is None:
+            engine = self.make_engine()
+        else:
+            engine.reset(seed=self.seed)
+
+        for tag, *fields in self.records:
+
+            if tag == APPLY:
+                player_id, x, y, card_index = fields
+                engine.apply(player_id, (x, y, card_index))
+
+            elif tag == STEP:
+                count, frames = fields
+
+                for _ in range(count):
+
+                    if stop is not None and engine.scheduler.frame() + frames > stop:
+                        return
+
+                    engine.step(frames)
+
+                    if engine.scheduler.frame() >= start:
+                        yield engine
+
+            elif tag == CHECK and verify:
+                frame, checksum = fields
+
+                if engine.checksum() != checksum:
+                    raise ReplayDivergence(f"Simulation diverged at or before frame {frame}")
+
+    def simulate(self, stop: int | None=None, verify: bool=False, **kwargs) -> GameEngine:
+        """
+        Re-simulates the match up to a frame.
+
+        Any keyword arguments are passed along to GameEngine.
+
+        :param stop: Frame to stop at, defaults to None (end of match)
+        :type stop: int | None
+        :param verify: Whether to compare against recorded checksums, defaults to False
+        :type verify: bool
+        :return: Engine at the stopping frame
+        :rtype: GameEngine
+        :raises ReplayDivergence: If verifying and a checksum does not match
+        """
+
+        engine = self.make_engine(**kwargs)
+
+        for _ in self.iter_frames(stop=stop, verify=verify, engine=engine):
+            pass
+
+        return engine
+
+
+class ReplayRecorder:
+    """
+    ReplayRecorder - Records the match an engine is playing
+
+    The engine informs us of every apply() and step() call.
+    If 'checksum_interval' is positive, we also record the checksum of the engine
+    every time a step crosses a multiple of that many frames.
+    """
+
+    def __init__(self, checksum_interval: int=0) -> None:
+
+        self.checksum_interval: int = checksum_interval
+        self.replay: Replay | None = None  # Replay being recorded
+
+    def begin(self, engine: GameEngine) -> None:
+        """
+        Starts recording a new match, which must be at its first frame.
+
+        :param engine: Engine to record
+        :type engine: GameEngine
+        """
+
+        if engine.scheduler.frame() != 0:
+            raise ValueError("Recording must start at the first frame of a match!")
+
+        self.replay = Replay(engine.seed, engine.fps, engine.width, engine.height,
+                             [card.id for card in engine.player1.cards],
+                             [card.id for card in engine.player2.cards])
+
+    def on_apply(self, player_id: int, action: Tuple[int, int, int]) -> None:
+        """
+        Records a call to apply().
+        """
+
+        self.replay.records.append((APPLY, player_id, *action))
+
+    def on_step(self, engine: GameEngine, frames: int) -> None:
+        """
+        Records a call to step(), after the step has been made.
+        """
+
+        records = self.replay.records
+
+        # Merge with the previous step if possible:
+
+        if records and records[-1][0] == STEP and records[-1][2] == frames:
+            records[-1] = (STEP, records[-1][1] + 1, frames)
+        else:
+            records.append((STEP, 1, frames))
+
+        interval = self.checksum_interval
+        frame = engine.scheduler.frame()
+
+        if interval > 0 and frame // interval != (frame - frames) // interval:
+            records.append((CHECK, frame, engine.checksum()))
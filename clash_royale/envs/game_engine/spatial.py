@@ -0,0 +1,177 @@
+"""
+Spatial indexing components
+
+This file contains components that allow entities to be found by position,
+without having to iterate over every entity in the arena.
+"""
+
+from __future__ import annotations
+
+import math
+from typing import TYPE_CHECKING, Dict, List
+
+if TYPE_CHECKING:
+    # Only import for typechecking to prevent circular dependency
+    from clash_royale.envs.game_engine.entities.entity import Entity
+
+
+class SpatialGrid:
+    """
+    SpatialGrid - Uniform grid index over the arena
+
+    We split the arena into square cells of 'cell_size' tiles,
+    and keep track of the entities that are within each cell.
+    Radius queries then only need to consider entities
+    in the cells that overlap the query circle,
+    instead of every entity in the arena.
+
+    Entities outside of the arena bounds are kept in the closest edge cell.
+
+    Each cell keeps its entities in a dictionary (used as an ordered set),
+    so query results are deterministic between runs.
+    Entities must be reinserted via update() when they move,
+    otherwise they will be found in the cell they were last placed in.
+    """
+
+    def __init__(self, width: int=18, height: int=32, cell_size: float=4) -> None:
+
+        self.width: int = width  # Width of the indexed area
+        self.height: int = height  # Height of the indexed area
+        self.cell_size: float = cell_size  # Size of each cell, in tiles
+
+        self.cols: int = max(1, math.ceil(width / cell_size))  # Number of cell columns
+        self.rows: int = max(1, math.ceil(height / cell_size))  # Number of cell rows
+
+        self.cells: List[Dict[Entity, None]] = [{} for _ in range(self.cols * self.rows)]
+        self.cell_of: Dict[Entity, int] = {}  # Cell each entity is currently in
+
+    def __len__(self) -> int:
+        return len(self.cell_of)
+
+    def __contains__(self, entity: Entity) -> bool:
+        return entity in self.cell_of
+
+    def cell_index(self, x: float, y: float) -> int:
+        """
+        Determines the index of the cell that contains a point.
+
+        :param x: X position of the point
+        :type x: float
+        :param y: Y position of the point
+        :type y: float
+        :return: Index of the cell
+        :rtype: int
+        """
+
+        col = min(max(int(x // self.cell_size), 0), self.cols - 1)
+        row = min(max(int(y // self.cell_size), 0), self.rows - 1)
+
+        return row * self.cols + col
+
+    def insert(self, entity: Entity) -> None:
+        """
+        Adds an entity to the grid, at its current position.
+
+        :param entity: Entity to add
+        :type entity: Entity
+        """
+
+        index = self.cell_index(entity.x, entity.y)
+        self.cells[index][entity] = None
+        self.cell_of[entity] = index
+
+    def remove(self, entity: Entity) -> None:
+        """
+        Removes an entity from the grid.
+
+        Entities that are not in the grid are ignored.
+
+        :param entity: Entity to remove
+        :type entity: Entity
+        """
+
+        index = self.cell_of.pop(entity, None)
+
+        if index is not None:
+            del self.cells[index][entity]
+
+    def update(self, entity: Entity) -> bool:
+        """
+        Reinserts an entity if it has moved to a different cell.
+
+        :param entity: Entity to update
+        :type entity: Entity
+        :return: True if the entity changed cells, False if not
+        :rtype: bool
+        """
+
+        index = self.cell_index(entity.x, entity.y)
+        old = self.cell_of.get(entity)
+
+        if old == index:
+            return False
+
+        if old is not None:
+            del self.cells[old][entity]
+
+        self.cells[index][entity] = None
+        self.cell_of[entity] = index
+
+        return True
+
+    def clear(self) -> None:
+        """
+        Removes all entities from the grid.
+        """
+
+        for cell in self.cells:
+            cell.clear()
+
+        self.cell_of.clear()
+
+    def query_radius(self, x: float, y: float, r: float, team: int | None=None) -> List[Entity]:
+        """
+        Finds all entities within a radius of a point.
+
+        :param x: X position of the point
+        :type x: float
+        :param y: Y position of the point
+        :type y: float
+        :param r: Radius to search
+        :type r: float
+        :param team: Only return entities on this team, defaults to None (any team)
+        :type team: int | None
+        :return: Entities within the radius
+        :rtype: List[Entity]
+        """
+
+        # Find the range of cells overlapping the query,
+        # clamping so out of bounds queries still see the edge cells:
+
+        size = self.cell_size
+        col_min = min(max(int((x - r) // size), 0), self.cols - 1)
+        col_max = min(max(int((x + r) // size), 0), self.cols - 1)
+        row_min = min(max(int((y - r) // size), 0), self.rows - 1)
+        row_max = min(max(int((y + r) // size), 0), self.rows - 1)
+
+        r2 = r * r
+        found: List[Entity] = []
+
+        for row in range(row_min, row_max + 1):
+
+            base = row * self.cols
+
+            for col in range(col_min, col_max + 1):
+
+                for ent in self.cells[base + col]:
+
+                    if team is not None and ent.team != team:
+                        continue
+
+                    dx = ent.x - x
+                    dy = ent.y - y
+
+                    if dx * dx + dy * dy <= r2:
+                        found.append(ent)
+
+        return found
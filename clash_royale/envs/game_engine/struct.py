@@ -5,57 +5,321 @@ Various structures to be utilized
 from __future__ import annotations
 
 import dataclasses
+import heapq
+from typing import Any, List, Tuple
+
+import numpy as np
+import numpy.typing as npt
+
+# Kinds of events the scheduler keeps track of:
+ATTACK_READY: str = 'attack_ready'  # An entity can attack again
+ELIXIR_THRESHOLD: str = 'elixir_threshold'  # A player can afford another card
+DEPLOY: str = 'deploy'  # A played card finished deploying
+DOUBLE_ELIXIR: str = 'double_elixir'  # Phase transitions, see DefaultScheduler.PHASES
+OVERTIME: str = 'overtime'
+TRIPLE_ELIXIR: str = 'triple_elixir'
+GAME_OVER: str = 'game_over'
+
+
+@dataclasses.dataclass(order=True, slots=True)
+class Event:
+    """
+    Event - Something that happens at a certain frame
+
+    Events are ordered by frame, and then by the order they were scheduled in,
+    so events on the same frame are handled first come first serve.
+    """
+
+    frame: int  # Frame the event happens on
+    order: int  # Number of events scheduled before this one
+    kind: str = dataclasses.field(compare=False)  # Kind of event, such as ATTACK_READY
+    data: Any = dataclasses.field(default=None, compare=False)  # Event specific data
+    cancelled: bool = dataclasses.field(default=False, compare=False)
+
 
 class Scheduler:
     """
     Scheduling class to handle all timings,
     such as attacks, elixir increase, etc.
-    For now, it will just store frame_count.
+
+    We keep track of the current frame,
+    along with a priority queue of timed events.
+    Components schedule events for the frames where something interesting happens,
+    and next_event_frame() reports the earliest one.
+    This allows the engine to jump over frames where nothing happens,
+    instead of simulating them one by one.
+
+    Cancelled events are left in the queue,
+    and are discarded once they reach the front.
     """
     def __init__(self, fps: int =30):
         self.fps: int = fps
         self.frame_num: int = 0
 
+        self.events: List[Event] = []  # Heap of pending events
+        self.count: int = 0  # Number of events scheduled, used to order ties
+
     def reset(self):
         self.frame_num = 0
+        self.events.clear()
+        self.count = 0
+
+    def schedule(self, frame: int, kind: str, data: Any=None) -> Event:
+        """
+        Schedules an event at a frame.
+
+        :param frame: Frame the event happens on
+        :type frame: int
+        :param kind: Kind of event
+        :type kind: str
+        :param data: Event specific data, defaults to None
+        :type data: Any
+        :return: Scheduled event, which can be passed to cancel()
+        :rtype: Event
+        """
+
+        event = Event(int(frame), self.count, kind, data)
+        self.count += 1
+
+        heapq.heappush(self.events, event)
+
+        return event
+
+    def cancel(self, event: Event) -> None:
+        """
+        Cancels a pending event.
+
+        :param event: Event to cancel
+        :type event: Event
+        """
+
+        event.cancelled = True
+
+    def cancel_kind(self, kind: str) -> None:
+        """
+        Cancels all pending events of a kind.
+
+        :param kind: Kind of event to cancel
+        :type kind: str
+        """
+
+        for event in self.events:
+            if event.kind == kind:
+                event.cancelled = True
+
+    def next_event_frame(self) -> int | None:
+        """
+        Determines the frame of the next pending event.
+
+        :return: Frame of the next event, None if there are no events
+        :rtype: int | None
+        """
+
+        events = self.events
+
+        while events and events[0].cancelled:
+            heapq.heappop(events)
+
+        return events[0].frame if events else None
+
+    def step(self, frames: int=1) -> List[Event]:
+        """
+        Advances a number of frames, removing the events that are now due.
+
+        :param frames: Number of frames to advance
+        :type frames: int
+        :return: Events that happened, in order
+        :rtype: List[Event]
+        """
 
-    def step(self, frames: int=1):
         self.frame_num += frames
-        # possibly check all event timings here
+
+        due = []
+        events = self.events
+
+        while events and events[0].frame <= self.frame_num:
+            event = heapq.heappop(events)
+            if not event.cancelled:
+                due.append(event)
+
+        return due
 
     def frame(self) -> int:
         return self.frame_num
 
+    def snapshot(self) -> Tuple[int, int, List[Event]]:
+        """
+        Captures the current frame and pending events.
+        """
+
+        return self.frame_num, self.count, [dataclasses.replace(event) for event in self.events]
+
+    def restore(self, snapshot: Tuple[int, int, List[Event]]) -> None:
+        """
+        Restores the scheduler from a snapshot created by snapshot().
+
+        Events are copied, so the snapshot can be restored many times.
+        """
+
+        self.frame_num, self.count, events = snapshot
+        self.events = [dataclasses.replace(event) for event in events]
+
 class GameScheduler:
     """
     Template class for game scheduling
     """
 
-    def __init__(self, scheduler: Scheduler, fps: int=30) -> None:
+    def __init__(self, scheduler: Scheduler, fps: int | None=None) -> None:
         self.scheduler: Scheduler = scheduler
-        self.fps: int = fps
+        self.fps: int = fps or scheduler.fps
+
+    def reset(self) -> None:
+        """
+        Schedules the events of a new game.
+        Should be called after the scheduler has been reset.
+        """
 
 class DefaultScheduler(GameScheduler):
     """
     Class for default 1v1 game scheduling
+
+    Games are split into the phases in PHASES,
+    each with its own elixir rate.
+    Regular time lasts for 3 minutes, with double elixir for the last minute.
+    Overtime follows for 2 minutes, with triple elixir for the last minute.
+
+    Each rule is also available as an '_at' method,
+    which determines the rule at a given frame instead of the current frame.
+    These methods accept arrays of frames,
+    so many games can be scheduled at once.
     """
 
+    BASE_RATE: float = 1 / 2.8  # Elixir gained per second during single elixir
+
+    # (Name, start in seconds, elixir multiplier) of each phase:
+    PHASES: List[Tuple[str, int, float]] = [
+        ('regular', 0, 1.0),
+        (DOUBLE_ELIXIR, 120, 2.0),
+        (OVERTIME, 180, 2.0),
+        (TRIPLE_ELIXIR, 240, 3.0),
+    ]
+
+    OVERTIME_START: int = 180  # Start of overtime, in seconds
+    GAME_LENGTH: int = 300  # Length of the game including overtime, in seconds
+
+    def __init__(self, scheduler: Scheduler, fps: int | None=None) -> None:
+        super().__init__(scheduler, fps)
+
+        self.phase_starts: npt.NDArray[np.int64] = np.array(
+            [start * self.fps for _, start, _ in self.PHASES], dtype=np.int64)
+        self.phase_rates: npt.NDArray[np.float64] = np.array(
+            [self.BASE_RATE * mult for _, _, mult in self.PHASES], dtype=np.float64)
+
+        # Elixir gained from the start of the game to the start of each phase:
+
+        self.phase_elixir: npt.NDArray[np.float64] = np.concatenate(
+            ([0.0], np.cumsum(self.phase_rates[:-1] * np.diff(self.phase_starts) / self.fps)))
+
+        self.overtime_frame: int = self.OVERTIME_START * self.fps
+        self.end_frame: int = self.GAME_LENGTH * self.fps
+
+    def reset(self) -> None:
+        for name, start, _ in self.PHASES[1:]:
+            self.scheduler.schedule(start * self.fps, name)
+
+        self.scheduler.schedule(self.end_frame, GAME_OVER)
+
     def elixir_rate(self) -> float:
-        return 0
+        return float(self.elixir_rate_at(self.scheduler.frame()))
+
+    def elixir_rate_at(self, frame: int | npt.NDArray[np.int64]) -> npt.NDArray[np.float64]:
+        """
+        Determines the elixir rate, in elixir per second, at the given frames.
+        """
+
+        return self.phase_rates[self.game_state_at(frame)]
+
+    def elixir_total_at(self, frame: int | npt.NDArray[np.int64]) -> npt.NDArray[np.float64]:
+        """
+        Determines the elixir gained from the start of the game up to the given frames,
+        ignoring the elixir cap.
+
+        Each phase contributes its rate for the frames spent in it,
+        so this is exact no matter how many phase transitions have happened.
+        """
+
+        frame = np.asarray(frame)
+        phase = self.game_state_at(frame)
+
+        return self.phase_elixir[phase] + \
+            self.phase_rates[phase] * (frame - self.phase_starts[phase]) / self.fps
+
+    def elixir_gained_at(self,
+                         frame: int | npt.NDArray[np.int64],
+                         frames: int | npt.NDArray[np.int64]) -> npt.NDArray[np.float64]:
+        """
+        Determines the elixir gained while stepping 'frames' frames from the given frames,
+        ignoring the elixir cap.
+        """
+
+        return self.elixir_total_at(np.asarray(frame) + frames) - self.elixir_total_at(frame)
+
+    def elixir_frame_at(self,
+                        frame: int | npt.NDArray[np.int64],
+                        amount: float | npt.NDArray[np.float64]) -> npt.NDArray[np.int64]:
+        """
+        Determines the first frame where at least 'amount' elixir
+        has been gained since the given frames, ignoring the elixir cap.
+
+        This is the inverse of elixir_total_at(), rounded up to a whole frame.
+        """
+
+        total = self.elixir_total_at(frame) + amount
+        phase = np.searchsorted(self.phase_elixir, total, side='right') - 1
+
+        exact = self.phase_starts[phase] + \
+            (total - self.phase_elixir[phase]) * self.fps / self.phase_rates[phase]
+
+        # Round away float error before rounding up, so exact frames are not skipped:
+
+        return np.ceil(np.round(exact, 6)).astype(np.int64)
 
     def game_state(self) -> int:
         """
         Function to get current game state:
         ex: Game is over, double elixir, overtime, etc.
+
+        This is the index of the current phase in PHASES.
         """
 
-        return 0
+        return int(self.game_state_at(self.scheduler.frame()))
+
+    def game_state_at(self, frame: int | npt.NDArray[np.int64]) -> npt.NDArray[np.intp]:
+        """
+        Determines the index of the phase in PHASES at the given frames.
+        """
+
+        return np.searchsorted(self.phase_starts, frame, side='right') - 1
 
     def is_game_over(self) -> bool:
-        return False
+        return bool(self.is_game_over_at(self.scheduler.frame()))
+
+    def is_game_over_at(self, frame: int | npt.NDArray[np.int64]) -> npt.NDArray[np.bool_]:
+        """
+        Determines if the game is over at the given frames.
+        """
+
+        return np.asarray(frame) >= self.end_frame
 
     def is_overtime(self) -> bool:
-        return False
+        return bool(self.is_overtime_at(self.scheduler.frame()))
+
+    def is_overtime_at(self, frame: int | npt.NDArray[np.int64]) -> npt.NDArray[np.bool_]:
+        """
+        Determines if the game is in overtime at the given frames.
+        """
+
+        return np.asarray(frame) >= self.overtime_frame
 
 @dataclasses.dataclass(slots=True)
 class Stats:
@@ -82,10 +346,11 @@ class Stats:
     """
 
     name: str = ''  # Name of entity
-    speed: int = 0  # Number of pixels per second (TODO: Find better unit?)
-    attack_range: int = 0  # Attack range, in a radius around the unit in pixels
-    sight_range: int = 0  # Sight range, in a radius around the unit in pixels
+    speed: float = 0  # Number of tiles moved per frame
+    attack_range: float = 0  # Attack range, in a radius around the unit in tiles
+    sight_range: float = 0  # Sight range, in a radius around the unit in tiles
     health: int = 0  # Health of unit
     damage: int = 0  # Damage of unit
     troop_size: int = 0  # Size of trop pixels, determines how troop will be rendered
     attack_delay: int = 0  # Delay in frames each attack should take
+    flying: bool = False  # Flying units only collide with other flying units
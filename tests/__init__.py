@@ -0,0 +1,7 @@
+"""
+Tests for the game engine.
+
+Run with pytest from the root of the repository:
+
+    python -m pytest
+"""
@@ -0,0 +1,46 @@
+"""
+Helpers shared by the tests
+"""
+
+from __future__ import annotations
+
+import random
+
+import numpy as np
+
+from clash_royale.envs.game_engine.game_engine import GameEngine
+
+DECK = ['knight', 'archers', 'giant', 'musketeer', 'mini_pekka', 'valkyrie', 'hog_rider', 'bomber']
+
+
+def play(engine: GameEngine, seed: int, frames: int, rate: float=0.1) -> int:
+    """
+    Plays random legal cards for both players, one frame at a time.
+
+    :param engine: Engine to play
+    :type engine: GameEngine
+    :param seed: Seed of the random choices
+    :type seed: int
+    :param frames: Number of frames to play
+    :type frames: int
+    :param rate: Chance each player plays a card on each frame, defaults to 0.1
+    :type rate: float
+    :return: Checksum of the engine afterwards
+    :rtype: int
+    """
+
+    rng = random.Random(seed)
+
+    for _ in range(frames):
+
+        for player_id in (0, 1):
+
+            legal = np.argwhere(engine.legal_actions(player_id))
+
+            if len(legal) and rng.random() < rate:
+                y, x, card = legal[rng.randrange(len(legal))]
+                engine.apply(player_id, (int(x), int(y), int(card)))
+
+        engine.step(1)
+
+    return engine.checksum()
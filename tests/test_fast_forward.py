@@ -0,0 +1,33 @@
+"""
+Tests that fast forwarding matches stepping frame by frame
+"""
+
+from clash_royale.benchmarks.suite import make_engine
+
+
+def test_fast_forward_matches_stepping():
+    """
+    fast_forward() gives the same state as stepping one frame at a time,
+    and never steps past the next interesting frame.
+    """
+
+    fast = make_engine(30, seed=3)
+    slow = make_engine(30, seed=3)
+
+    total = 0
+
+    while total < 900:
+
+        target = fast.next_event_frame()
+        frames = fast.fast_forward(120)
+
+        assert 1 <= frames <= 120
+        assert fast.scheduler.frame() <= target
+
+        for _ in range(frames):
+            slow.step(1)
+
+        total += frames
+
+        assert fast.scheduler.frame() == slow.scheduler.frame()
+        assert fast.checksum() == slow.checksum()
@@ -0,0 +1,38 @@
+"""
+Tests for the renderers
+"""
+
+import random
+
+import numpy as np
+import pytest
+
+from clash_royale.envs.game_engine.arena import Arena
+from clash_royale.envs.game_engine.catalog import card_id
+from clash_royale.envs.game_engine.render import make_renderer
+
+
+@pytest.mark.parametrize('resolution', [(128, 128), (100, 77), (300, 500)])
+@pytest.mark.parametrize('player_id', [0, 1])
+def test_renderers_draw_the_same_image(resolution, player_id):
+    """
+    The numpy and pygame renderers draw identical images of the same board,
+    including resolutions that do not evenly divide the arena.
+    """
+
+    pytest.importorskip('pygame')
+
+    rng = random.Random(3)
+    arena = Arena(width=18, height=32)
+    arena.reset()
+
+    for index in range(40):
+        type_id = card_id(rng.choice(['knight', 'archers', 'giant', 'musketeer', 'valkyrie']))
+
+        for unit in arena.spawn(type_id, rng.uniform(0, 18), rng.uniform(0, 32), index % 2):
+            arena.start_entity(unit)
+
+    numpy_image = make_renderer('numpy', 18, 32, resolution).render(arena, player_id)
+    pygame_image = make_renderer('pygame', 18, 32, resolution).render(arena, player_id)
+
+    assert np.array_equal(numpy_image, pygame_image)
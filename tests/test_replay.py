@@ -0,0 +1,52 @@
+"""
+Tests for recording and re-simulating replays
+"""
+
+import dataclasses
+
+import pytest
+
+from clash_royale.envs.game_engine.game_engine import GameEngine
+from clash_royale.envs.game_engine.replay import APPLY, Replay, ReplayDivergence
+
+from tests.helpers import DECK, play
+
+
+def record(frames):
+    """
+    Records a game of random cards, returning the engine and its replay.
+    """
+
+    engine = GameEngine(DECK, DECK)
+    engine.reset(seed=5)
+    engine.start_recording(checksum_interval=30)
+    play(engine, 2, frames)
+
+    return engine, engine.stop_recording()
+
+
+def test_replay_round_trip():
+    """
+    A replay decoded from bytes re-simulates to the same state, with every checksum matching.
+    """
+
+    engine, replay = record(900)
+    decoded = Replay.from_bytes(replay.to_bytes())
+
+    assert decoded == replay
+    assert decoded.frames == 900
+    assert decoded.simulate(verify=True).checksum() == engine.checksum()
+
+
+def test_replay_detects_divergence():
+    """
+    Verifying a replay with a missing action raises ReplayDivergence.
+    """
+
+    _, replay = record(600)
+    first = next(index for index, rec in enumerate(replay.records) if rec[0] == APPLY)
+    records = replay.records[:first] + replay.records[first + 1:]
+    tampered = dataclasses.replace(replay, records=records)
+
+    with pytest.raises(ReplayDivergence):
+        tampered.simulate(verify=True)
@@ -0,0 +1,80 @@
+"""
+Tests for snapshots, including entities recycled from pools
+"""
+
+from clash_royale.envs.game_engine.game_engine import GameEngine
+
+from tests.helpers import DECK, play
+
+
+def make_branch_point():
+    """
+    Creates an engine part of the way into a game, along with a snapshot of it.
+    """
+
+    engine = GameEngine(DECK, DECK)
+    engine.reset(seed=11)
+    play(engine, 0, 300)
+
+    return engine, engine.snapshot()
+
+
+def test_restore_branches():
+    """
+    Every branch played from a snapshot is the same, in whatever order branches are played.
+    """
+
+    engine, snap = make_branch_point()
+    start = engine.checksum()
+    expected = {}
+
+    for seed in range(4):
+        engine.restore(snap)
+        assert engine.checksum() == start
+        expected[seed] = play(engine, seed, 400)
+
+    for seed in (3, 1, 0, 2, 2, 1):
+        engine.restore(snap)
+        assert engine.checksum() == start
+        assert play(engine, seed, 400) == expected[seed]
+
+
+def test_restore_matches_fresh_engine():
+    """
+    A branch played after restoring matches the same game played without snapshots.
+    """
+
+    engine, snap = make_branch_point()
+    play(engine, 5, 400)
+    engine.restore(snap)
+
+    fresh, _ = make_branch_point()
+
+    assert play(engine, 1, 400) == play(fresh, 1, 400)
+
+
+def test_restore_reclaims_pooled_entities():
+    """
+    Restoring never leaves a loaded entity waiting in a pool,
+    and entities spawned after the snapshot go back to their pool.
+    """
+
+    engine, snap = make_branch_point()
+    arena = engine.arena
+
+    assert arena.pools is not None
+
+    for seed in range(3):
+
+        play(engine, seed, 400)
+        engine.restore(snap)
+
+        loaded = set(arena.entities)
+        pooled = [ent for pool in arena.pools.values() for ent in pool]
+
+        assert not loaded.intersection(pooled)
+        assert len(pooled) == len(set(pooled))
+        assert all(ent.collection is arena for ent in arena.entities)
+        assert [ent.row for ent in arena.entities] == list(range(len(arena.entities)))
+
+    assert arena.pool_stats()['hits'] > 0
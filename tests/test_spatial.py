@@ -0,0 +1,45 @@
+"""
+Tests for the spatial index of the arena
+"""
+
+import random
+
+import pytest
+
+from clash_royale.envs.game_engine.arena import Arena
+from clash_royale.envs.game_engine.catalog import card_id
+
+
+@pytest.mark.parametrize('use_store', [True, False])
+def test_query_radius_after_stepping(use_store):
+    """
+    query_radius() finds the same entities as checking every entity,
+    even though the index is only updated when it is queried.
+    """
+
+    rng = random.Random(2)
+    arena = Arena(width=18, height=32, use_store=use_store)
+    arena.reset()
+
+    for index in range(30):
+        team = index % 2
+        y = rng.uniform(2, 12)
+        type_id = card_id(rng.choice(['knight', 'archers', 'giant']))
+
+        y = y if team == 0 else arena.height - y
+
+        for unit in arena.spawn(type_id, rng.uniform(1, 17), y, team):
+            arena.start_entity(unit)
+
+    for _ in range(5):
+
+        for _ in range(10):
+            arena.step()
+
+        for x, y in ((4.0, 8.0), (9.0, 16.0), (14.0, 24.0)):
+
+            found = arena.query_radius(x, y, 5.5)
+            expected = [ent for ent in arena.entities
+                        if (ent.x - x) ** 2 + (ent.y - y) ** 2 <= 5.5 ** 2]
+
+            assert set(found) == set(expected)
@@ -0,0 +1,64 @@
+"""
+Tests that stepping many frames at once matches stepping frame by frame
+"""
+
+import pytest
+
+from clash_royale.benchmarks.suite import make_engine
+
+
+@pytest.mark.parametrize('frames', [2, 5, 30, 120])
+def test_step_many_frames_matches_single_frames(frames):
+    """
+    step(k) gives the same state as k calls to step(1).
+    """
+
+    many = make_engine(20, seed=4)
+    single = make_engine(20, seed=4)
+
+    for _ in range(10):
+
+        many.step(frames)
+
+        for _ in range(frames):
+            single.step(1)
+
+        assert many.checksum() == single.checksum()
+
+    assert len(many.arena.entities) == len(single.arena.entities)
+
+
+def test_step_many_frames_reports_elixir_once():
+    """
+    Elixir amounts reached over a long step are the same as over single steps.
+    """
+
+    many = make_engine(0, seed=1)
+    single = make_engine(0, seed=1)
+
+    crossings = many.step(300)
+    expected = [crossing for _ in range(300) for crossing in single.step(1)]
+
+    assert crossings == expected
+
+
+def test_step_many_frames_skips_quiet_frames(monkeypatch):
+    """
+    When nothing in the arena moves, a long step only steps the arena a few times.
+    """
+
+    engine = make_engine(0, seed=1)
+    engine.step(1)
+
+    calls = []
+    step = engine.arena.step
+
+    def counted(frames=1):
+        calls.append(frames)
+        return step(frames)
+
+    monkeypatch.setattr(engine.arena, 'step', counted)
+    engine.step(300)
+
+    assert sum(calls) == 300
+    assert len(calls) < 10
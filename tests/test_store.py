@@ -0,0 +1,100 @@
+"""
+Tests that bulk removal matches removing entities one at a time
+"""
+
+import random
+
+import numpy as np
+import pytest
+
+from clash_royale.benchmarks.suite import make_engine
+from clash_royale.envs.game_engine.entities.store import swap_remove_order
+
+
+def sequential_order(size, removed):
+    """
+    Swap-removes items from a list one at a time.
+    """
+
+    items = list(range(size))
+
+    for original in removed:
+        hole = items.index(original)
+        items[hole] = items[-1]
+        items.pop()
+
+    return items
+
+
+@pytest.mark.parametrize('seed', range(5))
+def test_swap_remove_order(seed):
+    """
+    swap_remove_order() leaves items where removing them one at a time would.
+    """
+
+    rng = random.Random(seed)
+    size = rng.randrange(1, 60)
+    removed = rng.sample(range(size), rng.randrange(size + 1))
+
+    assert swap_remove_order(size, removed) == sequential_order(size, removed)
+
+
+def assert_same_arena(first, second):
+    """
+    Asserts that two arenas built from the same scenario hold the same entities,
+    in the same rows of their stores.
+    """
+
+    assert [ent.type_id for ent in first.entities] == [ent.type_id for ent in second.entities]
+    assert [ent.row for ent in first.entities] == list(range(len(first.entities)))
+    assert [ent.row for ent in second.entities] == list(range(len(second.entities)))
+    assert first.store.names == second.store.names
+
+    size = first.store.size
+
+    for name, column in first.store.columns.items():
+        assert np.array_equal(column[:size], second.store.columns[name][:size])
+
+
+@pytest.mark.parametrize('seed', range(3))
+def test_unload_many_matches_unload_entity(seed):
+    """
+    Arena.unload_many() leaves the same store as unloading each entity in turn,
+    and both arenas keep simulating identically.
+    """
+
+    bulk = make_engine(60, seed=seed)
+    single = make_engine(60, seed=seed)
+
+    rng = random.Random(seed)
+    indices = rng.sample(range(len(bulk.arena.entities)), len(bulk.arena.entities) // 3)
+
+    bulk.arena.unload_many([bulk.arena.entities[index] for index in indices])
+
+    for ent in [single.arena.entities[index] for index in indices]:
+        single.arena.unload_entity(ent)
+
+    assert_same_arena(bulk.arena, single.arena)
+
+    bulk.step(60)
+    single.step(60)
+
+    assert bulk.checksum() == single.checksum()
+
+
+def test_unload_where_matches_unload_entity():
+    """
+    Arena.unload_where() unloads the entities selected by a store column.
+    """
+
+    bulk = make_engine(60, seed=7)
+    single = make_engine(60, seed=7)
+
+    mask = bulk.arena.store.column('x') < bulk.width / 2
+
+    bulk.arena.unload_where(mask)
+
+    for ent in [ent for ent in single.arena.entities if ent.x < single.width / 2]:
+        single.arena.unload_entity(ent)
+
+    assert_same_arena(bulk.arena, single.arena)